@@ -0,0 +1,56 @@
+import heapq
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; they are stored as UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class RevokedTokenIndex:
+    """
+    In-process set of revoked JTIs. Each entry is dropped once its token has
+    expired (an expired token is rejected by the JWT check anyway), so the
+    index only ever holds tokens that could still be presented.
+    """
+
+    def __init__(self):
+        self._expires: Dict[str, datetime] = {}
+        # min-heap of (expires_at, jti) driving eviction
+        self._heap: List[Tuple[datetime, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        expires_at = _as_utc(expires_at)
+        current = self._expires.get(jti)
+        if current is not None and current >= expires_at:
+            return
+        self._expires[jti] = expires_at
+        heapq.heappush(self._heap, (expires_at, jti))
+
+    def update(self, entries: Iterable[Tuple[str, datetime]]) -> None:
+        # a union: revocations are never undone, so nothing is dropped here
+        for jti, expires_at in entries:
+            self.add(jti, expires_at)
+
+    def contains(self, jti: str, now: Optional[datetime] = None) -> bool:
+        now = _as_utc(now) if now is not None else datetime.now(timezone.utc)
+        self.evict_expired(now)
+        expires_at = self._expires.get(jti)
+        return expires_at is not None and now < expires_at
+
+    def evict_expired(self, now: datetime) -> int:
+        evicted = 0
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            expires_at, jti = heapq.heappop(heap)
+            # skip stale heap entries left behind by a later re-add
+            if self._expires.get(jti) == expires_at:
+                del self._expires[jti]
+                evicted += 1
+        return evicted
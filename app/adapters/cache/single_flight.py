@@ -0,0 +1,40 @@
+import asyncio
+import contextvars
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls per key: while a call for ``key`` is running,
+    other callers await the same result instead of starting their own.
+
+    The call runs in a task owned by the flight, so a caller that is
+    cancelled (a client disconnect, a timeout) stops waiting without
+    failing the others. The task starts from an empty context: its result
+    is shared, so it must not run in the first caller's transaction.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Task"] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(
+                fn(), context=contextvars.Context()
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._landed(key, done))
+        return await asyncio.shield(task)
+
+    def _landed(self, key: Hashable, task: "asyncio.Task") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # every caller may have given up: mark a failure retrieved so it does not warn
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,88 @@
+import logging
+from typing import Any, Dict, Optional, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+logger = logging.getLogger(__name__)
+
+PragmaValue = Union[int, str]
+
+# PRAGMAs applied to every new SQLite connection, per profile
+SQLITE_PROFILES: Dict[str, Dict[str, PragmaValue]] = {
+    # SQLite defaults: rollback journal, synchronous=FULL
+    "default": {},
+    # WAL lets readers run while a writer commits; NORMAL is durable in WAL
+    # except for the last transactions on power loss
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -65536,  # KiB when negative: 64 MiB
+        "mmap_size": 268435456,  # 256 MiB
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def sqlite_pragmas(
+    profile: str, overrides: Optional[Dict[str, Optional[PragmaValue]]] = None
+) -> Dict[str, PragmaValue]:
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(
+            f"Unknown SQLite profile {profile!r}; choose one of {sorted(SQLITE_PROFILES)}"
+        )
+    pragmas = dict(SQLITE_PROFILES[profile])
+    for name, value in (overrides or {}).items():
+        if value is not None:
+            pragmas[name] = value
+    return pragmas
+
+
+def _apply_pragmas(engine: AsyncEngine, pragmas: Dict[str, PragmaValue]) -> None:
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def build_engine(
+    database_url: str,
+    sqlite_profile: str = "performance",
+    sqlite_overrides: Optional[Dict[str, Optional[PragmaValue]]] = None,
+    pool_size: int = 5,
+    max_overflow: int = 5,
+    pool_timeout: float = 30.0,
+) -> AsyncEngine:
+    """
+    Create the async engine. SQLite connections get the PRAGMAs of
+    ``sqlite_profile`` on connect. With aiosqlite every pooled connection owns
+    a worker thread, so the pool is kept small: WAL allows many readers but
+    still only one writer at a time.
+    """
+    url = make_url(database_url)
+    is_sqlite = url.get_backend_name() == "sqlite"
+    in_memory = is_sqlite and url.database in (None, "", ":memory:")
+
+    kwargs: Dict[str, Any] = {"echo": False, "future": True}
+    if not in_memory:
+        # in-memory SQLite uses a single static connection, no pool to size
+        kwargs.update(
+            pool_size=pool_size, max_overflow=max_overflow, pool_timeout=pool_timeout
+        )
+    engine = create_async_engine(database_url, **kwargs)
+
+    if is_sqlite:
+        pragmas = sqlite_pragmas(sqlite_profile, sqlite_overrides)
+        if in_memory:
+            pragmas.pop("journal_mode", None)
+            pragmas.pop("mmap_size", None)
+        if pragmas:
+            _apply_pragmas(engine, pragmas)
+            logger.debug("SQLite profile %s: %s", sqlite_profile, pragmas)
+    return engine
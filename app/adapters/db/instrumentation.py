@@ -0,0 +1,84 @@
+from time import perf_counter
+from typing import Any, Dict, List, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.services.metrics import Gauge, Metric, MetricsRegistry
+
+# statement label values; anything else (PRAGMA, DDL, ...) is "OTHER"
+_STATEMENT_KINDS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"})
+# ad-hoc SQL with inlined values must not grow the statement cache forever
+_STATEMENT_CACHE_SIZE = 1024
+
+
+def _statement_kind(statement: str) -> str:
+    head = statement.lstrip()[:7].split(None, 1)
+    kind = head[0].upper() if head else ""
+    return kind if kind in _STATEMENT_KINDS else "OTHER"
+
+
+def instrument_engine(
+    engine: Union[AsyncEngine, Engine], registry: MetricsRegistry
+) -> None:
+    """
+    Record query durations per statement kind and the time spent waiting
+    for a pooled connection, and report pool usage on every scrape.
+    """
+    queries = registry.histogram(
+        "db_query_duration_seconds",
+        "Time spent executing SQL statements, by statement kind.",
+        ("statement",),
+    )
+    checkout_wait = registry.histogram(
+        "db_pool_checkout_wait_seconds",
+        "Time spent waiting for a pooled connection, including opening new ones.",
+    ).labels()
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    # statement -> histogram child; statements repeat, classify each once
+    by_statement: Dict[str, Any] = {}
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _query_started(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context.metrics_started = perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _query_finished(conn, cursor, statement, parameters, context, executemany):
+        if context is None:
+            return
+        elapsed = perf_counter() - context.metrics_started
+        child = by_statement.get(statement)
+        if child is None:
+            child = queries.labels(_statement_kind(statement))
+            if len(by_statement) < _STATEMENT_CACHE_SIZE:
+                by_statement[statement] = child
+        child.observe(elapsed)
+
+    # SQLAlchemy has no event before a checkout: time the pool's public
+    # connect(), which the engine calls for every connection it hands out
+    pool = sync_engine.pool
+    connect = pool.connect
+
+    def _timed_connect():
+        started = perf_counter()
+        try:
+            return connect()
+        finally:
+            checkout_wait.observe(perf_counter() - started)
+
+    pool.connect = _timed_connect
+
+    def _pool_usage() -> List[Metric]:
+        # QueuePool only; the static pool of in-memory SQLite has no counts
+        if not hasattr(pool, "checkedout"):
+            return []
+        checked_out = Gauge("db_pool_checked_out", "Connections currently checked out.")
+        checked_out.set(pool.checkedout())
+        size = Gauge("db_pool_size", "Connections the pool keeps open.")
+        size.set(pool.size())
+        return [checked_out, size]
+
+    registry.add_collector(_pool_usage)
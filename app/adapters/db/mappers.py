@@ -0,0 +1,66 @@
+"""
+Row <-> domain conversion for the SQL repositories. Read paths select these
+column tuples with Core instead of loading ORM entities, so no identity map,
+instance state or attribute instrumentation is built just to be copied into
+an immutable domain object and thrown away. Ids come back as ``UUID``
+already (see ``BinaryUUID``).
+"""
+from typing import Any, Dict, Iterable, List, Sequence
+
+from app.adapters.db.models import PersonModel, UserModel
+from app.domain.person import Person
+from app.domain.user import User
+
+PERSON_COLUMNS = (
+    PersonModel.id,
+    PersonModel.name,
+    PersonModel.email,
+    PersonModel.age,
+    PersonModel.version,
+)
+
+USER_COLUMNS = (
+    UserModel.id,
+    UserModel.email,
+    UserModel.hashed_password,
+    UserModel.is_active,
+)
+
+
+def person_from_row(row: Sequence[Any]) -> Person:
+    """``row`` holds PERSON_COLUMNS in order."""
+    person_id, name, email, age, version = row
+    return Person(person_id, name, email, age, version)
+
+
+def persons_from_rows(rows: Iterable[Sequence[Any]]) -> List[Person]:
+    # positional construction in one comprehension: no per-row function call
+    return [
+        Person(person_id, name, email, age, version)
+        for person_id, name, email, age, version in rows
+    ]
+
+
+def person_to_row(person: Person) -> Dict[str, Any]:
+    return {
+        "id": person.id,
+        "name": person.name,
+        "email": person.email,
+        "age": person.age,
+        "version": person.version,
+    }
+
+
+def user_from_row(row: Sequence[Any]) -> User:
+    """``row`` holds USER_COLUMNS in order."""
+    user_id, email, hashed_password, is_active = row
+    return User(user_id, email, hashed_password, is_active)
+
+
+def user_to_row(user: User) -> Dict[str, Any]:
+    return {
+        "id": user.id,
+        "email": user.email,
+        "hashed_password": user.hashed_password,
+        "is_active": user.is_active,
+    }
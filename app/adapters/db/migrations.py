@@ -0,0 +1,453 @@
+"""
+Versioned schema migrations.
+
+Every schema change is a numbered ``Revision``; ``schema_version`` holds the
+number of the last one applied. Startup only reads that number (the fast
+path) and upgrades when it is behind; the same upgrade runs from the CLI:
+
+    python -m app.adapters.db.migrations upgrade | current | history
+
+Revisions describe the schema as it was when they were written, so they do
+not use the models: a later model change needs a new revision. Databases
+created before revisions existed have no ``schema_version``; revisions 1-8
+check what is already there, so such a database is upgraded from 0 safely.
+"""
+import argparse
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    inspect,
+    types,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.adapters.db.types import BinaryUUID
+
+logger = logging.getLogger(__name__)
+
+VERSION_TABLE = "schema_version"
+
+# FTS5 trigram index over persons.name, used for substring search
+NAME_FTS_TABLE = "persons_name_fts"
+_NAME_FTS_TRIGGERS = (
+    "persons_name_fts_insert",
+    "persons_name_fts_delete",
+    "persons_name_fts_update",
+)
+
+# tables whose writes bump their row in table_versions
+VERSIONED_TABLES = ("persons",)
+
+_COPY_CHUNK_SIZE = 5000
+
+
+@dataclass(frozen=True, slots=True)
+class Revision:
+    number: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+class SchemaOutOfDate(RuntimeError):
+    """The database is behind the code and may not be upgraded automatically."""
+
+
+def _is_sqlite(conn: Connection) -> bool:
+    return conn.dialect.name == "sqlite"
+
+
+# -- revision 1: the tables of the first release ------------------------------
+
+_initial = MetaData()
+Table(
+    "persons",
+    _initial,
+    Column("id", String(36), primary_key=True, index=True),
+    Column("name", String, nullable=False),
+    Column("email", String, nullable=False, index=True),
+    Column("age", Integer, nullable=True),
+)
+Table(
+    "users",
+    _initial,
+    Column("id", String(36), primary_key=True, index=True),
+    Column("email", String, nullable=False, unique=True, index=True),
+    Column("hashed_password", String, nullable=False),
+    Column("is_active", Boolean),
+)
+Table(
+    "revoked_tokens",
+    _initial,
+    Column("jti", String, primary_key=True, index=True),
+    Column("expires_at", DateTime, nullable=False),
+)
+
+
+def _create_initial_tables(conn: Connection) -> None:
+    _initial.create_all(conn)
+
+
+# -- revisions 2-6 -------------------------------------------------------------
+
+
+def _add_person_version(conn: Connection) -> None:
+    columns = {c["name"] for c in inspect(conn).get_columns("persons")}
+    if "version" not in columns:
+        conn.exec_driver_sql(
+            "ALTER TABLE persons ADD COLUMN version INTEGER NOT NULL DEFAULT 1"
+        )
+
+
+def _index_token_expiry(conn: Connection) -> None:
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_revoked_tokens_expires_at "
+        "ON revoked_tokens (expires_at)"
+    )
+
+
+def _install_change_counters(conn: Connection) -> None:
+    # triggers count every write, including bulk inserts and other workers',
+    # without an extra statement from the application
+    conn.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS table_versions "
+        "(name VARCHAR NOT NULL PRIMARY KEY, version INTEGER NOT NULL)"
+    )
+    if not _is_sqlite(conn):
+        return
+    for table in VERSIONED_TABLES:
+        conn.exec_driver_sql(
+            "INSERT OR IGNORE INTO table_versions (name, version) VALUES (?, 0)",
+            (table,),
+        )
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_{op.lower()}_bump_version "
+                f"AFTER {op} ON {table} BEGIN "
+                f"UPDATE table_versions SET version = version + 1 WHERE name = '{table}'; "
+                "END"
+            )
+
+
+# (sort column, id) serves both the filters and keyset pagination per sort
+# order; ix_persons_email_id also covers plain email lookups
+_PERSON_INDEXES = (
+    ("ix_persons_email_id", "email"),
+    ("ix_persons_name_id", "name"),
+    ("ix_persons_age_id", "age"),
+)
+
+
+def _index_person_sort_orders(conn: Connection) -> None:
+    for name, column in _PERSON_INDEXES:
+        conn.exec_driver_sql(
+            f"CREATE INDEX IF NOT EXISTS {name} ON persons ({column}, id)"
+        )
+
+
+def _install_name_search(conn: Connection, rowid: str = "rowid") -> None:
+    # external-content table: the index stores trigrams only, rows stay in
+    # persons, found again by the ``rowid`` column
+    if not _is_sqlite(conn):
+        return
+    exists = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (NAME_FTS_TABLE,),
+    ).scalar()
+    if not exists:
+        try:
+            conn.exec_driver_sql(
+                f"CREATE VIRTUAL TABLE {NAME_FTS_TABLE} USING fts5("
+                f"name, content='persons', content_rowid='{rowid}', tokenize='trigram')"
+            )
+        except OperationalError as exc:
+            # SQLite built without FTS5 or older than 3.34: name search uses LIKE
+            logger.warning("Name search index unavailable: %s", exc)
+            return
+        conn.exec_driver_sql(
+            f"INSERT INTO {NAME_FTS_TABLE} ({NAME_FTS_TABLE}) VALUES ('rebuild')"
+        )
+    delete_old = (
+        f"INSERT INTO {NAME_FTS_TABLE} ({NAME_FTS_TABLE}, rowid, name) "
+        f"VALUES ('delete', old.{rowid}, old.name);"
+    )
+    insert_new = (
+        f"INSERT INTO {NAME_FTS_TABLE} (rowid, name) VALUES (new.{rowid}, new.name);"
+    )
+    for name, event, body in zip(
+        _NAME_FTS_TRIGGERS,
+        ("AFTER INSERT", "AFTER DELETE", "AFTER UPDATE OF name"),
+        (insert_new, delete_old, delete_old + insert_new),
+    ):
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {name} {event} ON persons BEGIN {body} END"
+        )
+
+
+# -- revision 7: binary UUID keys ----------------------------------------------
+
+_binary_keys = MetaData()
+Table(
+    "persons",
+    _binary_keys,
+    Column("id", BinaryUUID, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("email", String, nullable=False),
+    Column("age", Integer, nullable=True),
+    Column("version", Integer, nullable=False, server_default="1"),
+    *(Index(name, column, "id") for name, column in _PERSON_INDEXES),
+)
+Table(
+    "users",
+    _binary_keys,
+    Column("id", BinaryUUID, primary_key=True),
+    Column("email", String, nullable=False, unique=True, index=True),
+    Column("hashed_password", String, nullable=False),
+    Column("is_active", Boolean),
+)
+
+# indexes the primary keys or the (column, id) indexes cover
+_OBSOLETE_INDEXES = (
+    "ix_persons_id",
+    "ix_persons_email",
+    "ix_users_id",
+    "ix_revoked_tokens_jti",
+)
+
+
+def _rebuild_with_binary_key(conn: Connection, table: Table) -> None:
+    # SQLite cannot change a column type: rebuild the table, keeping rowids
+    # (the name search index refers to persons by rowid)
+    inspector = inspect(conn)
+    columns = [c["name"] for c in inspector.get_columns(table.name)]
+    kept = [c for c in columns if c in table.c]
+    legacy = f"{table.name}_legacy"
+    # the old indexes keep their names after the rename and would clash
+    old_indexes = [i["name"] for i in inspector.get_indexes(table.name)]
+    conn.exec_driver_sql(f"ALTER TABLE {table.name} RENAME TO {legacy}")
+    for index in old_indexes:
+        conn.exec_driver_sql(f'DROP INDEX IF EXISTS "{index}"')
+    table.create(conn)
+    select_sql = f"SELECT rowid, {', '.join(kept)} FROM {legacy}"
+    insert_sql = (
+        f"INSERT INTO {table.name} (rowid, {', '.join(kept)}) "
+        f"VALUES ({', '.join('?' * (len(kept) + 1))})"
+    )
+    id_at = kept.index("id") + 1
+    rows = conn.exec_driver_sql(select_sql)
+    while chunk := rows.fetchmany(_COPY_CHUNK_SIZE):
+        converted = []
+        for row in chunk:
+            row = list(row)
+            row[id_at] = UUID(row[id_at]).bytes
+            converted.append(tuple(row))
+        conn.exec_driver_sql(insert_sql, converted)
+    # the triggers went with the renamed table
+    conn.exec_driver_sql(f"DROP TABLE {legacy}")
+
+
+def _convert_binary_keys(conn: Connection) -> None:
+    inspector = inspect(conn)
+    for table in _binary_keys.sorted_tables:
+        id_type = next(
+            c["type"] for c in inspector.get_columns(table.name) if c["name"] == "id"
+        )
+        if not isinstance(id_type, types.String):
+            continue
+        logger.info("Converting %s.id to binary UUIDs", table.name)
+        if _is_sqlite(conn):
+            _rebuild_with_binary_key(conn, table)
+        else:
+            conn.exec_driver_sql(
+                f"ALTER TABLE {table.name} ALTER COLUMN id TYPE uuid USING id::uuid"
+            )
+    for name in _OBSOLETE_INDEXES:
+        conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+    # a rebuilt persons table has none of its triggers yet
+    _install_change_counters(conn)
+    _install_name_search(conn)
+
+
+# -- revision 8: a rowid VACUUM keeps -----------------------------------------
+
+# VACUUM may renumber the implicit rowid of a table without an INTEGER PRIMARY
+# KEY, which would point the name search index at the wrong persons. seq is
+# that key; id stays unique and is what everything else uses.
+_stable_rowids = MetaData()
+Table(
+    "persons",
+    _stable_rowids,
+    Column("seq", Integer, primary_key=True),
+    Column("id", BinaryUUID, nullable=False, unique=True),
+    Column("name", String, nullable=False),
+    Column("email", String, nullable=False),
+    Column("age", Integer, nullable=True),
+    Column("version", Integer, nullable=False, server_default="1"),
+    *(Index(name, column, "id") for name, column in _PERSON_INDEXES),
+)
+
+
+def _add_person_seq(conn: Connection) -> None:
+    inspector = inspect(conn)
+    if "seq" in {c["name"] for c in inspector.get_columns("persons")}:
+        return
+    if not _is_sqlite(conn):
+        conn.exec_driver_sql("ALTER TABLE persons ADD COLUMN seq BIGSERIAL")
+        conn.exec_driver_sql("ALTER TABLE persons DROP CONSTRAINT persons_pkey")
+        conn.exec_driver_sql("ALTER TABLE persons ADD PRIMARY KEY (seq)")
+        conn.exec_driver_sql("ALTER TABLE persons ADD UNIQUE (id)")
+        return
+    # rebuilt from scratch below, keyed on seq
+    for trigger in _NAME_FTS_TRIGGERS:
+        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.exec_driver_sql(f"DROP TABLE IF EXISTS {NAME_FTS_TABLE}")
+    table = _stable_rowids.tables["persons"]
+    old_indexes = [i["name"] for i in inspector.get_indexes("persons")]
+    conn.exec_driver_sql("ALTER TABLE persons RENAME TO persons_legacy")
+    for index in old_indexes:
+        conn.exec_driver_sql(f'DROP INDEX IF EXISTS "{index}"')
+    table.create(conn)
+    columns = ", ".join(c.name for c in table.columns if c.name != "seq")
+    conn.exec_driver_sql(
+        f"INSERT INTO persons (seq, {columns}) SELECT rowid, {columns} "
+        "FROM persons_legacy"
+    )
+    # the triggers went with the renamed table
+    conn.exec_driver_sql("DROP TABLE persons_legacy")
+    _install_change_counters(conn)
+    _install_name_search(conn, rowid="seq")
+
+
+REVISIONS: List[Revision] = [
+    Revision(1, "persons, users and revoked_tokens", _create_initial_tables),
+    Revision(2, "persons.version for optimistic locking", _add_person_version),
+    Revision(3, "index revoked_tokens.expires_at", _index_token_expiry),
+    Revision(4, "table_versions change counters", _install_change_counters),
+    Revision(5, "(column, id) indexes per person sort order", _index_person_sort_orders),
+    Revision(6, "trigram name search index", _install_name_search),
+    Revision(7, "binary UUID keys for persons and users", _convert_binary_keys),
+    Revision(8, "persons.seq, a rowid VACUUM keeps", _add_person_seq),
+]
+HEAD = REVISIONS[-1].number
+
+
+def current_revision(conn: Connection) -> Optional[int]:
+    """The last applied revision; None for a database without ``schema_version``."""
+    if not inspect(conn).has_table(VERSION_TABLE):
+        return None
+    return conn.exec_driver_sql(f"SELECT version FROM {VERSION_TABLE}").scalar()
+
+
+def apply_revisions(conn: Connection) -> List[Revision]:
+    """Apply every revision after the current one, in the caller's transaction."""
+    current = current_revision(conn)
+    if current is None:
+        conn.exec_driver_sql(f"CREATE TABLE {VERSION_TABLE} (version INTEGER NOT NULL)")
+        conn.exec_driver_sql(f"INSERT INTO {VERSION_TABLE} (version) VALUES (0)")
+        current = 0
+    if current > HEAD:
+        raise SchemaOutOfDate(
+            f"Database is at revision {current}, newer than this code ({HEAD})"
+        )
+    pending = [r for r in REVISIONS if r.number > current]
+    for revision in pending:
+        logger.info("Applying revision %d: %s", revision.number, revision.description)
+        revision.upgrade(conn)
+        conn.exec_driver_sql(
+            f"UPDATE {VERSION_TABLE} SET version = ?", (revision.number,)
+        )
+    return pending
+
+
+async def upgrade(engine: AsyncEngine) -> List[Revision]:
+    """
+    Bring the database to ``HEAD`` in one transaction. On SQLite the write
+    lock is taken before the revision is read, so workers starting together
+    upgrade once: the others wait and then find nothing left to apply.
+    """
+    async with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            await conn.exec_driver_sql("BEGIN IMMEDIATE")
+        applied = await conn.run_sync(apply_revisions)
+        await conn.commit()
+    return applied
+
+
+async def check_schema(engine: AsyncEngine, auto_upgrade: bool = True) -> None:
+    """
+    Startup check: one read of ``schema_version`` when the database is up to
+    date. Behind it is upgraded, or ``SchemaOutOfDate`` raised without
+    ``auto_upgrade``.
+    """
+    async with engine.connect() as conn:
+        current = await conn.run_sync(current_revision)
+    if current is not None and current >= HEAD:
+        if current > HEAD:
+            logger.warning("Database revision %d is newer than %d", current, HEAD)
+        return
+    if not auto_upgrade:
+        raise SchemaOutOfDate(
+            f"Database is at revision {current or 0}, this code needs {HEAD}; "
+            "run `python -m app.adapters.db.migrations upgrade`"
+        )
+    applied = await upgrade(engine)
+    if applied:
+        logger.info("Database upgraded to revision %d", applied[-1].number)
+
+
+async def _run(command: str, database_url: str) -> None:
+    from app.adapters.db.engine import build_engine
+
+    engine = build_engine(database_url)
+    try:
+        if command == "upgrade":
+            applied = await upgrade(engine)
+            for revision in applied:
+                print(f"applied {revision.number}: {revision.description}")
+            if not applied:
+                print(f"already at revision {HEAD}")
+        elif command == "current":
+            async with engine.connect() as conn:
+                current = await conn.run_sync(current_revision)
+            state = "up to date" if current == HEAD else f"head is {HEAD}"
+            print(f"{current if current is not None else 'unversioned'} ({state})")
+        else:
+            for revision in REVISIONS:
+                print(f"{revision.number}: {revision.description}")
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Manage the database schema.")
+    parser.add_argument(
+        "command", nargs="?", default="upgrade", choices=("upgrade", "current", "history")
+    )
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./persons.db"),
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(_run(args.command, args.database_url))
+
+
+if __name__ == "__main__":
+    main()
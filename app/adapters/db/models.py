@@ -1,23 +1,48 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 from sqlalchemy.orm import declarative_base
 from datetime import datetime
 
+from app.adapters.db.types import BinaryUUID
+
+# the tables are created and changed by app/adapters/db/migrations.py: a change
+# here needs a new revision there
 Base = declarative_base()
 
 
 class PersonModel(Base):
     __tablename__ = "persons"
 
-    id = Column(String(length=36), primary_key=True, index=True)
+    # the rowid on SQLite, stable across VACUUM: the name search index refers
+    # to persons by it. Assigned by the database; queries go by id.
+    seq = Column(Integer, primary_key=True)
+    id = Column(BinaryUUID, nullable=False, unique=True)
     name = Column(String, nullable=False)
-    email = Column(String, nullable=False, index=True)
+    email = Column(String, nullable=False)
     age = Column(Integer, nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    # (sort column, id) serves both the filters and keyset pagination per sort order;
+    # ix_persons_email_id also covers plain email lookups
+    __table_args__ = (
+        Index("ix_persons_email_id", "email", "id"),
+        Index("ix_persons_name_id", "name", "id"),
+        Index("ix_persons_age_id", "age", "id"),
+    )
+
+
+class TableVersionModel(Base):
+    """Per-table change counter, bumped by triggers on every write (SQLite)."""
+
+    __tablename__ = "table_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
 
 
 class UserModel(Base):
     __tablename__ = "users"
 
-    id = Column(String(length=36), primary_key=True, index=True)
+    id = Column(BinaryUUID, primary_key=True)
     email = Column(String, nullable=False, unique=True, index=True)
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
@@ -26,8 +51,8 @@ class UserModel(Base):
 class RevokedTokenModel(Base):
     __tablename__ = "revoked_tokens"
 
-    jti = Column(String, primary_key=True, index=True)
-    expires_at = Column(DateTime, nullable=False)
+    jti = Column(String, primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
 
     def is_expired(self) -> bool:
         return datetime.utcnow() >= self.expires_at
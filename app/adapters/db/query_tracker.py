@@ -0,0 +1,135 @@
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_MAX_LOGGED_SQL = 300
+
+
+def _one_line(statement: str) -> str:
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    return sql if len(sql) <= _MAX_LOGGED_SQL else sql[:_MAX_LOGGED_SQL] + "..."
+
+
+def _value_shape(value: Any) -> str:
+    if value is None:
+        return "None"
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> str:
+    """
+    The types (and lengths of strings and bytes) of a statement's parameters,
+    never their values, so slow-query logs carry no personal data.
+    """
+    if executemany:
+        rows = list(parameters)
+        return f"{len(rows)} x {parameter_shape(rows[0])}" if rows else "0 rows"
+    if isinstance(parameters, dict):
+        shapes = (f"{key}: {_value_shape(v)}" for key, v in parameters.items())
+        return "{" + ", ".join(shapes) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(_value_shape(v) for v in parameters) + ")"
+    return _value_shape(parameters)
+
+
+class RequestQueries:
+    """Statements executed on behalf of one request."""
+
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def most_repeated(self) -> Tuple[str, int]:
+        return self.statements.most_common(1)[0]
+
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar(
+    "request_queries", default=None
+)
+
+
+class QueryTracker:
+    """
+    Development/CI instrumentation: attributes every SQL statement to the
+    request running it (through a context variable), logs statements slower
+    than ``slow_query_seconds`` with the shape of their parameters, and
+    flags requests that run more than ``max_statements``. Listeners get
+    each finished request, e.g. to enforce per-endpoint statement budgets.
+    """
+
+    def __init__(self, slow_query_seconds: float = 0.1, max_statements: int = 20):
+        self.slow_query_seconds = slow_query_seconds
+        self.max_statements = max_statements
+        self._listeners: List[Callable[[str, RequestQueries], None]] = []
+
+    def instrument(self, engine: Union[AsyncEngine, Engine]) -> None:
+        sync_engine = getattr(engine, "sync_engine", engine)
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def _started(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                context.tracker_started = perf_counter()
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def _finished(conn, cursor, statement, parameters, context, executemany):
+            if context is None:
+                return
+            elapsed = perf_counter() - context.tracker_started
+            queries = _current.get()
+            if queries is not None:
+                queries.count += 1
+                queries.seconds += elapsed
+                queries.statements[statement] += 1
+            if elapsed >= self.slow_query_seconds:
+                logger.warning(
+                    "Slow query %.1fms: %s params=%s",
+                    elapsed * 1000,
+                    _one_line(statement),
+                    parameter_shape(parameters, executemany),
+                )
+
+    def add_listener(self, listener: Callable[[str, RequestQueries], None]) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, RequestQueries], None]) -> None:
+        self._listeners.remove(listener)
+
+    @contextmanager
+    def track(self) -> Iterator[RequestQueries]:
+        """Attribute the statements run inside the block to a new request."""
+        queries = RequestQueries()
+        token = _current.set(queries)
+        try:
+            yield queries
+        finally:
+            _current.reset(token)
+
+    def finish(self, endpoint: str, queries: RequestQueries) -> None:
+        if queries.count > self.max_statements:
+            statement, repeats = queries.most_repeated()
+            logger.warning(
+                "%s ran %d SQL statements (limit %d); most repeated, %d times: %s",
+                endpoint,
+                queries.count,
+                self.max_statements,
+                repeats,
+                _one_line(statement),
+            )
+        for listener in self._listeners:
+            listener(endpoint, queries)
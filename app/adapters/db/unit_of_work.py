@@ -0,0 +1,112 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.domain.repository.unit_of_work import UnitOfWork
+
+# the session of the unit of work open in this task, if any
+_current_session: ContextVar[Optional[AsyncSession]] = ContextVar(
+    "unit_of_work_session", default=None
+)
+_OWNED_BY_UNIT_OF_WORK = "unit_of_work"
+_AFTER_COMMIT = "after_commit"
+
+
+@asynccontextmanager
+async def session_scope(
+    sessionmaker: async_sessionmaker[AsyncSession],
+) -> AsyncIterator[AsyncSession]:
+    """
+    The session of the open unit of work when it uses the same engine as
+    ``sessionmaker``, otherwise a session of its own, closed on exit.
+    """
+    session = _current_session.get()
+    if session is not None and session.bind is sessionmaker.kw.get("bind"):
+        yield session
+        return
+    async with sessionmaker() as session:
+        yield session
+
+
+async def commit(session: AsyncSession) -> None:
+    """Commit a repository's own session; a unit of work is committed by its owner."""
+    if not session.info.get(_OWNED_BY_UNIT_OF_WORK):
+        await session.commit()
+
+
+def on_commit(callback: Callable[[], None]) -> None:
+    """
+    Run ``callback`` once the open unit of work commits, or right away when
+    none is open (each repository call then commits on its own). Dropped if
+    the unit of work rolls back, fails to commit or is left uncommitted.
+    """
+    session = _current_session.get()
+    if session is None:
+        callback()
+        return
+    session.info.setdefault(_AFTER_COMMIT, []).append(callback)
+
+
+def in_unit_of_work() -> bool:
+    """Whether a unit of work is open in this task."""
+    return _current_session.get() is not None
+
+
+def writes_pending() -> bool:
+    """Whether the open unit of work made writes that await ``on_commit``."""
+    session = _current_session.get()
+    return session is not None and bool(session.info.get(_AFTER_COMMIT))
+
+
+class SqlAlchemyUnitOfWork(UnitOfWork):
+    """
+    One ``AsyncSession`` shared, through a context variable, by every
+    SQLAlchemy repository call made while it is open: a request checks out
+    one pooled connection, lazily, and runs one transaction. Nested units of
+    work join the outer one, which alone commits or rolls back.
+    """
+
+    def __init__(self, sessionmaker: async_sessionmaker[AsyncSession]):
+        self._sessionmaker = sessionmaker
+        self._session: Optional[AsyncSession] = None
+        self._outer: Optional[AsyncSession] = None
+
+    async def __aenter__(self) -> "SqlAlchemyUnitOfWork":
+        self._outer = _current_session.get()
+        if self._outer is None:
+            self._session = self._sessionmaker()
+            self._session.info[_OWNED_BY_UNIT_OF_WORK] = True
+            _current_session.set(self._session)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._session is None:
+            return
+        try:
+            # anything not committed explicitly is discarded
+            self._session.info.pop(_AFTER_COMMIT, None)
+            await self._session.close()
+        finally:
+            _current_session.set(self._outer)
+            self._session = None
+
+    async def commit(self) -> None:
+        if self._session is None:
+            return
+        try:
+            await self._session.commit()
+        except BaseException:
+            self._session.info.pop(_AFTER_COMMIT, None)
+            raise
+        callbacks: List[Callable[[], None]] = self._session.info.pop(
+            _AFTER_COMMIT, []
+        )
+        for callback in callbacks:
+            callback()
+
+    async def rollback(self) -> None:
+        if self._session is not None:
+            self._session.info.pop(_AFTER_COMMIT, None)
+            await self._session.rollback()
@@ -0,0 +1,233 @@
+import asyncio
+import importlib.util
+import logging
+import random
+import time
+from typing import AsyncIterator, Callable, Dict, FrozenSet, List, Optional
+
+import httpcore
+import httpx
+
+from app.services.metrics import Counter, Gauge, Metric, MetricsRegistry
+
+IDEMPOTENT_METHODS: FrozenSet[str] = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES: FrozenSet[int] = frozenset({429, 502, 503, 504})
+
+logger = logging.getLogger(__name__)
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body wrapper that frees the host slot once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+def _connection_pool(
+    transport: httpx.AsyncBaseTransport,
+) -> Optional[httpcore.AsyncConnectionPool]:
+    # httpx keeps its httpcore pool private; tests/test_http_client.py fails
+    # if an upgrade moves it, rather than the gauges silently reading zero
+    pool = getattr(transport, "_pool", None)
+    return pool if isinstance(pool, httpcore.AsyncConnectionPool) else None
+
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps a connection-pooling transport with a per-host concurrency cap and
+    retries (jittered exponential backoff) for idempotent requests that fail
+    with a transport error or a retryable status. Keeps pool statistics.
+    """
+
+    def __init__(
+        self,
+        inner: httpx.AsyncBaseTransport,
+        per_host_limit: int = 10,
+        retries: int = 2,
+        backoff_base: float = 0.1,
+        backoff_max: float = 2.0,
+    ):
+        self._inner = inner
+        self._pool = _connection_pool(inner)
+        self.per_host_limit = per_host_limit
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self.requests_total = 0
+        self.retries_total = 0
+        self.in_flight = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _backoff(self, attempt: int) -> float:
+        # "full jitter": uniform in [0, min(max, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        sem = self._hosts.get(host)
+        if sem is None:
+            sem = self._hosts[host] = asyncio.Semaphore(self.per_host_limit)
+
+        started = time.perf_counter()
+        await sem.acquire()
+        waited = time.perf_counter() - started
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        self.requests_total += 1
+        self.in_flight += 1
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.in_flight -= 1
+                sem.release()
+
+        try:
+            response = await self._send_with_retries(request)
+        except BaseException:
+            release()
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, release),  # type: ignore[arg-type]
+            extensions=response.extensions,
+        )
+
+    async def _send_with_retries(self, request: httpx.Request) -> httpx.Response:
+        retryable = request.method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            try:
+                response = await self._inner.handle_async_request(request)
+            except httpx.TransportError as exc:
+                if not retryable or attempt >= self.retries:
+                    raise
+                logger.debug("Retrying %s %s after %r", request.method, request.url, exc)
+            else:
+                if (
+                    response.status_code not in RETRY_STATUSES
+                    or not retryable
+                    or attempt >= self.retries
+                ):
+                    return response
+                await response.aclose()
+                logger.debug(
+                    "Retrying %s %s after status %s",
+                    request.method,
+                    request.url,
+                    response.status_code,
+                )
+            self.retries_total += 1
+            await asyncio.sleep(self._backoff(attempt))
+            attempt += 1
+
+    def stats(self) -> Dict[str, float]:
+        stats = {
+            "in_flight": self.in_flight,
+            "requests_total": self.requests_total,
+            "retries_total": self.retries_total,
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_max": self.wait_seconds_max,
+        }
+        # no connection counts for transports without a pool (mocks)
+        if self._pool is not None:
+            connections = self._pool.connections
+            idle = sum(1 for c in connections if c.is_idle())
+            stats.update(
+                connections=len(connections),
+                idle=idle,
+                in_use=len(connections) - idle,
+            )
+        return stats
+
+    def collect(self) -> List[Metric]:
+        """The statistics as metrics, for a MetricsRegistry collector."""
+        stats = self.stats()
+        metrics: List[Metric] = []
+        if "idle" in stats:
+            connections = Gauge(
+                "http_client_connections",
+                "Outbound pooled connections, in use or idle.",
+                ("state",),
+            )
+            connections.labels("in_use").set(stats["in_use"])
+            connections.labels("idle").set(stats["idle"])
+            metrics.append(connections)
+        in_flight = Gauge(
+            "http_client_requests_in_flight", "Outbound requests holding a host slot."
+        )
+        in_flight.set(stats["in_flight"])
+        requests = Counter("http_client_requests_total", "Outbound requests sent.")
+        requests.inc(stats["requests_total"])
+        retries = Counter("http_client_retries_total", "Outbound requests retried.")
+        retries.inc(stats["retries_total"])
+        wait = Counter(
+            "http_client_host_slot_wait_seconds_total",
+            "Time outbound requests waited for a per-host slot; "
+            "the connection pool checkout is not included.",
+        )
+        wait.inc(stats["wait_seconds_total"])
+        wait_max = Gauge(
+            "http_client_host_slot_wait_seconds_max",
+            "Longest wait for a per-host slot since startup.",
+        )
+        wait_max.set(stats["wait_seconds_max"])
+        return metrics + [in_flight, requests, retries, wait, wait_max]
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+def build_http_client(
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    keepalive_expiry: float = 30.0,
+    per_host_limit: int = 10,
+    retries: int = 2,
+    backoff_base: float = 0.1,
+    backoff_max: float = 2.0,
+    timeout: float = 10.0,
+    http2: bool = False,
+    metrics: Optional[MetricsRegistry] = None,
+) -> httpx.AsyncClient:
+    """
+    Build the process-wide outbound client shared by the HTTP adapters. Its
+    pool statistics are reported on every scrape of ``metrics`` when given.
+    """
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP/2 requested but the 'h2' package is missing; using HTTP/1.1")
+        http2 = False
+    inner = httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        http2=http2,
+    )
+    transport = PooledTransport(
+        inner,
+        per_host_limit=per_host_limit,
+        retries=retries,
+        backoff_base=backoff_base,
+        backoff_max=backoff_max,
+    )
+    if metrics is not None:
+        metrics.add_collector(transport.collect)
+    return httpx.AsyncClient(transport=transport, timeout=timeout)
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from app.adapters.cache.single_flight import SingleFlight
+from app.domain.git_repo import GitRepo
+from app.domain.repository.git_repository import GitRepository
+
+
+class CachedGitRepository(GitRepository):
+    """
+    Decorator over another GitRepository that keeps the last result for
+    ``ttl`` seconds. After that the stale result is still served for up to
+    ``max_stale`` more seconds while one background refresh revalidates it;
+    concurrent refreshes are coalesced so only one upstream call is in flight.
+    """
+
+    def __init__(
+        self,
+        inner: GitRepository,
+        ttl: float = 60.0,
+        max_stale: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._inner = inner
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._clock = clock
+        self._entry: Optional[Tuple[float, List[GitRepo]]] = None
+        self._flight = SingleFlight()
+        self._background: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    def cache_stats(self) -> Dict[str, float]:
+        # a stale answer is still served from memory
+        served = self.hits + self.stale_hits
+        lookups = served + self.misses
+        return {
+            "hits": served,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": served / lookups if lookups else 0.0,
+        }
+
+    async def list_repos(self) -> List[GitRepo]:
+        entry = self._entry
+        if entry is not None:
+            age = self._clock() - entry[0]
+            if age < self.ttl:
+                self.hits += 1
+                return entry[1]
+            if age < self.ttl + self.max_stale:
+                self.stale_hits += 1
+                self._refresh_in_background()
+                return entry[1]
+        self.misses += 1
+        return await self._refresh()
+
+    async def _refresh(self) -> List[GitRepo]:
+        return await self._flight.do("repos", self._load)
+
+    async def _load(self) -> List[GitRepo]:
+        repos = await self._inner.list_repos()
+        self._entry = (self._clock(), repos)
+        return repos
+
+    def _refresh_in_background(self) -> None:
+        if self._flight.in_flight("repos"):
+            return
+        task = asyncio.create_task(self._refresh())
+        self._background.add(task)
+        task.add_done_callback(self._refresh_done)
+
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self._logger.warning("Background refresh failed: %s", task.exception())
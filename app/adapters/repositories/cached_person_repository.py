@@ -0,0 +1,153 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from uuid import UUID
+from app.adapters.cache.single_flight import SingleFlight
+from app.adapters.cache.ttl_cache import TTLCache
+from app.adapters.db.unit_of_work import in_unit_of_work, on_commit, writes_pending
+from app.domain.exceptions import ConcurrencyConflict
+from app.domain.person import Person
+from app.domain.person_query import PersonQuery
+from app.domain.person_stats import PersonStats
+from app.domain.repository.person_repository import PersonRepository
+
+
+class CachedPersonRepository(PersonRepository):
+    """
+    Read-through cache for ``get_by_id`` over another PersonRepository.
+    Persons are immutable, so cached entries can be shared safely. Writes go
+    to the wrapped repository first and replace (or drop) the cached entry
+    once they are committed: inside a unit of work, after its commit, so no
+    uncommitted value is served and no read racing the write keeps the old
+    one. Concurrent misses for the same id share one load, except inside a
+    unit of work: there a miss reads through its session, so a request
+    checks out a single connection, and what it read is cached only if the
+    unit of work has written no person yet. Reads for a
+    write (``get_for_update``) bypass the cache and drop its entry, as does
+    a write that hit a version conflict.
+
+    With a ``stats_cache``, ``stats`` results are kept too (use a short TTL:
+    only writes through this process clear it).
+    """
+
+    def __init__(
+        self,
+        inner: PersonRepository,
+        cache: TTLCache[UUID, Person],
+        stats_cache: Optional[TTLCache[Tuple[int, int], PersonStats]] = None,
+    ):
+        self._inner = inner
+        self._cache = cache
+        self._stats = stats_cache
+        self._flight = SingleFlight()
+        # bumped by every committed write so a load that raced with it is not cached
+        self._writes = 0
+        self.coalesced = 0
+
+    def cache_stats(self) -> Dict[str, float]:
+        return {**self._cache.stats(), "coalesced": self.coalesced}
+
+    def _changed(self) -> None:
+        self._writes += 1
+        if self._stats is not None:
+            self._stats.clear()
+
+    def _store(self, person: Person) -> None:
+        self._changed()
+        self._cache.set(person.id, person)
+
+    def _invalidate(self, person_id: UUID) -> None:
+        self._changed()
+        self._cache.pop(person_id)
+
+    async def add(self, person: Person) -> Person:
+        created = await self._inner.add(person)
+        on_commit(lambda: self._store(created))
+        return created
+
+    async def add_many(self, persons: List[Person]) -> int:
+        added = await self._inner.add_many(persons)
+        on_commit(self._changed)
+        return added
+
+    async def get_by_id(self, person_id: UUID) -> Optional[Person]:
+        cached = self._cache.get(person_id)
+        if cached is not None:
+            return cached
+        if in_unit_of_work():
+            return await self._load(person_id, cache=not writes_pending())
+        if self._flight.in_flight(person_id):
+            self.coalesced += 1
+        return await self._flight.do(person_id, lambda: self._load(person_id))
+
+    async def get_for_update(self, person_id: UUID) -> Optional[Person]:
+        # the entry may be what made the caller write: drop it, the write
+        # (or the next read) caches the current row
+        self._cache.pop(person_id)
+        return await self._inner.get_for_update(person_id)
+
+    async def _load(self, person_id: UUID, cache: bool = True) -> Optional[Person]:
+        writes = self._writes
+        person = await self._inner.get_by_id(person_id)
+        if cache and person is not None and writes == self._writes:
+            self._cache.set(person_id, person)
+        return person
+
+    async def list(
+        self, limit: Optional[int] = None, after: Optional[UUID] = None
+    ) -> List[Person]:
+        return await self._inner.list(limit=limit, after=after)
+
+    async def find(self, query: PersonQuery) -> List[Person]:
+        return await self._inner.find(query)
+
+    async def stats(self, bucket_width: int = 10, top_domains: int = 10) -> PersonStats:
+        if self._stats is None:
+            return await self._inner.stats(bucket_width, top_domains)
+        key = (bucket_width, top_domains)
+        cached = self._stats.get(key)
+        if cached is not None:
+            return cached
+        return await self._flight.do(("stats", key), lambda: self._load_stats(key))
+
+    async def _load_stats(self, key: Tuple[int, int]) -> PersonStats:
+        writes = self._writes
+        stats = await self._inner.stats(*key)
+        if writes == self._writes:
+            self._stats.set(key, stats)
+        return stats
+
+    def stream(
+        self, after: Optional[UUID] = None, chunk_size: int = 500
+    ) -> AsyncIterator[List[Person]]:
+        return self._inner.stream(after=after, chunk_size=chunk_size)
+
+    async def update(self, person: Person) -> Person:
+        updated = await self._inner.update(person)
+        on_commit(lambda: self._store(updated))
+        return updated
+
+    async def update_fields(
+        self,
+        person_id: UUID,
+        changes: Dict[str, Any],
+        expected_version: Optional[int] = None,
+    ) -> Optional[Person]:
+        try:
+            updated = await self._inner.update_fields(
+                person_id, changes, expected_version=expected_version
+            )
+        except ConcurrencyConflict:
+            self._invalidate(person_id)
+            raise
+        if updated is None:
+            # missing or changed elsewhere: whatever is cached is stale
+            self._invalidate(person_id)
+        else:
+            on_commit(lambda: self._store(updated))
+        return updated
+
+    async def delete(self, person_id: UUID) -> None:
+        await self._inner.delete(person_id)
+        on_commit(lambda: self._invalidate(person_id))
+
+    async def change_counter(self) -> Optional[int]:
+        return await self._inner.change_counter()
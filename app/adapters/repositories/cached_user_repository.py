@@ -0,0 +1,99 @@
+import logging
+from datetime import datetime
+from typing import Dict, Hashable, List, Optional, Tuple
+from uuid import UUID
+from app.adapters.cache.revoked_token_index import RevokedTokenIndex
+from app.adapters.cache.ttl_cache import TTLCache
+from app.domain.repository.user_repository import UserRepository
+from app.domain.user import User
+
+
+class CachedUserRepository(UserRepository):
+    """
+    Decorator over another UserRepository that serves the per-request identity
+    lookups from memory:
+
+    - revocation checks come from a RevokedTokenIndex. ``load`` rebuilds it
+      from the wrapped repository (at startup, and periodically so
+      revocations made by other workers are picked up).
+    - users are kept in a TTLCache under both ("email", ...) and ("id", ...)
+      keys, and invalidated on create and deactivate.
+
+    The wrapped repository stays the source of truth.
+    """
+
+    def __init__(
+        self,
+        inner: UserRepository,
+        revocations: Optional[RevokedTokenIndex] = None,
+        users: Optional[TTLCache[Hashable, User]] = None,
+    ):
+        self._inner = inner
+        self._revocations = revocations
+        self._users = users
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    def cache_stats(self) -> Dict[str, float]:
+        return self._users.stats() if self._users is not None else {}
+
+    async def load(self) -> None:
+        if self._revocations is None:
+            return
+        self._revocations.update(await self._inner.list_revoked_tokens())
+        self._logger.debug("Revocation index loaded: %d tokens", len(self._revocations))
+
+    def _remember(self, user: User) -> None:
+        if self._users is not None:
+            self._users.set(("email", user.email), user)
+            self._users.set(("id", user.id), user)
+
+    def _forget(self, user: User) -> None:
+        if self._users is not None:
+            self._users.pop(("email", user.email))
+            self._users.pop(("id", user.id))
+
+    async def create(self, user: User) -> User:
+        self._forget(user)
+        return await self._inner.create(user)
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        if self._users is not None:
+            cached = self._users.get(("email", email))
+            if cached is not None:
+                return cached
+        user = await self._inner.get_by_email(email)
+        if user is not None:
+            self._remember(user)
+        return user
+
+    async def get_by_id(self, user_id: UUID) -> Optional[User]:
+        if self._users is not None:
+            cached = self._users.get(("id", user_id))
+            if cached is not None:
+                return cached
+        user = await self._inner.get_by_id(user_id)
+        if user is not None:
+            self._remember(user)
+        return user
+
+    async def deactivate(self, user_id: UUID) -> Optional[User]:
+        user = await self._inner.deactivate(user_id)
+        if user is not None:
+            self._forget(user)
+        return user
+
+    async def add_revoked_token(self, jti: str, expires_at: datetime) -> None:
+        await self._inner.add_revoked_token(jti, expires_at)
+        if self._revocations is not None:
+            self._revocations.add(jti, expires_at)
+
+    async def is_token_revoked(self, jti: str) -> bool:
+        if self._revocations is None:
+            return await self._inner.is_token_revoked(jti)
+        return self._revocations.contains(jti)
+
+    async def list_revoked_tokens(self) -> List[Tuple[str, datetime]]:
+        return await self._inner.list_revoked_tokens()
+
+    async def purge_expired_tokens(self, batch_size: int = 1000) -> int:
+        return await self._inner.purge_expired_tokens(batch_size)
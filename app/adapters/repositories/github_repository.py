@@ -1,22 +1,95 @@
+import asyncio
 import logging
-from typing import List
+import re
+from typing import Any, Dict, List, Optional, Tuple
 import httpx
 from app.domain.repository.git_repository import GitRepository
 from app.domain.git_repo import GitRepo
 
+_LINK_RE = re.compile(r'<([^>]+)>;\s*rel="([^"]+)"')
+
+
+def _parse_link_header(value: Optional[str]) -> Dict[str, str]:
+    if not value:
+        return {}
+    return {rel: url for url, rel in _LINK_RE.findall(value)}
+
 
 class GitHubRepository(GitRepository):
-    def __init__(self, repos_url: str = "https://api.github.com/users/mrgadotti/repos"):
+    def __init__(
+        self,
+        repos_url: str = "https://api.github.com/users/mrgadotti/repos",
+        client: Optional[httpx.AsyncClient] = None,
+        per_page: int = 100,
+    ):
         self.repos_url = repos_url
+        self.per_page = per_page
+        self._client = client
+        # url -> (etag, items, links) for conditional requests
+        self._etags: Dict[
+            str, Tuple[str, List[Dict[str, Any]], Dict[str, str]]
+        ] = {}
         self._logger = logging.getLogger(self.__class__.__name__)
 
     async def list_repos(self) -> List[GitRepo]:
         self._logger.debug("Fetching GitHub repos from %s", self.repos_url)
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(
-                self.repos_url,
-                headers={"Accept": "application/vnd.github+json"},
-            )
+        if self._client is not None:
+            payload = await self._fetch_all(self._client)
+        else:
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                payload = await self._fetch_all(client)
+
+        repos: List[GitRepo] = []
+        for item in payload:
+            name = item.get("name")
+            full_name = item.get("full_name")
+            if name is None or full_name is None:
+                continue
+            repos.append(GitRepo(name=name, full_name=full_name))
+
+        self._logger.info("GitHub repos fetched: %d", len(repos))
+        return repos
+
+    async def _fetch_all(self, client: httpx.AsyncClient) -> List[Dict[str, Any]]:
+        first_url = str(
+            httpx.URL(self.repos_url).copy_merge_params({"per_page": self.per_page})
+        )
+        first_items, links = await self._fetch_page(client, first_url)
+        # cached page payloads are shared: build a new list instead of extending them
+        items = list(first_items)
+        last = links.get("last")
+        if last:
+            # "last" tells us every page url up front: fetch them concurrently
+            last_url = httpx.URL(last)
+            last_page = int(last_url.params.get("page", "1"))
+            urls = [
+                str(last_url.copy_set_param("page", page))
+                for page in range(2, last_page + 1)
+            ]
+            pages = await asyncio.gather(*(self._fetch_page(client, u) for u in urls))
+            for page_items, _ in pages:
+                items.extend(page_items)
+            return items
+        next_url = links.get("next")
+        while next_url:
+            page_items, links = await self._fetch_page(client, next_url)
+            items.extend(page_items)
+            next_url = links.get("next")
+        return items
+
+    async def _fetch_page(
+        self, client: httpx.AsyncClient, url: str
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        headers = {"Accept": "application/vnd.github+json"}
+        cached = self._etags.get(url)
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+        response = await client.get(url, headers=headers)
+        links = _parse_link_header(response.headers.get("Link"))
+
+        if response.status_code == 304 and cached is not None:
+            self._logger.debug("GitHub page not modified: %s", url)
+            return cached[1], links or cached[2]
 
         if response.status_code != 200:
             self._logger.warning(
@@ -29,13 +102,7 @@ class GitHubRepository(GitRepository):
             )
 
         payload = response.json()
-        repos: List[GitRepo] = []
-        for item in payload:
-            name = item.get("name")
-            full_name = item.get("full_name")
-            if name is None or full_name is None:
-                continue
-            repos.append(GitRepo(name=name, full_name=full_name))
-
-        self._logger.info("GitHub repos fetched: %d", len(repos))
-        return repos
+        etag = response.headers.get("ETag")
+        if etag:
+            self._etags[url] = (etag, payload, links)
+        return payload, links
@@ -1,34 +1,526 @@
-from typing import Dict, List, Optional
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from itertools import accumulate
+from dataclasses import replace
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 from uuid import UUID
+from app.domain.exceptions import ConcurrencyConflict
 from app.domain.person import Person
+from app.domain.person_query import SORT_FIELDS, PersonQuery
+from app.domain.person_stats import PersonStats
 from app.domain.repository.person_repository import PersonRepository
 import asyncio
+import heapq
+import json
+import os
+
+SNAPSHOT_FORMAT = 1
+
+
+# keys per chunk of a sorted index: a write copies one chunk, at most twice this
+_CHUNK_SIZE = 512
+# persons and email domains are split into this many dicts by key hash
+_SHARDS = 256
+
+
+class _SortedKeys:
+    """
+    Immutable sorted list of index keys, stored as chunks of up to
+    ``2 * _CHUNK_SIZE`` keys. An update copies only the chunks it touches
+    and the chunk table; every other chunk is shared with the version it
+    was made from, so single-row writes cost the same at any store size.
+    """
+
+    __slots__ = ("_chunks", "_maxes", "_offsets", "_len")
+
+    def __init__(self, chunks: List[List[tuple]], maxes: List[tuple]):
+        self._chunks = chunks
+        self._maxes = maxes
+        # start position of every chunk; the last entry is the total length
+        self._offsets = list(accumulate(map(len, chunks), initial=0))
+        self._len = self._offsets.pop()
+
+    @classmethod
+    def from_sorted(cls, keys: Sequence[tuple]) -> "_SortedKeys":
+        chunks = [
+            list(keys[i : i + _CHUNK_SIZE]) for i in range(0, len(keys), _CHUNK_SIZE)
+        ]
+        return cls(chunks, [chunk[-1] for chunk in chunks])
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[tuple]:
+        for chunk in self._chunks:
+            yield from chunk
+
+    def bisect_left(self, key: tuple) -> int:
+        i = bisect_left(self._maxes, key)
+        if i == len(self._chunks):
+            return self._len
+        return self._offsets[i] + bisect_left(self._chunks[i], key)
+
+    def bisect_right(self, key: tuple) -> int:
+        i = bisect_right(self._maxes, key)
+        if i == len(self._chunks):
+            return self._len
+        return self._offsets[i] + bisect_right(self._chunks[i], key)
+
+    def irange(self, lo: int, hi: int, reverse: bool = False) -> Iterator[tuple]:
+        """The keys at positions ``lo`` to ``hi - 1``, last first if ``reverse``."""
+        hi = min(hi, self._len)
+        if lo >= hi:
+            return
+        first = bisect_right(self._offsets, lo) - 1
+        last = bisect_right(self._offsets, hi - 1) - 1
+        for i in range(last, first - 1, -1) if reverse else range(first, last + 1):
+            chunk = self._chunks[i]
+            a = max(lo - self._offsets[i], 0)
+            b = min(hi - self._offsets[i], len(chunk))
+            yield from (
+                chunk[j] for j in (range(b - 1, a - 1, -1) if reverse else range(a, b))
+            )
+
+    def updated(
+        self, insert: Sequence[tuple], remove: Sequence[tuple]
+    ) -> "_SortedKeys":
+        """A new version with ``remove`` (all present) gone and ``insert`` added."""
+        if (len(insert) + len(remove)) * 8 > self._len:
+            # a large share of the index changes: one merge beats many inserts
+            gone = set(remove)
+            kept = (key for key in self if key not in gone)
+            return _SortedKeys.from_sorted(list(heapq.merge(kept, sorted(insert))))
+        chunks = list(self._chunks)
+        maxes = list(self._maxes)
+        fresh: Set[int] = set()  # ids of the chunks copied for this version
+
+        def writable(i: int) -> List[tuple]:
+            if id(chunks[i]) not in fresh:
+                chunks[i] = list(chunks[i])
+                fresh.add(id(chunks[i]))
+            return chunks[i]
+
+        for key in remove:
+            i = bisect_left(maxes, key)
+            chunk = writable(i)
+            del chunk[bisect_left(chunk, key)]
+            if len(chunk) < _CHUNK_SIZE // 8 and len(chunks) > 1:
+                # fold a shrunken chunk into its neighbour
+                j = i + 1 if i + 1 < len(chunks) else i - 1
+                a, b = min(i, j), max(i, j)
+                merged = chunks[a] + chunks[b]
+                fresh.add(id(merged))
+                chunks[a : b + 1] = [merged]
+                maxes[a : b + 1] = [merged[-1]]
+                i, chunk = a, merged
+            if chunk:
+                maxes[i] = chunk[-1]
+            else:
+                del chunks[i], maxes[i]
+        for key in insert:
+            if not chunks:
+                chunks.append([key])
+                maxes.append(key)
+                fresh.add(id(chunks[0]))
+                continue
+            i = min(bisect_left(maxes, key), len(chunks) - 1)
+            chunk = writable(i)
+            insort(chunk, key)
+            maxes[i] = chunk[-1]
+            if len(chunk) > 2 * _CHUNK_SIZE:
+                halves = [chunk[:_CHUNK_SIZE], chunk[_CHUNK_SIZE:]]
+                fresh.update(map(id, halves))
+                chunks[i : i + 1] = halves
+                maxes[i : i + 1] = [half[-1] for half in halves]
+        return _SortedKeys(chunks, maxes)
+
+
+class _ShardedDict:
+    """
+    Immutable mapping split into ``_SHARDS`` dicts by key hash; an update
+    copies only the shards it touches and the shard table.
+    """
+
+    __slots__ = ("_shards", "_len")
+
+    def __init__(self, shards: Optional[List[dict]] = None, length: int = 0):
+        self._shards = shards if shards is not None else [{} for _ in range(_SHARDS)]
+        self._len = length
+
+    def __len__(self) -> int:
+        return self._len
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        return self._shards[hash(key) % _SHARDS].get(key, default)
+
+    def values(self) -> Iterator[Any]:
+        for shard in self._shards:
+            yield from shard.values()
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        for shard in self._shards:
+            yield from shard.items()
+
+    def updated(
+        self,
+        set_items: Iterable[Tuple[Hashable, Any]] = (),
+        delete: Iterable[Hashable] = (),
+    ) -> "_ShardedDict":
+        shards = list(self._shards)
+        fresh: Set[int] = set()
+        length = self._len
+
+        def writable(key: Hashable) -> dict:
+            i = hash(key) % _SHARDS
+            if i not in fresh:
+                shards[i] = dict(shards[i])
+                fresh.add(i)
+            return shards[i]
+
+        for key in delete:
+            if writable(key).pop(key, _MISSING) is not _MISSING:
+                length -= 1
+        for key, value in set_items:
+            shard = writable(key)
+            length += key not in shard
+            shard[key] = value
+        return _ShardedDict(shards, length)
+
+
+_MISSING = object()
+
+
+def _prefix_range(index: _SortedKeys, prefix: str) -> Tuple[int, int]:
+    # keys are (True, email, id): every email starting with prefix is contiguous
+    return (
+        index.bisect_left((True, prefix)),
+        index.bisect_left((True, prefix + "\U0010ffff")),
+    )
+
+
+def _keys(person: Person) -> Iterable[Tuple[str, tuple]]:
+    for field in SORT_FIELDS:
+        yield field, PersonQuery.order_key(getattr(person, field), person.id)
+
+
+def _domain(person: Person) -> str:
+    return person.email.partition("@")[2]
+
+
+class _State:
+    """
+    One consistent version of the store: persons by id, a sorted
+    ``PersonQuery.order_key`` index per sort field and the counts behind
+    ``stats``. A published state is never modified again, so readers need
+    no lock, even across awaits; ``changed`` builds the next version,
+    sharing everything a write does not touch.
+    """
+
+    __slots__ = ("persons", "indexes", "ages", "domains", "changes")
+
+    def __init__(
+        self,
+        persons: Optional[_ShardedDict] = None,
+        indexes: Optional[Dict[str, _SortedKeys]] = None,
+        ages: Optional[Counter] = None,
+        domains: Optional[_ShardedDict] = None,
+        changes: int = 0,
+    ) -> None:
+        self.persons = persons if persons is not None else _ShardedDict()
+        self.indexes = indexes or {f: _SortedKeys([], []) for f in SORT_FIELDS}
+        self.ages: Counter = ages if ages is not None else Counter()
+        self.domains = domains if domains is not None else _ShardedDict()
+        self.changes = changes
+
+    @classmethod
+    def build(cls, persons: Iterable[Person], changes: int = 0) -> "_State":
+        state = cls().changed(put=list(persons))
+        state.changes = changes
+        return state
+
+    def changed(
+        self, put: Sequence[Person] = (), remove: Sequence[Person] = ()
+    ) -> "_State":
+        """The next version: ``remove`` gone, ``put`` added or replacing."""
+        batch = {p.id: p for p in put}
+        # replaced persons leave first
+        outgoing = [p for p in remove if p.id not in batch]
+        outgoing += [e for e in map(self.persons.get, batch) if e is not None]
+        incoming = list(batch.values())
+
+        # distinct ages are few: a copy of the counter is cheap
+        ages = Counter(self.ages)
+        domain_delta: Counter = Counter()
+        for person in outgoing:
+            ages[person.age] -= 1
+            domain_delta[_domain(person)] -= 1
+        for person in incoming:
+            ages[person.age] += 1
+            domain_delta[_domain(person)] += 1
+        counts = {d: self.domains.get(d, 0) + n for d, n in domain_delta.items()}
+        domains = self.domains.updated(
+            set_items=((d, n) for d, n in counts.items() if n),
+            delete=(d for d, n in counts.items() if not n),
+        )
+
+        old_keys: Dict[str, List[tuple]] = {f: [] for f in SORT_FIELDS}
+        new_keys: Dict[str, List[tuple]] = {f: [] for f in SORT_FIELDS}
+        for person in outgoing:
+            for field, key in _keys(person):
+                old_keys[field].append(key)
+        for person in incoming:
+            for field, key in _keys(person):
+                new_keys[field].append(key)
+        return _State(
+            persons=self.persons.updated(
+                set_items=batch.items(), delete=(p.id for p in remove)
+            ),
+            indexes={
+                f: index.updated(new_keys[f], old_keys[f])
+                for f, index in self.indexes.items()
+            },
+            ages=+ages,
+            domains=domains,
+            changes=self.changes,
+        )
+
+
+def _write_snapshot(path: str, state: _State) -> None:
+    rows = [
+        [p.id.hex, p.name, p.email, p.age, p.version] for p in state.persons.values()
+    ]
+    payload = {"format": SNAPSHOT_FORMAT, "changes": state.changes, "persons": rows}
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+    # readers of ``path`` see the old snapshot or the new one, never half of it
+    os.replace(tmp, path)
+
+
+def _read_snapshot(path: str) -> Optional[_State]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+    except FileNotFoundError:
+        return None
+    if payload.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported person snapshot format in {path}")
+    return _State.build(
+        (
+            Person(id=UUID(hex=i), name=n, email=e, age=a, version=v)
+            for i, n, e, a, v in payload["persons"]
+        ),
+        changes=payload["changes"],
+    )
 
 
 class InMemoryPersonRepository(PersonRepository):
+    """
+    PersonRepository kept entirely in memory, with sorted indexes for every
+    sort order and copy-on-write states: reads and streams never wait for a
+    writer. States share their unchanged chunks and shards, so a single-row
+    write copies a few small pieces whatever the store size.
+    ``save_snapshot``/``load_snapshot`` persist it to disk.
+    """
+
     def __init__(self):
-        self._store: Dict[UUID, Person] = {}
-        # simple lock for concurrency safety in async env
+        self._state = _State()
+        # serializes writers only; readers use the last published state
         self._lock = asyncio.Lock()
+        self._saved_changes: Optional[int] = None
+
+    def _publish(
+        self, put: Iterable[Person] = (), remove: Iterable[Person] = ()
+    ) -> None:
+        state = self._state.changed(put=list(put), remove=list(remove))
+        state.changes += 1
+        self._state = state
+
+    def apply(
+        self,
+        put: Iterable[Person] = (),
+        remove: Iterable[UUID] = (),
+        changes: Optional[int] = None,
+    ) -> None:
+        """
+        Publish writes another store already made, e.g. the primary of a
+        replica. A person older than the stored version is ignored. With
+        ``changes`` the change counter takes that value (the other store's)
+        instead of counting these writes.
+        """
+        state = self._state
+        newer = [
+            p
+            for p in put
+            if (existing := state.persons.get(p.id)) is None
+            or existing.version <= p.version
+        ]
+        gone = [p for p in map(state.persons.get, remove) if p is not None]
+        if changes is not None:
+            state = state.changed(put=newer, remove=gone)
+            state.changes = changes
+            self._state = state
+        elif newer or gone:
+            self._publish(put=newer, remove=gone)
 
     async def add(self, person: Person) -> Person:
         async with self._lock:
-            self._store[person.id] = person
+            self._publish(put=[person])
             return person
 
+    async def add_many(self, persons: List[Person]) -> int:
+        async with self._lock:
+            self._publish(put=persons)
+            return len(persons)
+
     async def get_by_id(self, person_id: UUID) -> Optional[Person]:
-        return self._store.get(person_id)
+        return self._state.persons.get(person_id)
 
-    async def list(self) -> List[Person]:
-        return list(self._store.values())
+    async def list(
+        self, limit: Optional[int] = None, after: Optional[UUID] = None
+    ) -> List[Person]:
+        return await self.find(
+            PersonQuery(limit=limit, after=None if after is None else (after, after))
+        )
+
+    async def find(self, query: PersonQuery) -> List[Person]:
+        state = self._state
+        index = state.indexes[query.sort]
+        lo, hi = 0, len(index)
+        if query.email_prefix:
+            if query.sort == "email":
+                lo, hi = _prefix_range(index, query.email_prefix)
+            else:
+                # narrow down through the email index, then order the candidates
+                emails = state.indexes["email"]
+                start, stop = _prefix_range(emails, query.email_prefix)
+                ids = (k[-1] for k in emails.irange(start, stop))
+                candidates = map(state.persons.get, ids)
+                index = _SortedKeys.from_sorted(
+                    sorted(
+                        PersonQuery.order_key(getattr(p, query.sort), p.id)
+                        for p in candidates
+                    )
+                )
+                hi = len(index)
+        if query.after is not None:
+            key = PersonQuery.order_key(*query.after)
+            if query.descending:
+                hi = min(hi, index.bisect_left(key))
+            else:
+                lo = max(lo, index.bisect_right(key))
+        found: List[Person] = []
+        for key in index.irange(lo, hi, reverse=query.descending):
+            if query.limit is not None and len(found) >= query.limit:
+                break
+            person = state.persons.get(key[-1])
+            if query.matches(person):
+                found.append(person)
+        return found
+
+    async def stats(self, bucket_width: int = 10, top_domains: int = 10) -> PersonStats:
+        # bounded by distinct ages and domains, not by the number of persons
+        state = self._state
+        buckets: Counter = Counter()
+        for age, n in state.ages.items():
+            if age is not None and n:
+                buckets[age // bucket_width * bucket_width] += n
+        domains = heapq.nsmallest(
+            top_domains, state.domains.items(), key=lambda item: (-item[1], item[0])
+        )
+        return PersonStats(
+            total=len(state.persons),
+            null_age=state.ages[None],
+            age_buckets=dict(buckets),
+            bucket_width=bucket_width,
+            top_email_domains=domains,
+        )
+
+    async def stream(
+        self, after: Optional[UUID] = None, chunk_size: int = 500
+    ) -> AsyncIterator[List[Person]]:
+        # the whole stream reads one state, whatever is written meanwhile
+        state = self._state
+        ids = state.indexes["id"]
+        start = 0
+        if after is not None:
+            start = ids.bisect_right(PersonQuery.order_key(after, after))
+        for i in range(start, len(ids), chunk_size):
+            yield [state.persons.get(k[-1]) for k in ids.irange(i, i + chunk_size)]
 
     async def update(self, person: Person) -> Person:
         async with self._lock:
-            if person.id not in self._store:
+            existing = self._state.persons.get(person.id)
+            if existing is None:
                 raise KeyError("Person not found")
-            self._store[person.id] = person
-            return person
+            updated = replace(person, version=existing.version + 1)
+            self._publish(put=[updated])
+            return updated
+
+    async def update_fields(
+        self,
+        person_id: UUID,
+        changes: Dict[str, Any],
+        expected_version: Optional[int] = None,
+    ) -> Optional[Person]:
+        async with self._lock:
+            existing = self._state.persons.get(person_id)
+            if existing is None:
+                return None
+            if not changes:
+                return existing
+            if expected_version is not None and existing.version != expected_version:
+                raise ConcurrencyConflict("Person was modified concurrently")
+            updated = replace(existing, **changes, version=existing.version + 1)
+            self._publish(put=[updated])
+            return updated
 
     async def delete(self, person_id: UUID) -> None:
         async with self._lock:
-            self._store.pop(person_id, None)
+            existing = self._state.persons.get(person_id)
+            if existing is not None:
+                self._publish(remove=[existing])
+
+    async def change_counter(self) -> Optional[int]:
+        return self._state.changes
+
+    async def restore(self, persons: Iterable[Person], changes: int = 0) -> None:
+        """Replace every person at once, e.g. when seeding from another store."""
+        # built off the event loop: it sorts every index from scratch
+        state = await asyncio.to_thread(_State.build, list(persons), changes)
+        async with self._lock:
+            self._state = state
+
+    async def save_snapshot(self, path: str) -> bool:
+        """
+        Write the current state to ``path`` unless nothing changed since the
+        last save or load. Serialization runs in a worker thread.
+        """
+        state = self._state
+        if state.changes == self._saved_changes:
+            return False
+        await asyncio.to_thread(_write_snapshot, path, state)
+        self._saved_changes = state.changes
+        return True
+
+    async def load_snapshot(self, path: str) -> bool:
+        """Replace the contents with the snapshot at ``path``; False without one."""
+        state = await asyncio.to_thread(_read_snapshot, path)
+        if state is None:
+            return False
+        async with self._lock:
+            self._state = state
+            self._saved_changes = state.changes
+        return True
@@ -0,0 +1,151 @@
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from app.adapters.db.unit_of_work import on_commit
+from app.adapters.repositories.in_memory_person_repository import (
+    InMemoryPersonRepository,
+)
+from app.domain.person import Person
+from app.domain.person_query import PersonQuery
+from app.domain.person_stats import PersonStats
+from app.domain.repository.person_repository import PersonRepository
+
+
+class ReplicaPersonRepository(PersonRepository):
+    """
+    Serves reads from an in-memory copy of a primary PersonRepository (the
+    database). Writes go to the primary, in the caller's unit of work, and
+    are applied to the copy once committed, so a worker reads its own
+    writes at once. Reads a write depends on (``get_for_update``) go to the
+    primary: the copy may lag other workers' writes.
+
+    ``sync`` picks up other workers' writes; run it periodically. The
+    primary's change counter moves by one per row written: when it moved
+    by exactly the rows this worker wrote, the copy already holds them;
+    otherwise the copy is reloaded. Until a sync has accounted for local
+    writes the list change counter is unknown (None), so no list ETag can
+    claim a stale state.
+    """
+
+    def __init__(self, primary: PersonRepository, replica: InMemoryPersonRepository):
+        self._primary = primary
+        self._replica = replica
+        # primary change counter the copy reflects; None before the first sync
+        self._synced: Optional[int] = None
+        # rows written through this copy since, which the counter will count
+        self._own_rows = 0
+        # writes applied while a sync reads the primary, replayed on its result
+        self._replay: Optional[List[Tuple[Sequence[Person], Sequence[UUID]]]] = None
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    async def load_snapshot(self, path: str) -> bool:
+        """Start from a snapshot of the copy; ``sync`` reloads it only if outdated."""
+        if not await self._replica.load_snapshot(path):
+            return False
+        self._synced = await self._replica.change_counter()
+        return True
+
+    async def save_snapshot(self, path: str) -> bool:
+        # only a synced copy: its change counter is then the primary's
+        if self._own_rows:
+            return False
+        return await self._replica.save_snapshot(path)
+
+    async def sync(self) -> bool:
+        """Reload the copy if others wrote to the primary since the last sync."""
+        counter = await self._primary.change_counter()
+        # without a change counter (no triggers) every sync reloads
+        if (
+            counter is not None
+            and self._synced is not None
+            and counter == self._synced + self._own_rows
+        ):
+            if self._own_rows:
+                # only this worker's writes, already applied
+                self._replica.apply(changes=counter)
+                self._synced, self._own_rows = counter, 0
+            return False
+        pending = self._own_rows
+        self._replay = []
+        try:
+            persons = [p async for chunk in self._primary.stream() for p in chunk]
+            await self._replica.restore(persons, changes=counter or 0)
+            for put, remove in self._replay:
+                self._replica.apply(put, remove)
+        finally:
+            self._replay = None
+        self._synced = counter
+        # writes applied while reloading may not be counted yet
+        self._own_rows -= pending
+        self._logger.info("Person replica synced: %d persons", len(persons))
+        return True
+
+    def _apply(
+        self, rows: int, put: Sequence[Person] = (), remove: Sequence[UUID] = ()
+    ) -> None:
+        self._replica.apply(put, remove)
+        self._own_rows += rows
+        if self._replay is not None:
+            self._replay.append((put, remove))
+
+    async def add(self, person: Person) -> Person:
+        created = await self._primary.add(person)
+        on_commit(lambda: self._apply(1, put=[created]))
+        return created
+
+    async def add_many(self, persons: List[Person]) -> int:
+        added = await self._primary.add_many(persons)
+        on_commit(lambda: self._apply(added, put=list(persons)))
+        return added
+
+    async def get_by_id(self, person_id: UUID) -> Optional[Person]:
+        return await self._replica.get_by_id(person_id)
+
+    async def get_for_update(self, person_id: UUID) -> Optional[Person]:
+        return await self._primary.get_for_update(person_id)
+
+    async def list(
+        self, limit: Optional[int] = None, after: Optional[UUID] = None
+    ) -> List[Person]:
+        return await self._replica.list(limit=limit, after=after)
+
+    async def find(self, query: PersonQuery) -> List[Person]:
+        return await self._replica.find(query)
+
+    async def stats(self, bucket_width: int = 10, top_domains: int = 10) -> PersonStats:
+        return await self._replica.stats(bucket_width, top_domains)
+
+    def stream(
+        self, after: Optional[UUID] = None, chunk_size: int = 500
+    ) -> AsyncIterator[List[Person]]:
+        return self._replica.stream(after=after, chunk_size=chunk_size)
+
+    async def update(self, person: Person) -> Person:
+        updated = await self._primary.update(person)
+        on_commit(lambda: self._apply(1, put=[updated]))
+        return updated
+
+    async def update_fields(
+        self,
+        person_id: UUID,
+        changes: Dict[str, Any],
+        expected_version: Optional[int] = None,
+    ) -> Optional[Person]:
+        # the primary decides conflicts: the copy may lag other workers
+        updated = await self._primary.update_fields(
+            person_id, changes, expected_version=expected_version
+        )
+        if updated is not None:
+            on_commit(lambda: self._apply(1, put=[updated]))
+        return updated
+
+    async def delete(self, person_id: UUID) -> None:
+        # one row if there was one to delete; a row missing from the copy
+        # counts none, so the counter moves more than expected and sync reloads
+        rows = int(await self._replica.get_by_id(person_id) is not None)
+        await self._primary.delete(person_id)
+        on_commit(lambda: self._apply(rows, remove=[person_id]))
+
+    async def change_counter(self) -> Optional[int]:
+        return None if self._own_rows else self._synced
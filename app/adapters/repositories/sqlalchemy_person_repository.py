@@ -1,66 +1,250 @@
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
-from sqlalchemy import select, update as sa_update, delete as sa_delete
+from sqlalchemy import (
+    and_,
+    case,
+    column,
+    func,
+    insert,
+    or_,
+    select,
+    text,
+    tuple_,
+    update as sa_update,
+    delete as sa_delete,
+)
+from sqlalchemy.sql import ColumnElement
+from app.domain.exceptions import ConcurrencyConflict
 from app.domain.person import Person
+from app.domain.person_query import PersonQuery
+from app.domain.person_stats import PersonStats
 from app.domain.repository.person_repository import PersonRepository
-from app.adapters.db.models import PersonModel
+from app.adapters.db.mappers import (
+    PERSON_COLUMNS,
+    person_from_row,
+    person_to_row,
+    persons_from_rows,
+)
+from app.adapters.db.models import PersonModel, TableVersionModel
+from app.adapters.db.migrations import NAME_FTS_TABLE
+from app.adapters.db.unit_of_work import commit, session_scope
+
+def _email_prefix(prefix: str) -> ColumnElement[bool]:
+    # a range instead of LIKE so ix_persons_email_id is used (and stays case-sensitive)
+    email = PersonModel.email
+    if not prefix:
+        return email.is_not(None)
+    last = ord(prefix[-1])
+    if last == 0x10FFFF:
+        return and_(email >= prefix, func.substr(email, 1, len(prefix)) == prefix)
+    return and_(email >= prefix, email < prefix[:-1] + chr(last + 1))
+
+
+def _after(query: PersonQuery) -> ColumnElement[bool]:
+    value, last_id = query.after
+    if query.sort == "id":
+        return PersonModel.id < last_id if query.descending else PersonModel.id > last_id
+    col = getattr(PersonModel, query.sort)
+    key = tuple_(col, PersonModel.id)
+    if query.sort != "age":
+        return key < (value, last_id) if query.descending else key > (value, last_id)
+    # SQLite puts NULL ages first ascending and last descending, like PersonQuery
+    if value is None:
+        if query.descending:
+            return and_(col.is_(None), PersonModel.id < last_id)
+        return or_(and_(col.is_(None), PersonModel.id > last_id), col.is_not(None))
+    if query.descending:
+        return or_(key < (value, last_id), col.is_(None))
+    return key > (value, last_id)
 
 
 class SqlAlchemyPersonRepository(PersonRepository):
-    def __init__(self, sessionmaker: async_sessionmaker[AsyncSession]):
+    def __init__(
+        self, sessionmaker: async_sessionmaker[AsyncSession], insert_chunk_size: int = 1000
+    ):
         self._sessionmaker = sessionmaker
+        self.insert_chunk_size = insert_chunk_size
+        self._name_fts: Optional[bool] = None
 
     async def add(self, person: Person) -> Person:
-        async with self._sessionmaker() as session:
-            orm = PersonModel(
-                id=str(person.id),
-                name=person.name,
-                email=person.email,
-                age=person.age,
+        async with session_scope(self._sessionmaker) as session:
+            # INSERT ... RETURNING: no refresh SELECT after the commit
+            q = (
+                insert(PersonModel)
+                .values(**person_to_row(person))
+                .returning(*PERSON_COLUMNS)
             )
-            session.add(orm)
-            await session.commit()
-            await session.refresh(orm)
-            return Person(id=UUID(orm.id), name=orm.name, email=orm.email, age=orm.age)
+            r = (await session.execute(q)).one()
+            await commit(session)
+            return person_from_row(r)
+
+    async def add_many(self, persons: List[Person]) -> int:
+        if not persons:
+            return 0
+        table = PersonModel.__table__
+        async with session_scope(self._sessionmaker) as session:
+            # Core executemany per chunk, one commit for the whole batch
+            for start in range(0, len(persons), self.insert_chunk_size):
+                chunk = persons[start : start + self.insert_chunk_size]
+                await session.execute(insert(table), [person_to_row(p) for p in chunk])
+            await commit(session)
+        return len(persons)
 
     async def get_by_id(self, person_id: UUID) -> Optional[Person]:
-        async with self._sessionmaker() as session:
-            result = await session.get(PersonModel, str(person_id))
-            if not result:
-                return None
-            return Person(
-                id=UUID(result.id), name=result.name, email=result.email, age=result.age
+        async with session_scope(self._sessionmaker) as session:
+            q = select(*PERSON_COLUMNS).where(PersonModel.id == person_id)
+            r = (await session.execute(q)).one_or_none()
+            return None if r is None else person_from_row(r)
+
+    async def list(
+        self, limit: Optional[int] = None, after: Optional[UUID] = None
+    ) -> List[Person]:
+        async with session_scope(self._sessionmaker) as session:
+            q = select(*PERSON_COLUMNS).order_by(PersonModel.id)
+            if after is not None:
+                q = q.where(PersonModel.id > after)
+            if limit is not None:
+                q = q.limit(limit)
+            return persons_from_rows(await session.execute(q))
+
+    async def find(self, query: PersonQuery) -> List[Person]:
+        async with session_scope(self._sessionmaker) as session:
+            conditions = []
+            if query.email_prefix is not None:
+                conditions.append(_email_prefix(query.email_prefix))
+            if query.name_contains is not None:
+                conditions.append(await self._name_contains(session, query.name_contains))
+            if query.min_age is not None:
+                conditions.append(PersonModel.age >= query.min_age)
+            if query.max_age is not None:
+                conditions.append(PersonModel.age <= query.max_age)
+            if query.after is not None:
+                conditions.append(_after(query))
+            order = [getattr(PersonModel, query.sort), PersonModel.id]
+            if query.sort == "id":
+                order = order[1:]
+            if query.descending:
+                order = [c.desc() for c in order]
+            q = select(*PERSON_COLUMNS).where(*conditions).order_by(*order)
+            if query.limit is not None:
+                q = q.limit(query.limit)
+            return persons_from_rows(await session.execute(q))
+
+    async def _name_contains(
+        self, session: AsyncSession, needle: str
+    ) -> ColumnElement[bool]:
+        if self._name_fts is None:
+            self._name_fts = session.bind.dialect.name == "sqlite" and bool(
+                await session.scalar(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :n"),
+                    {"n": NAME_FTS_TABLE},
+                )
             )
+        # trigrams need three characters; shorter needles scan with LIKE
+        if not self._name_fts or len(needle) < 3:
+            return PersonModel.name.icontains(needle, autoescape=True)
+        matching = text(
+            f"SELECT rowid FROM {NAME_FTS_TABLE} WHERE {NAME_FTS_TABLE} MATCH :phrase"
+        ).bindparams(phrase='"' + needle.replace('"', '""') + '"')
+        return PersonModel.seq.in_(matching.columns(column("rowid")))
 
-    async def list(self) -> List[Person]:
+    async def stats(self, bucket_width: int = 10, top_domains: int = 10) -> PersonStats:
+        age = PersonModel.age
+        # SQL integer division truncates; shift negative ages to floor like Python
+        bucket = (
+            case(
+                (age >= 0, age // bucket_width),
+                else_=(age - bucket_width + 1) // bucket_width,
+            )
+            * bucket_width
+        ).label("bucket")
+        domain = func.substr(
+            PersonModel.email, func.instr(PersonModel.email, "@") + 1
+        ).label("domain")
+        async with session_scope(self._sessionmaker) as session:
+            total, with_age = (
+                await session.execute(select(func.count(), func.count(age)))
+            ).one()
+            buckets = await session.execute(
+                select(bucket, func.count()).where(age.is_not(None)).group_by(bucket)
+            )
+            domains = await session.execute(
+                select(domain, func.count().label("n"))
+                .group_by(domain)
+                .order_by(func.count().desc(), domain)
+                .limit(top_domains)
+            )
+            return PersonStats(
+                total=total,
+                null_age=total - with_age,
+                age_buckets={b: n for b, n in buckets.all()},
+                bucket_width=bucket_width,
+                top_email_domains=[(d, n) for d, n in domains.all()],
+            )
+
+    async def stream(
+        self, after: Optional[UUID] = None, chunk_size: int = 500
+    ) -> AsyncIterator[List[Person]]:
+        # plain column rows: nothing is kept in the session identity map
+        q = select(*PERSON_COLUMNS).order_by(PersonModel.id)
+        if after is not None:
+            q = q.where(PersonModel.id > after)
+        # a stream outlives its handler: it reads through a session of its own
         async with self._sessionmaker() as session:
-            q = select(PersonModel)
-            res = await session.execute(q)
-            rows = res.scalars().all()
-            return [
-                Person(id=UUID(r.id), name=r.name, email=r.email, age=r.age)
-                for r in rows
-            ]
+            res = await session.stream(q.execution_options(yield_per=chunk_size))
+            async for rows in res.partitions(chunk_size):
+                yield persons_from_rows(rows)
 
     async def update(self, person: Person) -> Person:
-        async with self._sessionmaker() as session:
+        updated = await self.update_fields(
+            person.id, {"name": person.name, "email": person.email, "age": person.age}
+        )
+        if updated is None:
+            raise KeyError("Person not found")
+        return updated
+
+    async def update_fields(
+        self,
+        person_id: UUID,
+        changes: Dict[str, Any],
+        expected_version: Optional[int] = None,
+    ) -> Optional[Person]:
+        if not changes:
+            return await self.get_by_id(person_id)
+        async with session_scope(self._sessionmaker) as session:
+            # UPDATE ... RETURNING: one statement, no reload
             q = (
                 sa_update(PersonModel)
-                .where(PersonModel.id == str(person.id))
-                .values(name=person.name, email=person.email, age=person.age)
-                .execution_options(synchronize_session="fetch")
+                .where(PersonModel.id == person_id)
+                .values(**changes, version=PersonModel.version + 1)
+                .returning(*PERSON_COLUMNS)
             )
-            await session.execute(q)
-            await session.commit()
-            # reload
-            orm = await session.get(PersonModel, str(person.id))
-            if not orm:
-                raise KeyError("Person not found")
-            return Person(id=UUID(orm.id), name=orm.name, email=orm.email, age=orm.age)
+            if expected_version is not None:
+                q = q.where(PersonModel.version == expected_version)
+            r = (await session.execute(q)).one_or_none()
+            if r is None and expected_version is not None:
+                # tell a version mismatch apart from a missing person
+                current = await session.scalar(
+                    select(PersonModel.version).where(PersonModel.id == person_id)
+                )
+                if current is not None:
+                    raise ConcurrencyConflict("Person was modified concurrently")
+            if r is None:
+                return None
+            await commit(session)
+            return person_from_row(r)
 
     async def delete(self, person_id: UUID) -> None:
-        async with self._sessionmaker() as session:
-            q = sa_delete(PersonModel).where(PersonModel.id == str(person_id))
+        async with session_scope(self._sessionmaker) as session:
+            q = sa_delete(PersonModel).where(PersonModel.id == person_id)
             await session.execute(q)
-            await session.commit()
+            await commit(session)
+
+    async def change_counter(self) -> Optional[int]:
+        async with session_scope(self._sessionmaker) as session:
+            return await session.scalar(
+                select(TableVersionModel.version).where(
+                    TableVersionModel.name == PersonModel.__tablename__
+                )
+            )
@@ -1,11 +1,13 @@
-from typing import Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
-from sqlalchemy import select
+from sqlalchemy import insert, select, update as sa_update, delete as sa_delete
 from app.domain.user import User
 from app.domain.repository.user_repository import UserRepository
+from app.adapters.db.mappers import USER_COLUMNS, user_from_row, user_to_row
 from app.adapters.db.models import UserModel, RevokedTokenModel
+from app.adapters.db.unit_of_work import commit, session_scope
 
 
 class SqlAlchemyUserRepository(UserRepository):
@@ -13,59 +15,69 @@ class SqlAlchemyUserRepository(UserRepository):
         self._sessionmaker = sessionmaker
 
     async def create(self, user: User) -> User:
-        async with self._sessionmaker() as session:
-            orm = UserModel(
-                id=str(user.id),
-                email=user.email,
-                hashed_password=user.hashed_password,
-                is_active=user.is_active,
-            )
-            session.add(orm)
-            await session.commit()
-            await session.refresh(orm)
-            return User(
-                id=UUID(orm.id),
-                email=orm.email,
-                hashed_password=orm.hashed_password,
-                is_active=orm.is_active,
-            )
+        async with session_scope(self._sessionmaker) as session:
+            q = insert(UserModel).values(**user_to_row(user)).returning(*USER_COLUMNS)
+            r = (await session.execute(q)).one()
+            await commit(session)
+            return user_from_row(r)
 
     async def get_by_email(self, email: str) -> Optional[User]:
-        async with self._sessionmaker() as session:
-            q = select(UserModel).where(UserModel.email == email)
-            res = await session.execute(q)
-            orm = res.scalar_one_or_none()
-            if not orm:
-                return None
-            return User(
-                id=UUID(orm.id),
-                email=orm.email,
-                hashed_password=orm.hashed_password,
-                is_active=orm.is_active,
-            )
+        async with session_scope(self._sessionmaker) as session:
+            q = select(*USER_COLUMNS).where(UserModel.email == email)
+            r = (await session.execute(q)).one_or_none()
+            return None if r is None else user_from_row(r)
 
     async def get_by_id(self, user_id: UUID) -> Optional[User]:
-        async with self._sessionmaker() as session:
-            orm = await session.get(UserModel, str(user_id))
-            if not orm:
-                return None
-            return User(
-                id=UUID(orm.id),
-                email=orm.email,
-                hashed_password=orm.hashed_password,
-                is_active=orm.is_active,
+        async with session_scope(self._sessionmaker) as session:
+            q = select(*USER_COLUMNS).where(UserModel.id == user_id)
+            r = (await session.execute(q)).one_or_none()
+            return None if r is None else user_from_row(r)
+
+    async def deactivate(self, user_id: UUID) -> Optional[User]:
+        async with session_scope(self._sessionmaker) as session:
+            q = (
+                sa_update(UserModel)
+                .where(UserModel.id == user_id)
+                .values(is_active=False)
+                .returning(*USER_COLUMNS)
             )
+            r = (await session.execute(q)).one_or_none()
+            await commit(session)
+            return None if r is None else user_from_row(r)
 
     async def add_revoked_token(self, jti: str, expires_at: datetime) -> None:
-        async with self._sessionmaker() as session:
+        async with session_scope(self._sessionmaker) as session:
             rt = RevokedTokenModel(jti=jti, expires_at=expires_at)
             session.add(rt)
-            await session.commit()
+            await commit(session)
 
     async def is_token_revoked(self, jti: str) -> bool:
-        async with self._sessionmaker() as session:
-            orm = await session.get(RevokedTokenModel, jti)
-            if not orm:
+        async with session_scope(self._sessionmaker) as session:
+            expires_at = await session.scalar(
+                select(RevokedTokenModel.expires_at).where(RevokedTokenModel.jti == jti)
+            )
+            if expires_at is None:
                 return False
             # If token record exists but expired, we can consider it not revoked (or delete it).
-            return not orm.is_expired()
+            return expires_at > datetime.utcnow()
+
+    async def list_revoked_tokens(self) -> List[Tuple[str, datetime]]:
+        async with session_scope(self._sessionmaker) as session:
+            q = select(RevokedTokenModel.jti, RevokedTokenModel.expires_at).where(
+                RevokedTokenModel.expires_at > datetime.utcnow()
+            )
+            res = await session.execute(q)
+            return [(row.jti, row.expires_at) for row in res]
+
+    async def purge_expired_tokens(self, batch_size: int = 1000) -> int:
+        async with session_scope(self._sessionmaker) as session:
+            expired = (
+                select(RevokedTokenModel.jti)
+                .where(RevokedTokenModel.expires_at <= datetime.utcnow())
+                .limit(batch_size)
+                .scalar_subquery()
+            )
+            q = sa_delete(RevokedTokenModel).where(RevokedTokenModel.jti.in_(expired))
+            res = await session.execute(q)
+            await commit(session)
+            return res.rowcount
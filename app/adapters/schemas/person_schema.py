@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from pydantic import ConfigDict
 
@@ -24,3 +24,32 @@ class PersonOut(BaseModel):
 
     # Pydantic v2: to load from ORM/attribute-style objects
     model_config = ConfigDict(from_attributes=True)
+
+
+class BulkRowErrorOut(BaseModel):
+    index: int
+    error: str
+
+
+class BulkCreateOut(BaseModel):
+    created: int
+    failed: int
+    errors: List[BulkRowErrorOut]
+
+
+class AgeBucketOut(BaseModel):
+    min_age: int
+    max_age: int
+    count: int
+
+
+class EmailDomainOut(BaseModel):
+    domain: str
+    count: int
+
+
+class PersonStatsOut(BaseModel):
+    total: int
+    null_age: int
+    age_buckets: List[AgeBucketOut]
+    email_domains: List[EmailDomainOut]
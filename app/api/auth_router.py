@@ -9,6 +9,7 @@ from app.adapters.schemas.auth_schema import (
     RegisterRequest,
 )
 from app.services.auth import authenticate_user, create_access_token, get_password_hash
+from app.services.password_hasher import PasswordHasherBusy
 from app.domain.user import User
 from uuid import uuid4
 
@@ -17,6 +18,14 @@ logger = logging.getLogger(__name__)
 bearer_scheme = HTTPBearer()
 
 
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service is busy, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post(
     "/login",
     response_model=TokenResponse,
@@ -29,7 +38,11 @@ async def login(request: Request, body: LoginRequest):
     Returns access token (JWT) that expires in 24h.
     """
     user_repo = request.app.state.user_repository
-    user = await authenticate_user(user_repo, body.email, body.password)
+    hasher = getattr(request.app.state, "password_hasher", None)
+    try:
+        user = await authenticate_user(user_repo, body.email, body.password, hasher)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     if not user:
         logger.info("Login failed for email=%s", body.email)
         raise HTTPException(
@@ -72,8 +85,14 @@ async def register(request: Request, body: RegisterRequest) -> dict[str, str]:
         logger.info("Register blocked: email already registered=%s", body.email)
         raise HTTPException(status_code=400, detail="Email already registered")
 
+    hasher = getattr(request.app.state, "password_hasher", None)
     try:
-        hashed = get_password_hash(body.password)
+        if hasher is not None:
+            hashed = await hasher.hash(body.password)
+        else:
+            hashed = get_password_hash(body.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
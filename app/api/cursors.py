@@ -0,0 +1,37 @@
+import base64
+import binascii
+import json
+from typing import Any, Tuple
+from uuid import UUID
+
+from app.domain.person import Person
+from app.domain.person_query import PersonQuery
+
+
+def encode_cursor(query: PersonQuery, person: Person) -> str:
+    """
+    Opaque ``after`` value resuming behind ``person``. For the default id
+    order it is just the id, as before sorting existed.
+    """
+    value, person_id = query.position(person)
+    if query.sort == "id":
+        return str(person_id)
+    raw = json.dumps([value, str(person_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(sort: str, cursor: str) -> Tuple[Any, UUID]:
+    """Inverse of ``encode_cursor``; raises ValueError for a malformed cursor."""
+    if sort == "id":
+        person_id = UUID(cursor)
+        return person_id, person_id
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, person_id = json.loads(raw)
+        person_id = UUID(person_id)
+    except (binascii.Error, AttributeError, TypeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    expected = int if sort == "age" else str
+    if not (type(value) is expected or (sort == "age" and value is None)):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return value, person_id
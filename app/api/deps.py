@@ -1,11 +1,21 @@
+from typing import AsyncIterator
+
 from fastapi import Depends, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
+from app.domain.repository.unit_of_work import UnitOfWork
 from app.services.auth import get_current_user
 
 bearer_scheme = HTTPBearer()
 
 
+async def unit_of_work_dep(request: Request) -> AsyncIterator[UnitOfWork]:
+    # one per request (FastAPI caches dependencies): whatever is not committed
+    # by the time the request ends is rolled back
+    async with request.app.state.unit_of_work() as uow:
+        yield uow
+
+
 async def current_user_dep(
     request: Request, creds: HTTPAuthorizationCredentials = Depends(bearer_scheme)
 ):
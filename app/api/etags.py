@@ -0,0 +1,38 @@
+from typing import Optional
+
+from app.domain.person import Person
+
+
+def person_etag(person: Person) -> str:
+    return f'"{person.version}"'
+
+
+def parse_if_match(value: Optional[str]) -> Optional[int]:
+    """
+    Version required by an If-Match header, or None when the header is absent
+    or "*". Raises ValueError for anything that is not one strong person ETag.
+    """
+    if value is None or value.strip() == "*":
+        return None
+    tag = value.strip()
+    if len(tag) < 3 or not (tag.startswith('"') and tag.endswith('"')):
+        raise ValueError(f"Invalid If-Match value: {value}")
+    return int(tag[1:-1])
+
+
+def list_etag(change_counter: int) -> str:
+    return f'"persons-{change_counter}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches ``etag``. Uses the weak comparison
+    RFC 9110 prescribes for this header, so ``W/`` prefixes are ignored.
+    """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
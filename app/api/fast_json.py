@@ -0,0 +1,40 @@
+"""
+Serialization straight from domain objects, skipping ``PersonOut`` and the
+``response_model`` revalidation. Persons coming back from a repository were
+already validated on the way in, so re-checking every ``EmailStr`` on the way
+out is wasted work. Uses orjson when it is installed, the stdlib otherwise.
+"""
+import json
+from typing import Any, Dict
+
+from starlette.responses import Response
+
+from app.domain.person import Person
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def person_to_dict(person: Person) -> Dict[str, Any]:
+    """The ``PersonOut`` shape of ``person`` with JSON-native values."""
+    return {
+        "id": str(person.id),
+        "name": person.name,
+        "email": person.email,
+        "age": person.age,
+    }
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -23,7 +23,7 @@ async def list_git_repos(repo: GitRepository = Depends(repo_dep)):
     try:
         uc = ListGitRepos(repo)
         repos = await uc.execute()
-        return [GitRepoOut(**r.__dict__) for r in repos]
+        return [GitRepoOut.model_validate(r) for r in repos]
     except Exception as exc:
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY,
@@ -0,0 +1,103 @@
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+
+from fastapi import APIRouter, Request, Response
+
+from app.services.metrics import Counter, Gauge, Metric, MetricsRegistry
+
+router = APIRouter()
+
+# requests no route matched (404s, redirects): one label value, whatever the path
+UNMATCHED_ROUTE = "unmatched"
+
+
+class HttpMetrics:
+    def __init__(self, registry: MetricsRegistry):
+        self.requests = registry.counter(
+            "http_requests_total",
+            "HTTP requests by method, route template and status code.",
+            ("method", "route", "status"),
+        )
+        self.duration = registry.histogram(
+            "http_request_duration_seconds",
+            "Time from receiving a request to the end of its response body.",
+            ("method", "route"),
+        )
+        self.in_flight = registry.gauge(
+            "http_requests_in_flight", "HTTP requests being handled."
+        ).labels()
+        # (method, route, status) -> (count child, duration child)
+        self._children: Dict[Tuple[str, str, int], Tuple[Any, Any]] = {}
+
+    def record(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route, status)
+        children = self._children.get(key)
+        if children is None:
+            children = self._children[key] = (
+                self.requests.labels(method, route, str(status)),
+                self.duration.labels(method, route),
+            )
+        children[0].inc()
+        children[1].observe(seconds)
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware: no Request object and no extra task per request.
+    The route label is the template of the route FastAPI matched (e.g.
+    ``/persons/{person_id}``), never the raw path.
+    """
+
+    def __init__(self, app, metrics: HttpMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_and_track(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = self.metrics.in_flight
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_and_track)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight.dec()
+            route = scope.get("route")
+            self.metrics.record(
+                scope["method"],
+                route.path if route is not None else UNMATCHED_ROUTE,
+                status,
+                elapsed,
+            )
+
+
+def cache_metrics(caches: Iterable[Tuple[str, Any]]) -> List[Metric]:
+    """Hit and miss counts of every component in ``caches`` with ``cache_stats()``."""
+    hits = Counter("cache_hits_total", "Cache lookups served from memory.", ("cache",))
+    misses = Counter("cache_misses_total", "Cache lookups that missed.", ("cache",))
+    ratio = Gauge("cache_hit_ratio", "Hits over lookups since startup.", ("cache",))
+    for name, component in caches:
+        cache_stats = getattr(component, "cache_stats", None)
+        stats = cache_stats() if cache_stats is not None else {}
+        if "hits" not in stats:
+            continue
+        hits.labels(name).inc(stats["hits"])
+        misses.labels(name).inc(stats["misses"])
+        ratio.labels(name).set(stats["hit_ratio"])
+    return [hits, misses, ratio]
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(request: Request) -> Response:
+    registry: MetricsRegistry = request.app.state.metrics
+    return Response(registry.render(), media_type=MetricsRegistry.CONTENT_TYPE)
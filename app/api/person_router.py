@@ -1,23 +1,89 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from typing import List
+import csv
+import json
+import logging
+from dataclasses import replace
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    status,
+    Request,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
 from uuid import UUID
 
-from app.adapters.schemas.person_schema import PersonCreate, PersonUpdate, PersonOut
+from app.adapters.schemas.person_schema import (
+    BulkCreateOut,
+    PersonCreate,
+    PersonUpdate,
+    PersonOut,
+    PersonStatsOut,
+)
+from app.usecases.bulk_create_persons import BulkCreatePersons
 from app.usecases.create_person import CreatePerson
 from app.usecases.get_person import GetPerson
+from app.usecases.get_person_stats import GetPersonStats
 from app.usecases.list_persons import ListPersons
+from app.usecases.stream_persons import StreamPersons
 from app.usecases.update_person import UpdatePerson
+from app.usecases.patch_person import PatchPerson
 from app.usecases.delete_person import DeletePerson
+from app.domain.exceptions import ConcurrencyConflict
+from app.domain.person import Person
+from app.domain.person_query import PersonQuery
 from app.domain.repository.person_repository import PersonRepository
-from app.api.deps import current_user_dep
+from app.domain.repository.unit_of_work import UnitOfWork
+from app.api.deps import current_user_dep, unit_of_work_dep
+from app.api.cursors import decode_cursor, encode_cursor
+from app.api.fast_json import FastJSONResponse, dumps, person_to_dict
+from app.api.etags import etag_matches, list_etag, parse_if_match, person_etag
+
+logger = logging.getLogger(__name__)
+
+# opened before any other dependency: the identity checks and the handler
+# share one session, and the use cases commit it
+router = APIRouter(dependencies=[Depends(unit_of_work_dep)])
 
-router = APIRouter()
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_CHUNK_SIZE = 500
 
 
 def repo_dep(request: Request) -> PersonRepository:
     return request.app.state.person_repository
 
 
+def _fast_json(request: Request) -> bool:
+    return getattr(request.app.state, "fast_json", False)
+
+
+def _person_response(
+    request: Request, response: Response, person: Person, status_code: int = 200
+):
+    """
+    ``PersonOut`` for FastAPI to validate against the response_model, or, with
+    fast JSON enabled, a finished response it passes through untouched.
+    """
+    if _fast_json(request):
+        return FastJSONResponse(
+            person_to_dict(person), status_code=status_code, headers=response.headers
+        )
+    return PersonOut.model_validate(person)
+
+
+def _persons_response(request: Request, response: Response, persons: List[Person]):
+    if _fast_json(request):
+        return FastJSONResponse(
+            [person_to_dict(p) for p in persons], headers=response.headers
+        )
+    return [PersonOut.model_validate(p) for p in persons]
+
+
 @router.post(
     "",
     response_model=PersonOut,
@@ -26,38 +92,262 @@ def repo_dep(request: Request) -> PersonRepository:
     summary="Create person",
     description="Creates a new person by providing name, email, and age.",
 )
-async def create_person(cmd: PersonCreate, repo: PersonRepository = Depends(repo_dep)):
-    print("Creating person...")
-    uc = CreatePerson(repo)
+async def create_person(
+    cmd: PersonCreate,
+    request: Request,
+    response: Response,
+    repo: PersonRepository = Depends(repo_dep),
+    uow: UnitOfWork = Depends(unit_of_work_dep),
+):
+    logger.debug("Creating person")
+    uc = CreatePerson(repo, uow)
     person = await uc.execute(name=cmd.name, email=cmd.email, age=cmd.age)
-    return PersonOut(**person.__dict__)
+    return _person_response(
+        request, response, person, status_code=status.HTTP_201_CREATED
+    )
+
+
+async def _ndjson_chunks(chunks: AsyncIterator[List[Person]]) -> AsyncIterator[bytes]:
+    async for persons in chunks:
+        yield b"".join(dumps(person_to_dict(p)) + b"\n" for p in persons)
+
+
+async def _lines(request: Request) -> AsyncIterator[str]:
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8").rstrip("\r")
+
+
+async def _non_blank(lines: AsyncIterator[str]) -> AsyncIterator[str]:
+    async for line in lines:
+        if line.strip():
+            yield line
+
+
+async def _json_array(request: Request) -> AsyncIterator[Any]:
+    try:
+        rows = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body is not valid JSON")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array")
+    for row in rows:
+        yield row
+
+
+async def _csv_rows(request: Request) -> AsyncIterator[Dict[str, str]]:
+    # one record per line: quoted fields spanning lines are not supported
+    header: Optional[List[str]] = None
+    async for line in _non_blank(_lines(request)):
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        yield dict(zip(header, values))
+
+
+def _validate_person(row: Any) -> Dict[str, Any]:
+    try:
+        return PersonCreate.model_validate(row).model_dump()
+    except ValidationError as exc:
+        raise ValueError(
+            "; ".join(
+                f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}"
+                for err in exc.errors()
+            )
+        ) from exc
+
+
+def _validate_ndjson_person(line: str) -> Dict[str, Any]:
+    # json.JSONDecodeError is a ValueError: reported like any invalid row
+    return _validate_person(json.loads(line))
+
+
+def _validate_csv_person(row: Dict[str, str]) -> Dict[str, Any]:
+    if row.get("age", "").strip() == "":
+        row = {**row, "age": None}
+    return _validate_person(row)
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkCreateOut,
+    dependencies=[Depends(current_user_dep)],
+    summary="Bulk create persons",
+    description=(
+        "Creates many persons from a JSON array (`application/json`), or a streamed "
+        "NDJSON (`application/x-ndjson`) or CSV (`text/csv`, header row "
+        "`name,email,age`) body. Invalid rows are reported by index and skipped. "
+        "The valid rows are inserted in one transaction once the whole body has "
+        "been read: either all of them are created or none is."
+    ),
+)
+async def bulk_create_persons(
+    request: Request,
+    repo: PersonRepository = Depends(repo_dep),
+    uow: UnitOfWork = Depends(unit_of_work_dep),
+):
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    rows: AsyncIterator[Any]
+    validate: Callable[[Any], Dict[str, Any]]
+    if content_type == "application/json":
+        rows, validate = _json_array(request), _validate_person
+    elif content_type in ("application/x-ndjson", "application/jsonl"):
+        rows, validate = _non_blank(_lines(request)), _validate_ndjson_person
+    elif content_type == "text/csv":
+        rows, validate = _csv_rows(request), _validate_csv_person
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Use application/json, application/x-ndjson or text/csv",
+        )
+    result = await BulkCreatePersons(repo, uow=uow).execute(rows, validate)
+    return BulkCreateOut(
+        created=result.created,
+        failed=len(result.errors),
+        errors=[{"index": e.index, "error": e.error} for e in result.errors],
+    )
 
 
 @router.get(
     "",
     response_model=List[PersonOut],
     summary="List persons",
-    description="Returns all persons.",
+    description=(
+        "Returns a page of persons, optionally filtered by `email_prefix` "
+        "(case-sensitive), `name_contains` (case-insensitive) and an age range, "
+        "ordered by `sort` (`id`, `name`, `email` or `age`; prefix `-` for "
+        "descending). Pass the `X-Next-Cursor` response header as `after` to fetch "
+        "the next page with the same parameters. With `stream=true` every person "
+        "after the cursor is streamed as NDJSON in id order instead; it takes no "
+        "filters. The `ETag` changes whenever any person is written; send it back "
+        "as `If-None-Match` to get a 304."
+    ),
 )
-async def list_persons(repo: PersonRepository = Depends(repo_dep)):
+async def list_persons(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    email_prefix: Optional[str] = Query(None, min_length=1),
+    name_contains: Optional[str] = Query(None, min_length=1),
+    min_age: Optional[int] = Query(None, ge=0),
+    max_age: Optional[int] = Query(None, ge=0),
+    sort: str = Query("id", pattern="^-?(id|name|email|age)$"),
+    stream: bool = False,
+    if_none_match: Optional[str] = Header(None),
+    repo: PersonRepository = Depends(repo_dep),
+):
+    query = PersonQuery(
+        email_prefix=email_prefix,
+        name_contains=name_contains,
+        min_age=min_age,
+        max_age=max_age,
+        sort=sort.lstrip("-"),
+        descending=sort.startswith("-"),
+        limit=limit,
+    )
+    if after is not None:
+        try:
+            query = replace(query, after=decode_cursor(query.sort, after))
+        except ValueError:
+            raise HTTPException(status_code=422, detail="Invalid cursor")
+    if stream and (query.is_filtered or sort != "id"):
+        raise HTTPException(
+            status_code=400, detail="stream=true returns every person in id order"
+        )
+    # read the counter before the rows: a write in between only makes the
+    # ETag older than the body, never newer
+    counter = await repo.change_counter()
+    etag = list_etag(counter) if counter is not None else None
+    if etag is not None:
+        if etag_matches(if_none_match, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+            )
+        response.headers["ETag"] = etag
+    if stream:
+        chunks = StreamPersons(repo).execute(
+            after=query.after[1] if query.after else None,
+            chunk_size=STREAM_CHUNK_SIZE,
+        )
+        return StreamingResponse(
+            _ndjson_chunks(chunks),
+            media_type="application/x-ndjson",
+            headers={"ETag": etag} if etag is not None else None,
+        )
     uc = ListPersons(repo)
-    print("Listing persons...")
-    persons = await uc.execute()
-    return [PersonOut(**p.__dict__) for p in persons]
+    logger.debug("Listing persons")
+    persons = await uc.execute(query)
+    if len(persons) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(query, persons[-1])
+    return _persons_response(request, response, persons)
+
+
+@router.get(
+    "/stats",
+    response_model=PersonStatsOut,
+    summary="Person statistics",
+    description=(
+        "Counts computed by the database without loading persons: the total, an "
+        "age histogram with `bucket_width` years per bucket (empty buckets are "
+        "omitted), persons without an age and the `top_domains` most common email "
+        "domains."
+    ),
+)
+async def person_stats(
+    bucket_width: int = Query(10, ge=1, le=150),
+    top_domains: int = Query(10, ge=1, le=100),
+    repo: PersonRepository = Depends(repo_dep),
+):
+    stats = await GetPersonStats(repo).execute(
+        bucket_width=bucket_width, top_domains=top_domains
+    )
+    return PersonStatsOut(
+        total=stats.total,
+        null_age=stats.null_age,
+        age_buckets=[
+            {"min_age": low, "max_age": low + stats.bucket_width - 1, "count": n}
+            for low, n in sorted(stats.age_buckets.items())
+        ],
+        email_domains=[
+            {"domain": d, "count": n} for d, n in stats.top_email_domains
+        ],
+    )
 
 
 @router.get(
     "/{person_id}",
     response_model=PersonOut,
     summary="Get person",
-    description="Returns a person by ID.",
+    description=(
+        "Returns a person by ID. Send the `ETag` of a previous response as "
+        "`If-None-Match` to get a 304 while the person is unchanged."
+    ),
 )
-async def get_person(person_id: UUID, repo: PersonRepository = Depends(repo_dep)):
+async def get_person(
+    person_id: UUID,
+    request: Request,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    repo: PersonRepository = Depends(repo_dep),
+):
     uc = GetPerson(repo)
     person = await uc.execute(person_id)
     if not person:
         raise HTTPException(status_code=404, detail="Person not found")
-    return PersonOut(**person.__dict__)
+    etag = person_etag(person)
+    if etag_matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+    response.headers["ETag"] = etag
+    return _person_response(request, response, person)
 
 
 @router.put(
@@ -67,13 +357,64 @@ async def get_person(person_id: UUID, repo: PersonRepository = Depends(repo_dep)
     description="Updates a person by ID.",
 )
 async def update_person(
-    person_id: UUID, cmd: PersonUpdate, repo: PersonRepository = Depends(repo_dep)
+    person_id: UUID,
+    cmd: PersonUpdate,
+    request: Request,
+    response: Response,
+    repo: PersonRepository = Depends(repo_dep),
+    uow: UnitOfWork = Depends(unit_of_work_dep),
 ):
-    uc = UpdatePerson(repo)
+    uc = UpdatePerson(repo, uow)
     updated = await uc.execute(person_id, name=cmd.name, email=cmd.email, age=cmd.age)
     if not updated:
         raise HTTPException(status_code=404, detail="Person not found")
-    return PersonOut(**updated.__dict__)
+    response.headers["ETag"] = person_etag(updated)
+    return _person_response(request, response, updated)
+
+
+@router.patch(
+    "/{person_id}",
+    response_model=PersonOut,
+    dependencies=[Depends(current_user_dep)],
+    summary="Patch person",
+    description=(
+        "Updates only the fields present in the body. Nothing is written when they "
+        "already hold those values. Send the `ETag` of a previous response as "
+        "`If-Match` to fail with 412 if the person changed in the meantime."
+    ),
+)
+async def patch_person(
+    person_id: UUID,
+    cmd: PersonUpdate,
+    request: Request,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    repo: PersonRepository = Depends(repo_dep),
+    uow: UnitOfWork = Depends(unit_of_work_dep),
+):
+    changes = cmd.model_dump(exclude_unset=True)
+    for field in ("name", "email"):
+        if field in changes and changes[field] is None:
+            raise HTTPException(status_code=422, detail=f"{field} cannot be null")
+    try:
+        expected_version = parse_if_match(if_match)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="If-Match does not match the current person",
+        )
+    uc = PatchPerson(repo, uow)
+    try:
+        updated = await uc.execute(person_id, changes, expected_version=expected_version)
+    except ConcurrencyConflict:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="If-Match does not match the current person",
+        )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Person not found")
+    response.headers["ETag"] = person_etag(updated)
+    return _person_response(request, response, updated)
 
 
 @router.delete(
@@ -83,7 +424,11 @@ async def update_person(
     summary="Delete person",
     description="Deletes a person by ID.",
 )
-async def delete_person(person_id: UUID, repo: PersonRepository = Depends(repo_dep)):
-    uc = DeletePerson(repo)
+async def delete_person(
+    person_id: UUID,
+    repo: PersonRepository = Depends(repo_dep),
+    uow: UnitOfWork = Depends(unit_of_work_dep),
+):
+    uc = DeletePerson(repo, uow)
     await uc.execute(person_id)
     return None
@@ -0,0 +1,26 @@
+from app.adapters.db.query_tracker import QueryTracker
+from app.api.metrics import UNMATCHED_ROUTE
+
+
+class QueryTrackingMiddleware:
+    """
+    Plain ASGI middleware giving each request its own statement count, and
+    handing it to the tracker under ``METHOD /route/template`` when the
+    response is done.
+    """
+
+    def __init__(self, app, tracker: QueryTracker):
+        self.app = app
+        self.tracker = tracker
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with self.tracker.track() as queries:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                route = scope.get("route")
+                path = route.path if route is not None else UNMATCHED_ROUTE
+                self.tracker.finish(f"{scope['method']} {path}", queries)
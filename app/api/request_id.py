@@ -0,0 +1,44 @@
+import re
+from uuid import uuid4
+
+from app.services.log_pipeline import request_id_var
+
+HEADER = b"x-request-id"
+# a caller's id is reused only if it cannot smuggle anything into the logs
+_VALID_ID = re.compile(rb"[A-Za-z0-9._:-]{1,64}")
+
+
+class RequestIdMiddleware:
+    """
+    Plain ASGI middleware: every log record of a request carries its id,
+    taken from a well-formed ``X-Request-ID`` header or generated, and
+    echoed back in the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == HEADER:
+                if _VALID_ID.fullmatch(value):
+                    request_id = value.decode("ascii")
+                break
+        if request_id is None:
+            request_id = uuid4().hex
+        header = (HEADER, request_id.encode("ascii"))
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), header]
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,2 @@
+class ConcurrencyConflict(Exception):
+    """Raised when a write was based on an outdated version of an entity."""
@@ -3,9 +3,11 @@ from typing import Optional
 from uuid import UUID, uuid4
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Person:
     id: UUID = field(default_factory=uuid4)
     name: str = ""
     email: str = ""
     age: Optional[int] = None
+    # bumped on every update; used for optimistic concurrency and ETags
+    version: int = 1
@@ -0,0 +1,64 @@
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+from uuid import UUID
+
+from app.domain.person import Person
+
+SORT_FIELDS = ("id", "name", "email", "age")
+
+
+@dataclass(frozen=True, slots=True)
+class PersonQuery:
+    """
+    Which persons to return and in what order. Results are ordered by
+    ``sort`` and then by id, so every page can resume from the ``after``
+    position of the previous one: ``(sort value, id)`` of its last person.
+
+    ``email_prefix`` is case-sensitive, ``name_contains`` is not. Persons
+    without an age sort before every age (after them when descending).
+    """
+
+    email_prefix: Optional[str] = None
+    name_contains: Optional[str] = None
+    min_age: Optional[int] = None
+    max_age: Optional[int] = None
+    sort: str = "id"
+    descending: bool = False
+    limit: Optional[int] = None
+    after: Optional[Tuple[Any, UUID]] = None
+
+    def __post_init__(self) -> None:
+        if self.sort not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort persons by {self.sort!r}")
+
+    @property
+    def is_filtered(self) -> bool:
+        return any(
+            v is not None
+            for v in (self.email_prefix, self.name_contains, self.min_age, self.max_age)
+        )
+
+    def matches(self, person: Person) -> bool:
+        if self.email_prefix is not None and not person.email.startswith(
+            self.email_prefix
+        ):
+            return False
+        if (
+            self.name_contains is not None
+            and self.name_contains.casefold() not in person.name.casefold()
+        ):
+            return False
+        if self.min_age is not None and (person.age is None or person.age < self.min_age):
+            return False
+        if self.max_age is not None and (person.age is None or person.age > self.max_age):
+            return False
+        return True
+
+    def position(self, person: Person) -> Tuple[Any, UUID]:
+        """The ``after`` value that resumes right behind ``person``."""
+        return getattr(person, self.sort), person.id
+
+    @staticmethod
+    def order_key(value: Any, person_id: UUID) -> Tuple[bool, Any, UUID]:
+        # (has value, value, id): None sorts first without comparing to values
+        return value is not None, value if value is not None else 0, person_id
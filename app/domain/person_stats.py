@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class PersonStats:
+    total: int
+    null_age: int
+    # lower bound of each non-empty bucket -> persons in [bound, bound + width)
+    age_buckets: Dict[int, int]
+    bucket_width: int
+    # most common email domains first, ties by name
+    top_email_domains: List[Tuple[str, int]]
@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from uuid import UUID
 from app.domain.person import Person
+from app.domain.person_query import PersonQuery
+from app.domain.person_stats import PersonStats
 
 
 class PersonRepository(ABC):
@@ -9,18 +11,66 @@ class PersonRepository(ABC):
     async def add(self, person: Person) -> Person:
         raise NotImplementedError
 
+    @abstractmethod
+    async def add_many(self, persons: List[Person]) -> int:
+        """Insert all ``persons`` in a single transaction; return how many."""
+        raise NotImplementedError
+
     @abstractmethod
     async def get_by_id(self, person_id: UUID) -> Optional[Person]:
         raise NotImplementedError
 
+    async def get_for_update(self, person_id: UUID) -> Optional[Person]:
+        """The person as currently stored, for a write that depends on it:
+        read past any cache, in the open unit of work."""
+        return await self.get_by_id(person_id)
+
+    @abstractmethod
+    async def list(
+        self, limit: Optional[int] = None, after: Optional[UUID] = None
+    ) -> List[Person]:
+        """Return persons ordered by id, starting after the ``after`` cursor."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def find(self, query: PersonQuery) -> List[Person]:
+        """Return the persons matching ``query`` in its order, one page at most."""
+        raise NotImplementedError
+
     @abstractmethod
-    async def list(self) -> List[Person]:
+    async def stats(self, bucket_width: int = 10, top_domains: int = 10) -> PersonStats:
+        """Counts over all persons, computed without loading them."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def stream(
+        self, after: Optional[UUID] = None, chunk_size: int = 500
+    ) -> AsyncIterator[List[Person]]:
+        """Yield all persons ordered by id in chunks of at most ``chunk_size``."""
         raise NotImplementedError
 
     @abstractmethod
     async def update(self, person: Person) -> Person:
         raise NotImplementedError
 
+    @abstractmethod
+    async def update_fields(
+        self,
+        person_id: UUID,
+        changes: Dict[str, Any],
+        expected_version: Optional[int] = None,
+    ) -> Optional[Person]:
+        """Apply ``changes`` (field -> new value), bump the version and return
+        the updated person, or None when it does not exist. Raises
+        ConcurrencyConflict if ``expected_version`` no longer matches."""
+        raise NotImplementedError
+
     @abstractmethod
     async def delete(self, person_id: UUID) -> None:
         raise NotImplementedError
+
+    @abstractmethod
+    async def change_counter(self) -> Optional[int]:
+        """Number that changes whenever any person is written, or None if the
+        store cannot track it."""
+        raise NotImplementedError
@@ -0,0 +1,26 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class UnitOfWork(ABC):
+    """
+    Transaction shared by every repository call made while it is open.
+    Writes become durable on ``commit``; leaving it without a commit, or
+    with an exception, rolls them back.
+    """
+
+    @abstractmethod
+    async def __aenter__(self) -> "UnitOfWork":
+        raise NotImplementedError
+
+    @abstractmethod
+    async def __aexit__(self, exc_type, exc, tb) -> Optional[bool]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def commit(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def rollback(self) -> None:
+        raise NotImplementedError
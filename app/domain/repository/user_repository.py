@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 from app.domain.user import User
 from datetime import datetime
@@ -18,6 +18,10 @@ class UserRepository(ABC):
     async def get_by_id(self, user_id: UUID) -> Optional[User]:
         raise NotImplementedError
 
+    @abstractmethod
+    async def deactivate(self, user_id: UUID) -> Optional[User]:
+        raise NotImplementedError
+
     @abstractmethod
     async def add_revoked_token(self, jti: str, expires_at: datetime) -> None:
         raise NotImplementedError
@@ -25,3 +29,13 @@ class UserRepository(ABC):
     @abstractmethod
     async def is_token_revoked(self, jti: str) -> bool:
         raise NotImplementedError
+
+    @abstractmethod
+    async def list_revoked_tokens(self) -> List[Tuple[str, datetime]]:
+        """Return (jti, expires_at) for every revoked token that has not expired."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def purge_expired_tokens(self, batch_size: int = 1000) -> int:
+        """Delete at most ``batch_size`` expired revocations; return how many."""
+        raise NotImplementedError
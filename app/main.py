@@ -1,13 +1,32 @@
 import logging
 import os
 from contextlib import asynccontextmanager
+from functools import partial
+from logging.handlers import RotatingFileHandler
+from typing import Optional
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncEngine
 
-from app.adapters.db.models import Base
+from app.adapters.cache.revoked_token_index import RevokedTokenIndex
+from app.adapters.cache.ttl_cache import TTLCache
+from app.adapters.db.engine import build_engine
+from app.adapters.db.instrumentation import instrument_engine
+from app.adapters.db.query_tracker import QueryTracker
+from app.adapters.db.migrations import check_schema
+from app.adapters.db.unit_of_work import SqlAlchemyUnitOfWork
+from app.adapters.http.pooled_client import build_http_client
+from app.adapters.repositories.cached_git_repository import CachedGitRepository
+from app.adapters.repositories.cached_person_repository import CachedPersonRepository
+from app.adapters.repositories.cached_user_repository import CachedUserRepository
 from app.adapters.repositories.github_repository import GitHubRepository
+from app.adapters.repositories.in_memory_person_repository import (
+    InMemoryPersonRepository,
+)
+from app.adapters.repositories.replica_person_repository import (
+    ReplicaPersonRepository,
+)
 from app.adapters.repositories.sqlalchemy_person_repository import (
     SqlAlchemyPersonRepository,
 )
@@ -16,7 +35,18 @@ from app.adapters.repositories.sqlalchemy_user_repository import (
 )
 from app.api.auth_router import router as auth_router
 from app.api.git_router import router as git_router
+from app.api.metrics import HttpMetrics, MetricsMiddleware, cache_metrics
+from app.api.metrics import router as metrics_router
+from app.api.query_tracking import QueryTrackingMiddleware
+from app.api.request_id import RequestIdMiddleware
 from app.api.person_router import router as person_router
+from app.domain.repository.person_repository import PersonRepository
+from app.domain.repository.user_repository import UserRepository
+from app.services.background import PeriodicTask
+from app.services.log_pipeline import JsonFormatter, install_logging
+from app.services.metrics import MetricsRegistry
+from app.services.password_hasher import PasswordHasher
+from app.services.token_purger import RevokedTokenPurger
 
 load_dotenv()
 
@@ -27,6 +57,71 @@ LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 LOG_ENABLED = os.getenv("LOG_ENABLED", "true").lower() in {"1", "true", "yes", "on"}
 LOG_TO_FILE = os.getenv("LOG_TO_FILE", "false").lower() in {"1", "true", "yes", "on"}
 LOG_FILE = os.getenv("LOG_FILE", "logs/app.log")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_QUEUE = os.getenv("LOG_QUEUE", "true").lower() in {"1", "true", "yes", "on"}
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread").lower()
+ARGON2_TIME_COST = os.getenv("ARGON2_TIME_COST")
+ARGON2_MEMORY_COST = os.getenv("ARGON2_MEMORY_COST")
+ARGON2_PARALLELISM = os.getenv("ARGON2_PARALLELISM")
+REVOCATION_CACHE_ENABLED = os.getenv("REVOCATION_CACHE_ENABLED", "true").lower() in {
+    "1", "true", "yes", "on"
+}
+REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", "5"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+TOKEN_PURGE_INTERVAL_SECONDS = float(os.getenv("TOKEN_PURGE_INTERVAL_SECONDS", "300"))
+TOKEN_PURGE_BATCH_SIZE = int(os.getenv("TOKEN_PURGE_BATCH_SIZE", "1000"))
+GIT_CACHE_TTL_SECONDS = float(os.getenv("GIT_CACHE_TTL_SECONDS", "60"))
+GIT_CACHE_MAX_STALE_SECONDS = float(os.getenv("GIT_CACHE_MAX_STALE_SECONDS", "600"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "10"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_BACKOFF_BASE_SECONDS = float(os.getenv("HTTP_BACKOFF_BASE_SECONDS", "0.1"))
+HTTP_BACKOFF_MAX_SECONDS = float(os.getenv("HTTP_BACKOFF_MAX_SECONDS", "2"))
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "10"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() in {"1", "true", "yes", "on"}
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "performance").lower()
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS")
+SQLITE_BUSY_TIMEOUT_MS = os.getenv("SQLITE_BUSY_TIMEOUT_MS")
+SQLITE_CACHE_SIZE = os.getenv("SQLITE_CACHE_SIZE")
+SQLITE_MMAP_SIZE = os.getenv("SQLITE_MMAP_SIZE")
+SQLITE_TEMP_STORE = os.getenv("SQLITE_TEMP_STORE")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "true").lower() in {
+    "1", "true", "yes", "on"
+}
+PERSON_CACHE_TTL_SECONDS = float(os.getenv("PERSON_CACHE_TTL_SECONDS", "5"))
+PERSON_CACHE_MAX_SIZE = int(os.getenv("PERSON_CACHE_MAX_SIZE", "10000"))
+PERSON_STATS_TTL_SECONDS = float(os.getenv("PERSON_STATS_TTL_SECONDS", "5"))
+PERSON_REPOSITORY = os.getenv("PERSON_REPOSITORY", "sql").lower()
+PERSON_SNAPSHOT_PATH = os.getenv("PERSON_SNAPSHOT_PATH", "")
+PERSON_SNAPSHOT_INTERVAL_SECONDS = float(
+    os.getenv("PERSON_SNAPSHOT_INTERVAL_SECONDS", "30")
+)
+PERSON_REPLICA_SYNC_SECONDS = float(os.getenv("PERSON_REPLICA_SYNC_SECONDS", "5"))
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() in {"1", "true", "yes", "on"}
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in {
+    "1", "true", "yes", "on"
+}
+QUERY_TRACKING = os.getenv("QUERY_TRACKING", "false").lower() in {
+    "1", "true", "yes", "on"
+}
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+MAX_STATEMENTS_PER_REQUEST = int(os.getenv("MAX_STATEMENTS_PER_REQUEST", "20"))
+
+
+def _optional_int(value: Optional[str]) -> Optional[int]:
+    return int(value) if value else None
 
 
 def configure_logging() -> None:
@@ -38,14 +133,26 @@ def configure_logging() -> None:
         log_dir = os.path.dirname(LOG_FILE)
         if log_dir:
             os.makedirs(log_dir, exist_ok=True)
-        # Ensure the log file exists even before first write
-        open(LOG_FILE, "a", encoding="utf-8").close()
-        handlers.append(logging.FileHandler(LOG_FILE))
+        # opens (and so creates) the log file right away
+        handlers.append(
+            RotatingFileHandler(
+                LOG_FILE,
+                maxBytes=LOG_MAX_BYTES,
+                backupCount=LOG_BACKUP_COUNT,
+                encoding="utf-8",
+            )
+        )
 
-    logging.basicConfig(
+    install_logging(
+        handlers,
         level=getattr(logging, LOG_LEVEL, logging.INFO),
-        format="%(asctime)s %(levelname)s %(name)s - %(message)s",
-        handlers=handlers,
+        formatter=(
+            JsonFormatter()
+            if LOG_FORMAT == "json"
+            else logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
+        ),
+        sample_rate=LOG_SAMPLE_RATE,
+        use_queue=LOG_QUEUE,
     )
     # Reduce noisy logs
     logging.getLogger("sqlalchemy").setLevel(logging.WARNING)
@@ -58,32 +165,185 @@ def configure_logging() -> None:
 def create_app() -> FastAPI:
     configure_logging()
     logger = logging.getLogger(__name__)
-    engine: AsyncEngine = create_async_engine(DATABASE_URL, echo=False, future=True)
+    engine: AsyncEngine = build_engine(
+        DATABASE_URL,
+        sqlite_profile=SQLITE_PROFILE,
+        sqlite_overrides={
+            "journal_mode": SQLITE_JOURNAL_MODE,
+            "synchronous": SQLITE_SYNCHRONOUS,
+            "busy_timeout": _optional_int(SQLITE_BUSY_TIMEOUT_MS),
+            "cache_size": _optional_int(SQLITE_CACHE_SIZE),
+            "mmap_size": _optional_int(SQLITE_MMAP_SIZE),
+            "temp_store": SQLITE_TEMP_STORE,
+        },
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+    )
     async_session = async_sessionmaker(engine, expire_on_commit=False)
+    metrics = MetricsRegistry()
+    password_hash_duration = None
+    if METRICS_ENABLED:
+        instrument_engine(engine, metrics)
+        password_hash_duration = metrics.histogram(
+            "password_hash_duration_seconds",
+            "argon2 hash and verify time, including the wait for a pool worker.",
+            ("operation",),
+        )
+    query_tracker = None
+    if QUERY_TRACKING:
+        query_tracker = QueryTracker(
+            slow_query_seconds=SLOW_QUERY_MS / 1000,
+            max_statements=MAX_STATEMENTS_PER_REQUEST,
+        )
+        query_tracker.instrument(engine)
 
     @asynccontextmanager
     async def lifespan(app: FastAPI):
         # attach engine and session maker to app.state for later use and shutdown
         app.state._db_engine = engine
         app.state._db_session = async_session
+        # per-request transaction shared by the SQLAlchemy repositories
+        app.state.unit_of_work = partial(SqlAlchemyUnitOfWork, async_session)
         app.state.SECRET_KEY = SECRET_KEY
         app.state.ACCESS_TOKEN_EXPIRE_MINUTES = ACCESS_TOKEN_EXPIRE_MINUTES
         logger.info("Application startup complete")
 
-        # create tables at startup
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-        # set repository instances (uses sessionmaker)
-        app.state.person_repository = SqlAlchemyPersonRepository(async_session)
-        app.state.user_repository = SqlAlchemyUserRepository(async_session)
-        app.state.git_repository = GitHubRepository()
+        # one read of the schema revision when it is current; upgrade otherwise
+        await check_schema(engine, auto_upgrade=MIGRATE_ON_STARTUP)
+        # set repository instances (uses sessionmaker), keeping any injected ones (tests)
+        background: list[PeriodicTask] = []
+        person_snapshots: Optional[ReplicaPersonRepository] = None
+        if not hasattr(app.state, "person_repository"):
+            person_repository: PersonRepository = SqlAlchemyPersonRepository(
+                async_session
+            )
+            if PERSON_REPOSITORY == "memory":
+                # reads from memory, writes through to the database
+                replica = ReplicaPersonRepository(
+                    person_repository, InMemoryPersonRepository()
+                )
+                if PERSON_SNAPSHOT_PATH:
+                    await replica.load_snapshot(PERSON_SNAPSHOT_PATH)
+                # reloads from the database unless the snapshot is current
+                await replica.sync()
+                background.append(
+                    PeriodicTask(
+                        "person-replica-sync", PERSON_REPLICA_SYNC_SECONDS, replica.sync
+                    )
+                )
+                if PERSON_SNAPSHOT_PATH:
+                    person_snapshots = replica
+                    background.append(
+                        PeriodicTask(
+                            "person-snapshot",
+                            PERSON_SNAPSHOT_INTERVAL_SECONDS,
+                            lambda: replica.save_snapshot(PERSON_SNAPSHOT_PATH),
+                        )
+                    )
+                person_repository = replica
+            elif PERSON_CACHE_TTL_SECONDS > 0:
+                person_repository = CachedPersonRepository(
+                    person_repository,
+                    TTLCache(maxsize=PERSON_CACHE_MAX_SIZE, ttl=PERSON_CACHE_TTL_SECONDS),
+                    stats_cache=(
+                        TTLCache(maxsize=64, ttl=PERSON_STATS_TTL_SECONDS)
+                        if PERSON_STATS_TTL_SECONDS > 0
+                        else None
+                    ),
+                )
+            app.state.person_repository = person_repository
+        if not hasattr(app.state, "user_repository"):
+            user_repository: UserRepository = SqlAlchemyUserRepository(async_session)
+            if REVOCATION_CACHE_ENABLED or USER_CACHE_TTL_SECONDS > 0:
+                # identity lookups served from memory; the DB stays the source of truth
+                cached = CachedUserRepository(
+                    user_repository,
+                    revocations=RevokedTokenIndex() if REVOCATION_CACHE_ENABLED else None,
+                    users=(
+                        TTLCache(maxsize=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+                        if USER_CACHE_TTL_SECONDS > 0
+                        else None
+                    ),
+                )
+                await cached.load()
+                background.append(
+                    PeriodicTask("revocation-sync", REVOCATION_SYNC_SECONDS, cached.load)
+                )
+                user_repository = cached
+            app.state.user_repository = user_repository
+        token_purger = RevokedTokenPurger(
+            app.state.user_repository,
+            batch_size=TOKEN_PURGE_BATCH_SIZE,
+            metrics=metrics if METRICS_ENABLED else None,
+        )
+        app.state.token_purger = token_purger
+        background.append(
+            PeriodicTask("token-purge", TOKEN_PURGE_INTERVAL_SECONDS, token_purger.run)
+        )
+        # one pooled outbound client shared by every HTTP adapter
+        http_client = build_http_client(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            per_host_limit=HTTP_PER_HOST_LIMIT,
+            retries=HTTP_RETRIES,
+            backoff_base=HTTP_BACKOFF_BASE_SECONDS,
+            backoff_max=HTTP_BACKOFF_MAX_SECONDS,
+            timeout=HTTP_TIMEOUT_SECONDS,
+            http2=HTTP2_ENABLED,
+            metrics=metrics if METRICS_ENABLED else None,
+        )
+        app.state.http_client = http_client
+        if not hasattr(app.state, "git_repository"):
+            app.state.git_repository = CachedGitRepository(
+                GitHubRepository(client=http_client),
+                ttl=GIT_CACHE_TTL_SECONDS,
+                max_stale=GIT_CACHE_MAX_STALE_SECONDS,
+            )
+        password_hasher = PasswordHasher(
+            max_workers=PASSWORD_HASH_WORKERS,
+            max_pending=PASSWORD_HASH_MAX_PENDING,
+            use_processes=PASSWORD_HASH_EXECUTOR == "process",
+            time_cost=_optional_int(ARGON2_TIME_COST),
+            memory_cost=_optional_int(ARGON2_MEMORY_COST),
+            parallelism=_optional_int(ARGON2_PARALLELISM),
+            duration=password_hash_duration,
+        )
+        app.state.password_hasher = password_hasher
+        for task in background:
+            task.start()
         yield
+        for task in background:
+            await task.stop()
+        if person_snapshots is not None:
+            await person_snapshots.save_snapshot(PERSON_SNAPSHOT_PATH)
+        password_hasher.shutdown()
+        await http_client.aclose()
         await engine.dispose()
 
     app = FastAPI(
         title="Person Service (DDD + Clean Architecture) - SQLite + Auth",
         lifespan=lifespan,
     )
+    # person handlers dump domain objects directly instead of revalidating them
+    app.state.fast_json = FAST_JSON
+    app.state.metrics = metrics
+    if METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware, metrics=HttpMetrics(metrics))
+        # read at scrape time: the repositories are set up by the lifespan
+        metrics.add_collector(
+            lambda: cache_metrics(
+                (name, getattr(app.state, f"{name}_repository", None))
+                for name in ("person", "user", "git")
+            )
+        )
+        app.include_router(metrics_router, tags=["metrics"])
+    app.state.query_tracker = query_tracker
+    if query_tracker is not None:
+        app.add_middleware(QueryTrackingMiddleware, tracker=query_tracker)
+    # outermost: everything logged while handling a request carries its id
+    app.add_middleware(RequestIdMiddleware)
 
     app.include_router(auth_router, prefix="/auth", tags=["auth"])
     app.include_router(
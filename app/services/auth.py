@@ -6,6 +6,7 @@ from passlib.context import CryptContext
 from fastapi import HTTPException, status, Request
 from app.domain.user import User
 from app.domain.repository.user_repository import UserRepository
+from app.services.password_hasher import PasswordHasher
 
 # Use argon2 for password hashing (no 72-byte bcrypt limit)
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
@@ -54,12 +55,19 @@ def create_access_token(
 
 
 async def authenticate_user(
-    repo: UserRepository, email: str, password: str
+    repo: UserRepository,
+    email: str,
+    password: str,
+    hasher: Optional[PasswordHasher] = None,
 ) -> Optional[User]:
     user = await repo.get_by_email(email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if hasher is not None:
+        valid = await hasher.verify(password, user.hashed_password)
+    else:
+        valid = verify_password(password, user.hashed_password)
+    if not valid:
         return None
     if not user.is_active:
         return None
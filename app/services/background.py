@@ -0,0 +1,36 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+
+class PeriodicTask:
+    """Runs ``fn`` every ``interval`` seconds on the event loop until stopped."""
+
+    def __init__(self, name: str, interval: float, fn: Callable[[], Awaitable[object]]):
+        self.name = name
+        self.interval = interval
+        self._fn = fn
+        self._task: Optional[asyncio.Task] = None
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self._fn()
+            except Exception:
+                self._logger.exception("Periodic task %s failed", self.name)
@@ -0,0 +1,155 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional, Sequence
+
+# set per request by RequestIdMiddleware; None outside requests
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps records with the id of the request that logged them."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a ``rate`` fraction of the records at ``max_level`` and below
+    (evenly spread: 0.1 keeps the 1st, 11th, 21st, ...); records above it,
+    warnings and errors by default, always pass.
+    """
+
+    def __init__(self, rate: float, max_level: int = logging.INFO):
+        super().__init__()
+        self.rate = rate
+        self.max_level = max_level
+        self._seen = 0
+        self._kept = 0
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level or self.rate >= 1:
+            return True
+        with self._lock:
+            keep = self._seen * self.rate >= self._kept
+            self._seen += 1
+            if keep:
+                self._kept += 1
+        return keep
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request_id."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id is not None:
+            entry["request_id"] = request_id
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Leaves formatting to the listener thread. Only what cannot wait is done
+    on the caller: merging the message arguments (they may change later)
+    and rendering a traceback (its frames do not outlive the handler).
+    """
+
+    _tracebacks = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._tracebacks.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_installed: List[logging.Handler] = []
+_listener: Optional[QueueListener] = None
+
+
+def install_logging(
+    handlers: Sequence[logging.Handler],
+    level: int = logging.INFO,
+    formatter: Optional[logging.Formatter] = None,
+    sample_rate: float = 1.0,
+    use_queue: bool = True,
+) -> bool:
+    """
+    Route the root logger to ``handlers``. With ``use_queue`` the calling
+    thread (the event loop) only enqueues records; a listener thread formats
+    and writes them. Like ``logging.basicConfig``, leaves logging alone when
+    the root logger already has handlers installed by someone else (e.g.
+    pytest); handlers from an earlier call are replaced. Returns whether
+    logging was configured.
+    """
+    root = logging.getLogger()
+    if any(h not in _installed for h in root.handlers):
+        return False
+    shutdown_logging()
+
+    filters: List[logging.Filter] = [RequestIdFilter()]
+    if sample_rate < 1:
+        filters.append(SamplingFilter(sample_rate))
+    for handler in handlers:
+        if formatter is not None:
+            handler.setFormatter(formatter)
+    if use_queue:
+        global _listener
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        _listener = QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        front: List[logging.Handler] = [_DeferredQueueHandler(records)]
+    else:
+        front = list(handlers)
+    for handler in front:
+        for log_filter in filters:
+            handler.addFilter(log_filter)
+        root.addHandler(handler)
+        _installed.append(handler)
+    root.setLevel(level)
+    return True
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and remove the handlers installed above."""
+    global _listener
+    root = logging.getLogger()
+    for handler in _installed:
+        root.removeHandler(handler)
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    else:
+        for handler in _installed:
+            handler.close()
+    _installed.clear()
+
+
+atexit.register(shutdown_logging)
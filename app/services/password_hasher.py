@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.services.metrics import Histogram
+
+# (time_cost, memory_cost, parallelism); None keeps the passlib default
+Argon2Params = Tuple[Optional[int], Optional[int], Optional[int]]
+
+# one context per parameter set and per process (process pool workers build their own)
+_contexts: Dict[Argon2Params, CryptContext] = {}
+
+
+def _context(params: Argon2Params) -> CryptContext:
+    ctx = _contexts.get(params)
+    if ctx is None:
+        time_cost, memory_cost, parallelism = params
+        settings = {}
+        if time_cost is not None:
+            settings["argon2__time_cost"] = time_cost
+        if memory_cost is not None:
+            settings["argon2__memory_cost"] = memory_cost
+        if parallelism is not None:
+            settings["argon2__parallelism"] = parallelism
+        ctx = CryptContext(schemes=["argon2"], deprecated="auto", **settings)
+        _contexts[params] = ctx
+    return ctx
+
+
+def _hash(password: str, params: Argon2Params) -> str:
+    return _context(params).hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str, params: Argon2Params) -> bool:
+    try:
+        return _context(params).verify(plain_password, hashed_password)
+    except Exception:
+        # treat verification errors as non-matching
+        return False
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool already has ``max_pending`` jobs queued."""
+
+
+class PasswordHasher:
+    """
+    Runs argon2 hashing/verification on a bounded worker pool so the event
+    loop never blocks on it. Jobs beyond ``max_pending`` are rejected with
+    PasswordHasherBusy instead of queueing without limit.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_pending: int = 64,
+        use_processes: bool = False,
+        time_cost: Optional[int] = None,
+        memory_cost: Optional[int] = None,
+        parallelism: Optional[int] = None,
+        duration: Optional[Histogram] = None,
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._params: Argon2Params = (time_cost, memory_cost, parallelism)
+        self._executor: Executor = (
+            ProcessPoolExecutor(max_workers=max_workers)
+            if use_processes
+            else ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="argon2"
+            )
+        )
+        self._pending = 0
+        self.rejected = 0
+        # labelled "hash" or "verify"; includes the wait for a free worker
+        self._duration = duration
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def hash(self, password: str) -> str:
+        if isinstance(password, bytes):
+            password = password.decode("utf-8", errors="ignore")
+        try:
+            return await self._submit(_hash, password, self._params)
+        except PasswordHasherBusy:
+            raise
+        except Exception as exc:
+            # raise a plain ValueError so callers can map to HTTP 400
+            raise ValueError(f"Error hashing password: {exc}") from exc
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        if isinstance(plain_password, bytes):
+            plain_password = plain_password.decode("utf-8", errors="ignore")
+        return await self._submit(_verify, plain_password, hashed_password, self._params)
+
+    async def _submit(self, fn, *args):
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            self._logger.warning(
+                "Password hashing pool saturated (pending=%d)", self._pending
+            )
+            raise PasswordHasherBusy("Password hashing pool is saturated")
+        loop = asyncio.get_running_loop()
+        self._pending += 1
+        started = time.perf_counter()
+        job = self._executor.submit(fn, *args)
+        # released when the job ends, not when its caller gives up: a
+        # cancelled request leaves its argon2 job running on the pool
+        job.add_done_callback(lambda _: self._release(loop))
+        try:
+            return await asyncio.wrap_future(job)
+        finally:
+            elapsed = time.perf_counter() - started
+            if self._duration is not None:
+                self._duration.labels(fn.__name__.lstrip("_")).observe(elapsed)
+            self._logger.debug("%s took %.1fms", fn.__name__, elapsed * 1000)
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        # runs on a pool thread once the job finished or was cancelled
+        try:
+            loop.call_soon_threadsafe(self._done)
+        except RuntimeError:
+            self._done()  # loop already closed: nothing awaits the count
+
+    def _done(self) -> None:
+        self._pending -= 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
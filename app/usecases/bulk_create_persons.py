@@ -0,0 +1,63 @@
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, Callable, Dict, List, Optional
+from app.domain.person import Person
+from app.domain.repository.person_repository import PersonRepository
+from app.domain.repository.unit_of_work import UnitOfWork
+
+
+@dataclass(frozen=True)
+class BulkRowError:
+    index: int
+    error: str
+
+
+@dataclass
+class BulkCreateResult:
+    created: int = 0
+    errors: List[BulkRowError] = field(default_factory=list)
+
+
+class BulkCreatePersons:
+    """
+    Creates persons from a stream of raw rows. ``validate`` turns a raw row
+    into name/email/age fields or raises ValueError; invalid rows are reported
+    and skipped without aborting the import. The whole stream is read and
+    validated first, then the valid rows are written through ``add_many`` in
+    ``batch_size`` chunks and committed once: the import is all or nothing,
+    and no write transaction stays open while a slow client uploads.
+    """
+
+    def __init__(
+        self,
+        repository: PersonRepository,
+        batch_size: int = 5000,
+        uow: Optional[UnitOfWork] = None,
+    ):
+        self.repository = repository
+        self.batch_size = batch_size
+        self.uow = uow
+
+    async def execute(
+        self,
+        rows: AsyncIterable[Any],
+        validate: Callable[[Any], Dict[str, Any]],
+    ) -> BulkCreateResult:
+        result = BulkCreateResult()
+        persons: List[Person] = []
+        index = 0
+        async for raw in rows:
+            try:
+                fields = validate(raw)
+            except ValueError as exc:
+                result.errors.append(BulkRowError(index=index, error=str(exc)))
+            else:
+                persons.append(
+                    Person(name=fields["name"], email=fields["email"], age=fields.get("age"))
+                )
+            index += 1
+        for start in range(0, len(persons), self.batch_size):
+            batch = persons[start : start + self.batch_size]
+            result.created += await self.repository.add_many(batch)
+        if persons and self.uow is not None:
+            await self.uow.commit()
+        return result
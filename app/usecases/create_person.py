@@ -1,13 +1,18 @@
 from app.domain.person import Person
 from app.domain.repository.person_repository import PersonRepository
+from app.domain.repository.unit_of_work import UnitOfWork
 from typing import Optional
 
 
 class CreatePerson:
-    def __init__(self, repository: PersonRepository):
+    def __init__(self, repository: PersonRepository, uow: Optional[UnitOfWork] = None):
         self.repository = repository
+        self.uow = uow
 
     async def execute(self, name: str, email: str, age: Optional[int] = None) -> Person:
         # Domain invariants and business rules would be enforced here
         person = Person(name=name, email=email, age=age)
-        return await self.repository.add(person)
+        created = await self.repository.add(person)
+        if self.uow is not None:
+            await self.uow.commit()
+        return created
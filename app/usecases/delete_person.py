@@ -1,10 +1,15 @@
 from uuid import UUID
+from typing import Optional
 from app.domain.repository.person_repository import PersonRepository
+from app.domain.repository.unit_of_work import UnitOfWork
 
 
 class DeletePerson:
-    def __init__(self, repository: PersonRepository):
+    def __init__(self, repository: PersonRepository, uow: Optional[UnitOfWork] = None):
         self.repository = repository
+        self.uow = uow
 
     async def execute(self, person_id: UUID) -> None:
         await self.repository.delete(person_id)
+        if self.uow is not None:
+            await self.uow.commit()
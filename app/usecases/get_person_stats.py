@@ -0,0 +1,12 @@
+from app.domain.person_stats import PersonStats
+from app.domain.repository.person_repository import PersonRepository
+
+
+class GetPersonStats:
+    def __init__(self, repository: PersonRepository):
+        self.repository = repository
+
+    async def execute(self, bucket_width: int = 10, top_domains: int = 10) -> PersonStats:
+        return await self.repository.stats(
+            bucket_width=bucket_width, top_domains=top_domains
+        )
@@ -1,5 +1,6 @@
 from typing import List
 from app.domain.person import Person
+from app.domain.person_query import PersonQuery
 from app.domain.repository.person_repository import PersonRepository
 
 
@@ -7,5 +8,5 @@ class ListPersons:
     def __init__(self, repository: PersonRepository):
         self.repository = repository
 
-    async def execute(self) -> List[Person]:
-        return await self.repository.list()
+    async def execute(self, query: PersonQuery) -> List[Person]:
+        return await self.repository.find(query)
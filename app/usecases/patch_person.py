@@ -0,0 +1,37 @@
+from uuid import UUID
+from typing import Any, Dict, Optional
+from app.domain.exceptions import ConcurrencyConflict
+from app.domain.person import Person
+from app.domain.repository.person_repository import PersonRepository
+from app.domain.repository.unit_of_work import UnitOfWork
+
+
+class PatchPerson:
+    def __init__(self, repository: PersonRepository, uow: Optional[UnitOfWork] = None):
+        self.repository = repository
+        self.uow = uow
+
+    async def execute(
+        self,
+        person_id: UUID,
+        changes: Dict[str, Any],
+        expected_version: Optional[int] = None,
+    ) -> Optional[Person]:
+        # a cached copy could be stale: a false 412, or a lost update when
+        # the diff against it comes out empty
+        existing = await self.repository.get_for_update(person_id)
+        if not existing:
+            return None
+        if expected_version is not None and existing.version != expected_version:
+            raise ConcurrencyConflict("Person was modified concurrently")
+        diff = {k: v for k, v in changes.items() if getattr(existing, k) != v}
+        if not diff:
+            # nothing changed: no write, no version bump
+            return existing
+        # guard on the version we diffed against so a concurrent write is not lost
+        updated = await self.repository.update_fields(
+            person_id, diff, expected_version=existing.version
+        )
+        if self.uow is not None:
+            await self.uow.commit()
+        return updated
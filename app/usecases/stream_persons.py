@@ -0,0 +1,14 @@
+from typing import AsyncIterator, List, Optional
+from uuid import UUID
+from app.domain.person import Person
+from app.domain.repository.person_repository import PersonRepository
+
+
+class StreamPersons:
+    def __init__(self, repository: PersonRepository):
+        self.repository = repository
+
+    def execute(
+        self, after: Optional[UUID] = None, chunk_size: int = 500
+    ) -> AsyncIterator[List[Person]]:
+        return self.repository.stream(after=after, chunk_size=chunk_size)
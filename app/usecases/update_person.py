@@ -1,12 +1,14 @@
 from uuid import UUID
-from typing import Optional
+from typing import Any, Dict, Optional
 from app.domain.person import Person
 from app.domain.repository.person_repository import PersonRepository
+from app.domain.repository.unit_of_work import UnitOfWork
 
 
 class UpdatePerson:
-    def __init__(self, repository: PersonRepository):
+    def __init__(self, repository: PersonRepository, uow: Optional[UnitOfWork] = None):
         self.repository = repository
+        self.uow = uow
 
     async def execute(
         self,
@@ -15,14 +17,16 @@ class UpdatePerson:
         email: Optional[str] = None,
         age: Optional[int] = None,
     ) -> Optional[Person]:
-        existing = await self.repository.get_by_id(person_id)
-        if not existing:
-            return None
-        # Build updated entity (immutability)
-        updated = Person(
-            id=existing.id,
-            name=name if name is not None else existing.name,
-            email=email if email is not None else existing.email,
-            age=age if age is not None else existing.age,
-        )
-        return await self.repository.update(updated)
+        # only the provided fields change; the repository applies them in a
+        # single UPDATE ... RETURNING instead of read + write + reload
+        changes: Dict[str, Any] = {}
+        if name is not None:
+            changes["name"] = name
+        if email is not None:
+            changes["email"] = email
+        if age is not None:
+            changes["age"] = age
+        updated = await self.repository.update_fields(person_id, changes)
+        if self.uow is not None:
+            await self.uow.commit()
+        return updated
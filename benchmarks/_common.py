@@ -0,0 +1,74 @@
+"""Shared helpers for the scripts in this directory (run them with ``python -m``)."""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Sequence
+
+import httpx
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def summarize(name: str, samples_ms: Sequence[float]) -> str:
+    if not samples_ms:
+        return f"{name}: no samples"
+    return (
+        f"{name}: n={len(samples_ms)} mean={statistics.fmean(samples_ms):.2f}ms "
+        f"p50={percentile(samples_ms, 50):.2f}ms p95={percentile(samples_ms, 95):.2f}ms "
+        f"p99={percentile(samples_ms, 99):.2f}ms max={max(samples_ms):.2f}ms"
+    )
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic ``asyncio.sleep`` wakes up (event-loop stall)."""
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.lags_ms: List[float] = []
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - started - self.interval
+            self.lags_ms.append(max(0.0, lag) * 1000)
+
+    async def __aenter__(self) -> "LoopLagMonitor":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+def use_temp_database() -> str:
+    """Point DATABASE_URL at a fresh SQLite file; call before importing app.main."""
+    path = os.path.join(tempfile.mkdtemp(prefix="person-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    os.environ.setdefault("LOG_ENABLED", "false")
+    return path
+
+
+@asynccontextmanager
+async def running_app(app) -> AsyncIterator[httpx.AsyncClient]:
+    """Run the app lifespan and yield an in-process client bound to it."""
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            yield client
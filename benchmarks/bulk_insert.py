@@ -0,0 +1,62 @@
+"""
+Insert throughput: one ``add`` per person vs ``add_many`` batches.
+
+    python -m benchmarks.bulk_insert --rows 20000
+"""
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks._common import use_temp_database
+
+from app.adapters.db.migrations import upgrade
+from app.adapters.repositories.sqlalchemy_person_repository import (
+    SqlAlchemyPersonRepository,
+)
+from app.domain.person import Person
+
+
+def _persons(n: int):
+    return [
+        Person(id=uuid4(), name=f"Person {i}", email=f"p{i}@example.com", age=i % 90)
+        for i in range(n)
+    ]
+
+
+async def run(rows: int, single_rows: int, chunk_size: int) -> None:
+    path = use_temp_database()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    await upgrade(engine)
+    repo = SqlAlchemyPersonRepository(
+        async_sessionmaker(engine, expire_on_commit=False), insert_chunk_size=chunk_size
+    )
+
+    persons = _persons(single_rows)
+    started = time.perf_counter()
+    for p in persons:
+        await repo.add(p)
+    single = time.perf_counter() - started
+    print(f"add()      {single_rows:>7} rows in {single:.2f}s = {single_rows / single:,.0f} rows/s")
+
+    persons = _persons(rows)
+    started = time.perf_counter()
+    await repo.add_many(persons)
+    bulk = time.perf_counter() - started
+    print(f"add_many() {rows:>7} rows in {bulk:.2f}s = {rows / bulk:,.0f} rows/s")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--single-rows", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.single_rows, args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
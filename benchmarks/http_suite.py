@@ -0,0 +1,335 @@
+"""
+Throughput and latency of the HTTP API under realistic request mixes.
+
+    python -m benchmarks.http_suite --output run.json
+    python -m benchmarks.http_suite --compare run.json   # exit 1 on a regression
+
+Boots create_app() in-process (no sockets) against a fresh SQLite database,
+or the in-memory person store with ``--person-repository memory``. /git is
+served by a mock GitHub behind the app's pooled transport. Scenarios:
+
+- reads: GET by id, list pages and stats over seeded persons
+- login_burst: concurrent logins (argon2 on the hasher pool)
+- logout_reuse: login, authenticated write, logout, the same token again (401)
+- git: GET /git through the cache (``--git-uncached`` hits the mock every time)
+
+Each scenario reports requests per second and p50/p95/p99 latency per HTTP
+request; a request with an unexpected status counts as an error.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks._common import percentile, running_app, use_temp_database
+
+use_temp_database()
+
+SCENARIOS = ("reads", "login_burst", "logout_reuse", "git")
+PASSWORD = "bench-password"
+REPOS_URL = "https://api.github.test/users/bench/repos"
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    requests: int
+    errors: int
+    seconds: float
+    rps: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def line(self) -> str:
+        return (
+            f"{self.name:<13} n={self.requests:<6} errors={self.errors:<4} "
+            f"rps={self.rps:8.1f}  p50={self.p50_ms:7.2f}ms p95={self.p95_ms:7.2f}ms "
+            f"p99={self.p99_ms:7.2f}ms max={self.max_ms:7.2f}ms"
+        )
+
+
+class Recorder:
+    """Client wrapper timing every request and checking its status."""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.latencies_ms: List[float] = []
+        self.errors = 0
+
+    async def request(
+        self, method: str, url: str, expect: int = 200, **kwargs: Any
+    ) -> httpx.Response:
+        started = time.perf_counter()
+        res = await self.client.request(method, url, **kwargs)
+        self.latencies_ms.append((time.perf_counter() - started) * 1000)
+        if res.status_code != expect:
+            self.errors += 1
+        return res
+
+
+async def drive(
+    name: str,
+    client: httpx.AsyncClient,
+    op: Callable[[Recorder, int], Awaitable[None]],
+    iterations: int,
+    concurrency: int,
+) -> ScenarioResult:
+    recorder = Recorder(client)
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with sem:
+            await op(recorder, i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(iterations)))
+    seconds = time.perf_counter() - started
+    samples = recorder.latencies_ms
+    return ScenarioResult(
+        name=name,
+        requests=len(samples),
+        errors=recorder.errors,
+        seconds=round(seconds, 3),
+        rps=round(len(samples) / seconds, 1) if seconds else 0.0,
+        mean_ms=round(sum(samples) / len(samples), 3) if samples else 0.0,
+        p50_ms=round(percentile(samples, 50), 3),
+        p95_ms=round(percentile(samples, 95), 3),
+        p99_ms=round(percentile(samples, 99), 3),
+        max_ms=round(max(samples, default=0.0), 3),
+    )
+
+
+async def _token(client: httpx.AsyncClient, email: str) -> str:
+    await client.post("/auth/register", json={"email": email, "password": PASSWORD})
+    res = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+    return res.json()["access_token"]
+
+
+async def reads(client: httpx.AsyncClient, args) -> ScenarioResult:
+    auth = {"Authorization": f"Bearer {await _token(client, 'reader@example.com')}"}
+    rows = [
+        {"name": f"Person {i}", "email": f"p{i}@example{i % 7}.com", "age": i % 90}
+        for i in range(args.persons)
+    ]
+    for start in range(0, len(rows), 1000):
+        await client.post("/persons/bulk", json=rows[start : start + 1000], headers=auth)
+    ids = [p["id"] for p in (await client.get("/persons?limit=1000")).json()]
+
+    async def op(rec: Recorder, i: int) -> None:
+        roll = random.Random(i).random()
+        if roll < 0.7:
+            await rec.request("GET", f"/persons/{ids[i % len(ids)]}")
+        elif roll < 0.9:
+            sort = "name" if i % 2 else "id"
+            await rec.request("GET", f"/persons?limit=50&sort={sort}")
+        else:
+            await rec.request("GET", "/persons/stats")
+
+    return await drive("reads", client, op, args.requests, args.concurrency)
+
+
+async def login_burst(client: httpx.AsyncClient, args) -> ScenarioResult:
+    emails = [f"burst{i}@example.com" for i in range(10)]
+    for email in emails:
+        await client.post("/auth/register", json={"email": email, "password": PASSWORD})
+
+    async def op(rec: Recorder, i: int) -> None:
+        body = {"email": emails[i % len(emails)], "password": PASSWORD}
+        await rec.request("POST", "/auth/login", json=body)
+
+    return await drive("login_burst", client, op, args.logins, args.concurrency)
+
+
+async def logout_reuse(client: httpx.AsyncClient, args) -> ScenarioResult:
+    email = "reuse@example.com"
+    await client.post("/auth/register", json={"email": email, "password": PASSWORD})
+
+    async def op(rec: Recorder, i: int) -> None:
+        res = await rec.request(
+            "POST", "/auth/login", json={"email": email, "password": PASSWORD}
+        )
+        auth = {"Authorization": f"Bearer {res.json()['access_token']}"}
+        person = {"name": f"Reuse {i}", "email": f"reuse{i}@example.com"}
+        await rec.request("POST", "/persons", expect=201, json=person, headers=auth)
+        await rec.request("POST", "/auth/logout", expect=204, headers=auth)
+        # a revoked token must be refused
+        await rec.request("POST", "/persons", expect=401, json=person, headers=auth)
+
+    return await drive("logout_reuse", client, op, args.logins, args.concurrency)
+
+
+async def git(client: httpx.AsyncClient, args) -> ScenarioResult:
+    async def op(rec: Recorder, i: int) -> None:
+        await rec.request("GET", "/git")
+
+    return await drive("git", client, op, args.requests, args.concurrency)
+
+
+def github_mock(upstream_ms: float, calls: List[int], pages: int = 3):
+    """Paginated GitHub with ETags, answering after ``upstream_ms``."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        await asyncio.sleep(upstream_ms / 1000)
+        page = int(request.url.params.get("page", "1"))
+        etag = f'"page-{page}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        headers = {"ETag": etag}
+        if page == 1:
+            headers["Link"] = (
+                f'<{REPOS_URL}?per_page=30&page=2>; rel="next", '
+                f'<{REPOS_URL}?per_page=30&page={pages}>; rel="last"'
+            )
+        items = [
+            {"name": f"repo{page}-{i}", "full_name": f"bench/repo{page}-{i}"}
+            for i in range(30)
+        ]
+        return httpx.Response(200, json=items, headers=headers)
+
+    return httpx.MockTransport(handler)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def compare(
+    results: List[ScenarioResult], baseline_path: str, tolerance: float
+) -> List[str]:
+    """Scenarios whose p95 grew or throughput dropped by more than ``tolerance``."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {s["name"]: s for s in json.load(f)["scenarios"]}
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if base is None:
+            continue
+        p95_change = result.p95_ms / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        rps_change = result.rps / base["rps"] - 1 if base["rps"] else 0.0
+        print(f"  {result.name:<13} p95 {p95_change:+.1%}  rps {rps_change:+.1%}")
+        if p95_change > tolerance or rps_change < -tolerance:
+            regressions.append(result.name)
+        if result.errors > base["errors"]:
+            regressions.append(f"{result.name} (errors)")
+    return regressions
+
+
+async def run(args) -> List[ScenarioResult]:
+    import app.main as main
+    from app.adapters.http.pooled_client import PooledTransport
+    from app.adapters.repositories.cached_git_repository import CachedGitRepository
+    from app.adapters.repositories.github_repository import GitHubRepository
+
+    results = []
+    for name in args.scenarios:
+        # a fresh app and database per scenario: no caches warmed by another mix
+        use_temp_database()
+        main.DATABASE_URL = os.environ["DATABASE_URL"]
+        app = main.create_app()
+        upstream_calls: List[int] = []
+        git_client = httpx.AsyncClient(
+            transport=PooledTransport(
+                github_mock(args.upstream_ms, upstream_calls),
+                per_host_limit=main.HTTP_PER_HOST_LIMIT,
+            )
+        )
+        github = GitHubRepository(REPOS_URL, client=git_client, per_page=30)
+        app.state.git_repository = (
+            github
+            if args.git_uncached
+            else CachedGitRepository(
+                github,
+                ttl=main.GIT_CACHE_TTL_SECONDS,
+                max_stale=main.GIT_CACHE_MAX_STALE_SECONDS,
+            )
+        )
+        async with running_app(app) as client:
+            result = await SCENARIO_FUNCS[name](client, args)
+        await git_client.aclose()
+        if name == "git":
+            result.extra["upstream_calls"] = len(upstream_calls)
+        print(result.line(), flush=True)
+        results.append(result)
+    return results
+
+
+SCENARIO_FUNCS = {
+    "reads": reads,
+    "login_burst": login_burst,
+    "logout_reuse": logout_reuse,
+    "git": git,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--scenario",
+        dest="scenarios",
+        action="append",
+        choices=SCENARIOS,
+        help="run only this scenario (repeatable); default: all",
+    )
+    parser.add_argument("--requests", type=int, default=2000, help="reads and git")
+    parser.add_argument("--logins", type=int, default=200, help="login scenarios")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--persons", type=int, default=2000, help="seeded for reads")
+    parser.add_argument("--person-repository", choices=["sql", "memory"], default="sql")
+    parser.add_argument("--upstream-ms", type=float, default=20.0)
+    parser.add_argument("--git-uncached", action="store_true")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--compare", help="JSON of an earlier run to check against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    args.scenarios = args.scenarios or list(SCENARIOS)
+    # read by app.main at import time
+    os.environ["PERSON_REPOSITORY"] = args.person_repository
+
+    results = asyncio.run(run(args))
+    if args.output:
+        report = {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "settings": {k: v for k, v in vars(args).items() if k != "compare"},
+            "scenarios": [asdict(r) for r in results],
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    if args.compare:
+        print(f"against {args.compare} (tolerance {args.tolerance:.0%}):")
+        regressions = compare(results, args.compare, args.tolerance)
+        if regressions:
+            print("regressions: " + ", ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
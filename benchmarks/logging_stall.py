@@ -0,0 +1,97 @@
+"""
+Event-loop stall caused by logging, with records written inline and queued.
+
+    python -m benchmarks.logging_stall --requests 2000 --slow-io-ms 1
+
+Concurrent fake requests each log a few INFO lines through the app's
+pipeline (JSON formatter, rotating file). ``--slow-io-ms`` adds a sleep to
+every write, as a full disk queue or a blocked stderr pipe would. Reports
+the time the loop spends inside logging calls and the loop lag.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+from uuid import uuid4
+
+from benchmarks._common import LoopLagMonitor, summarize
+
+from app.services.log_pipeline import (
+    JsonFormatter,
+    install_logging,
+    request_id_var,
+    shutdown_logging,
+)
+
+LINES_PER_REQUEST = 3
+
+
+class SlowRotatingFileHandler(RotatingFileHandler):
+    def __init__(self, *args, delay_seconds: float = 0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delay_seconds = delay_seconds
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.delay_seconds:
+            time.sleep(self.delay_seconds)
+        super().emit(record)
+
+
+async def run(mode: str, requests: int, concurrency: int, slow_io_ms: float) -> None:
+    path = os.path.join(tempfile.mkdtemp(prefix="person-bench-"), "app.log")
+    handler = SlowRotatingFileHandler(
+        path,
+        maxBytes=10 * 1024 * 1024,
+        backupCount=2,
+        encoding="utf-8",
+        delay_seconds=slow_io_ms / 1000,
+    )
+    install_logging([handler], formatter=JsonFormatter(), use_queue=mode == "queue")
+    logger = logging.getLogger("benchmarks.logging_stall")
+    sem = asyncio.Semaphore(concurrency)
+    in_logging_ms = []
+
+    async def one(i: int) -> None:
+        async with sem:
+            request_id_var.set(uuid4().hex)  # each task runs in its own context
+            for line in range(LINES_PER_REQUEST):
+                started = time.perf_counter()
+                logger.info("request %d step %d email=%s", i, line, "a@example.com")
+                in_logging_ms.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    async with LoopLagMonitor() as monitor:
+        await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    drain_started = time.perf_counter()
+    shutdown_logging()  # queue mode: waits for the listener to write the backlog
+    drain = time.perf_counter() - drain_started
+
+    print(
+        f"[{mode}] {len(in_logging_ms)} records in {elapsed:.2f}s "
+        f"(+{drain:.2f}s draining), loop blocked {sum(in_logging_ms):.1f}ms"
+    )
+    print("  " + summarize("logging call", in_logging_ms))
+    print("  " + summarize("loop lag", monitor.lags_ms))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--slow-io-ms", type=float, default=0.0)
+    parser.add_argument("--mode", choices=["inline", "queue", "both"], default="both")
+    args = parser.parse_args()
+    # the benchmark owns the root logger
+    logging.getLogger().handlers.clear()
+    modes = ["inline", "queue"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        asyncio.run(run(mode, args.requests, args.concurrency, args.slow_io_ms))
+
+
+if __name__ == "__main__":
+    main()
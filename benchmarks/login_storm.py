@@ -0,0 +1,65 @@
+"""
+Event-loop latency during a concurrent login storm.
+
+    python -m benchmarks.login_storm --logins 200 --concurrency 50
+
+Runs the storm twice: with argon2 verification inline on the event loop and
+through the app's PasswordHasher pool, reporting login latency and loop lag.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks._common import LoopLagMonitor, running_app, summarize, use_temp_database
+
+use_temp_database()
+
+from app.main import create_app  # noqa: E402
+
+EMAIL = "storm@example.com"
+PASSWORD = "storm-password"
+
+
+async def storm(mode: str, logins: int, concurrency: int) -> None:
+    app = create_app()
+    async with running_app(app) as client:
+        await client.post("/auth/register", json={"email": EMAIL, "password": PASSWORD})
+        if mode == "inline":
+            app.state.password_hasher = None
+
+        sem = asyncio.Semaphore(concurrency)
+        latencies = []
+        statuses = {}
+
+        async def one() -> None:
+            async with sem:
+                started = time.perf_counter()
+                res = await client.post(
+                    "/auth/login", json={"email": EMAIL, "password": PASSWORD}
+                )
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[res.status_code] = statuses.get(res.status_code, 0) + 1
+
+        started = time.perf_counter()
+        async with LoopLagMonitor() as monitor:
+            await asyncio.gather(*(one() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+
+    print(f"[{mode}] {logins} logins in {elapsed:.2f}s statuses={statuses}")
+    print("  " + summarize("login latency", latencies))
+    print("  " + summarize("loop lag", monitor.lags_ms))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--mode", choices=["inline", "pool", "both"], default="both")
+    args = parser.parse_args()
+    modes = ["inline", "pool"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        asyncio.run(storm(mode, args.logins, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
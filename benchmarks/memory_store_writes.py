@@ -0,0 +1,63 @@
+"""
+Single-row write latency of the in-memory person store against its size.
+
+    python -m benchmarks.memory_store_writes --sizes 1000 10000 100000 200000
+
+Every write blocks the event loop for its whole duration, so these numbers
+are also the stall each write imposes on concurrent readers.
+"""
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from benchmarks._common import summarize
+
+from app.adapters.repositories.in_memory_person_repository import (
+    InMemoryPersonRepository,
+)
+from app.domain.person import Person
+
+
+def _person(i: int) -> Person:
+    return Person(
+        id=uuid4(), name=f"Person {i}", email=f"p{i}@example{i % 50}.com", age=i % 90
+    )
+
+
+async def run(size: int, writes: int) -> None:
+    repo = InMemoryPersonRepository()
+    await repo.restore(_person(i) for i in range(size))
+    ids = [p.id for p in await repo.list(limit=writes)]
+    timings = {"add": [], "update_fields": [], "delete": []}
+    for i in range(writes):
+        started = time.perf_counter()
+        await repo.add(_person(size + i))
+        timings["add"].append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await repo.update_fields(ids[i], {"name": f"Renamed {i}", "age": i % 70})
+        timings["update_fields"].append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await repo.delete(ids[i])
+        timings["delete"].append((time.perf_counter() - started) * 1000)
+
+    print(f"[{size} persons] {writes} writes of each kind")
+    for name, samples in timings.items():
+        print("  " + summarize(name, samples))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 200_000]
+    )
+    parser.add_argument("--writes", type=int, default=500)
+    args = parser.parse_args()
+    for size in args.sizes:
+        asyncio.run(run(size, min(args.writes, size)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Per-request cost of the metrics middleware and per-statement cost of the
+engine instrumentation, each against the same work without them.
+
+    python -m benchmarks.metrics_overhead --requests 50000 --queries 20000
+"""
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+
+from app.adapters.db.instrumentation import instrument_engine
+from app.api.metrics import HttpMetrics, MetricsMiddleware
+from app.services.metrics import MetricsRegistry
+
+_ROUTE = SimpleNamespace(path="/persons/{person_id}")
+
+
+async def _endpoint(scope, receive, send):
+    # what the router leaves in the scope once a route matched
+    scope["route"] = _ROUTE
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def _send(message):
+    pass
+
+
+async def _per_request_us(app, n: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/persons/1"}
+    started = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope), _receive, _send)
+    return (time.perf_counter() - started) / n * 1e6
+
+
+def _per_query_us(instrumented: bool, n: int) -> float:
+    # plain pysqlite: the aiosqlite thread hop would drown the listeners' cost
+    engine = create_engine("sqlite://")
+    if instrumented:
+        instrument_engine(engine, MetricsRegistry())
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1")
+            started = time.perf_counter()
+            for _ in range(n):
+                conn.exec_driver_sql("SELECT 1")
+            return (time.perf_counter() - started) / n * 1e6
+    finally:
+        engine.dispose()
+
+
+def _report(label: str, bare: float, timed: float) -> None:
+    print(
+        f"{label:<14} bare {bare:6.2f} us  with metrics {timed:6.2f} us  "
+        f"(+{timed - bare:.2f} us)"
+    )
+
+
+async def run(requests: int, queries: int, rounds: int) -> None:
+    # best of alternating rounds: other load on the machine only adds time
+    wrapped = MetricsMiddleware(_endpoint, HttpMetrics(MetricsRegistry()))
+    bare = timed = float("inf")
+    for _ in range(rounds):
+        bare = min(bare, await _per_request_us(_endpoint, requests))
+        timed = min(timed, await _per_request_us(wrapped, requests))
+    _report("ASGI request", bare, timed)
+    bare = timed = float("inf")
+    for _ in range(rounds):
+        bare = min(bare, _per_query_us(False, queries))
+        timed = min(timed, _per_query_us(True, queries))
+    _report("SELECT 1", bare, timed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.queries, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Cost of loading persons for ``list()``: ORM entities copied into domain
+objects (the old read path) vs Core row tuples through the mappers, plus the
+footprint of slotted vs plain frozen dataclasses.
+
+    python -m benchmarks.orm_mapping --rows 100000
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks._common import use_temp_database
+
+from app.adapters.db.models import PersonModel
+from app.adapters.db.migrations import upgrade
+from app.adapters.repositories.sqlalchemy_person_repository import (
+    SqlAlchemyPersonRepository,
+)
+from app.domain.person import Person
+
+
+@dataclass(frozen=True)
+class _PlainPerson:
+    # Person as it was before slots, for the footprint comparison
+    id: UUID = field(default_factory=uuid4)
+    name: str = ""
+    email: str = ""
+    age: Optional[int] = None
+    version: int = 1
+
+
+async def _measure(label: str, load: Callable[[], Awaitable[list]], rounds: int) -> None:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        rows = await load()
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    rows = await load()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<22} {len(rows):>7} rows  best {best:.3f}s  "
+        f"peak {peak / 2**20:7.1f} MiB"
+    )
+
+
+def _footprint(cls, n: int) -> float:
+    ids = [uuid4() for _ in range(n)]
+    tracemalloc.start()
+    objs = [cls(i, "Person", "p@example.com", 30, 1) for i in ids]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objs
+    return current / n
+
+
+async def run(rows: int, rounds: int) -> None:
+    path = use_temp_database()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    await upgrade(engine)
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    repo = SqlAlchemyPersonRepository(sessionmaker)
+    await repo.add_many(
+        [
+            Person(name=f"Person {i}", email=f"p{i}@example.com", age=i % 90)
+            for i in range(rows)
+        ]
+    )
+
+    async def orm_entities() -> List[Person]:
+        async with sessionmaker() as session:
+            res = await session.execute(select(PersonModel).order_by(PersonModel.id))
+            return [
+                Person(r.id, r.name, r.email, r.age, r.version)
+                for r in res.scalars().all()
+            ]
+
+    await _measure("ORM entities", orm_entities, rounds)
+    await _measure("Core rows + mapper", repo.list, rounds)
+    await engine.dispose()
+
+    n = min(rows, 100000)
+    print(f"plain frozen dataclass {_footprint(_PlainPerson, n):6.0f} bytes/object")
+    print(f"slotted Person         {_footprint(Person, n):6.0f} bytes/object")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
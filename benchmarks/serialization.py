@@ -0,0 +1,90 @@
+"""
+Per-row cost of person responses: ``PersonOut`` + response_model revalidation
+(what FastAPI does by default) vs the fast JSON path.
+
+    python -m benchmarks.serialization --rows 1000 --rounds 50
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from benchmarks._common import running_app, summarize, use_temp_database
+
+from app.adapters.repositories.in_memory_person_repository import (
+    InMemoryPersonRepository,
+)
+from app.adapters.schemas.person_schema import PersonOut
+from app.api.fast_json import dumps, orjson, person_to_dict
+from app.domain.person import Person
+
+
+def _persons(n: int) -> List[Person]:
+    return [
+        Person(id=uuid4(), name=f"Person {i}", email=f"p{i}@example.com", age=i % 90)
+        for i in range(n)
+    ]
+
+
+def _validated(persons: List[Person], adapter: TypeAdapter) -> bytes:
+    # handler builds PersonOut, FastAPI validates and serializes it again
+    content = [PersonOut.model_validate(p) for p in persons]
+    value = adapter.validate_python(content, from_attributes=True)
+    return JSONResponse(adapter.dump_python(value, mode="json")).body
+
+
+def _fast(persons: List[Person]) -> bytes:
+    return dumps([person_to_dict(p) for p in persons])
+
+
+def _per_row_us(fn, persons: List[Person], rounds: int) -> float:
+    fn(persons)  # warm up
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn(persons)
+    return (time.perf_counter() - started) / (rounds * len(persons)) * 1e6
+
+
+async def _end_to_end(persons: List[Person], rounds: int) -> None:
+    use_temp_database()
+    from app.main import create_app
+
+    app = create_app()
+    repo = InMemoryPersonRepository()
+    await repo.add_many(persons)
+    app.state.person_repository = repo
+    async with running_app(app) as client:
+        for fast in (False, True):
+            app.state.fast_json = fast
+            samples = []
+            for _ in range(rounds):
+                started = time.perf_counter()
+                r = await client.get("/persons", params={"limit": len(persons)})
+                samples.append((time.perf_counter() - started) * 1000)
+                assert r.status_code == 200
+            label = "fast" if fast else "validated"
+            print(summarize(f"GET /persons?limit={len(persons)} {label}", samples))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    persons = _persons(args.rows)
+    adapter = TypeAdapter(List[PersonOut])
+    before = _per_row_us(lambda ps: _validated(ps, adapter), persons, args.rounds)
+    after = _per_row_us(_fast, persons, args.rounds)
+    encoder = "orjson" if orjson is not None else "json"
+    print(f"validated       {before:6.2f} us/row")
+    print(f"fast ({encoder:6}) {after:6.2f} us/row  ({before / after:.1f}x)")
+    asyncio.run(_end_to_end(persons, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Mixed read/write load against SQLite for each performance profile.
+
+    python -m benchmarks.sqlite_profiles --seconds 5 --readers 16 --writers 2
+
+Readers fetch persons by id and list pages while writers insert and update
+concurrently; reports throughput and read latency per profile.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from dataclasses import replace
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from benchmarks._common import summarize
+
+from app.adapters.db.engine import SQLITE_PROFILES, build_engine
+from app.adapters.db.migrations import upgrade
+from app.adapters.repositories.sqlalchemy_person_repository import (
+    SqlAlchemyPersonRepository,
+)
+from app.domain.person import Person
+
+
+async def run_profile(
+    profile: str, seconds: float, readers: int, writers: int, seed_rows: int, pool_size: int
+):
+    path = os.path.join(tempfile.mkdtemp(prefix="person-bench-"), f"{profile}.db")
+    engine = build_engine(
+        f"sqlite+aiosqlite:///{path}", sqlite_profile=profile, pool_size=pool_size
+    )
+    await upgrade(engine)
+    repo = SqlAlchemyPersonRepository(async_sessionmaker(engine, expire_on_commit=False))
+    seed = [
+        Person(id=uuid4(), name=f"Seed {i}", email=f"s{i}@example.com", age=i % 90)
+        for i in range(seed_rows)
+    ]
+    await repo.add_many(seed)
+
+    deadline = time.perf_counter() + seconds
+    read_ms = []
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+
+    async def reader():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                if random.random() < 0.8:
+                    await repo.get_by_id(random.choice(seed).id)
+                else:
+                    await repo.list(limit=50)
+            except Exception:
+                counts["errors"] += 1
+                continue
+            read_ms.append((time.perf_counter() - started) * 1000)
+            counts["reads"] += 1
+
+    async def writer():
+        while time.perf_counter() < deadline:
+            try:
+                if random.random() < 0.5:
+                    await repo.add(Person(name="New", email=f"{uuid4().hex}@example.com"))
+                else:
+                    target = random.choice(seed)
+                    await repo.update(replace(target, age=random.randint(0, 90)))
+            except Exception:
+                counts["errors"] += 1
+                continue
+            counts["writes"] += 1
+
+    await asyncio.gather(*[reader() for _ in range(readers)], *[writer() for _ in range(writers)])
+    await engine.dispose()
+    print(
+        f"[{profile}] reads/s={counts['reads'] / seconds:,.0f} "
+        f"writes/s={counts['writes'] / seconds:,.0f} errors={counts['errors']}"
+    )
+    print("  " + summarize("read latency", read_ms))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seed-rows", type=int, default=5000)
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--profile", choices=sorted(SQLITE_PROFILES), action="append")
+    args = parser.parse_args()
+    for profile in args.profile or sorted(SQLITE_PROFILES):
+        asyncio.run(
+            run_profile(
+                profile,
+                args.seconds,
+                args.readers,
+                args.writers,
+                args.seed_rows,
+                args.pool_size,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
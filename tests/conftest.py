@@ -1,18 +1,22 @@
 import pytest
 import asyncio
+import json
+import os
 from fastapi.testclient import TestClient
-from typing import Dict, Optional
-from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from dataclasses import replace
+from datetime import datetime, timezone
+from pathlib import Path
 from uuid import UUID, uuid4
 
+import app.main as main_module
 from app.main import create_app
 from app.domain.user import User
 from app.services.auth import get_password_hash
 
-# import Person dataclass / domain entity used by repositories in tests
-from app.domain.person import (
-    Person,
-)  # adjust import if your project uses a different path/name
+from app.adapters.repositories.in_memory_person_repository import (
+    InMemoryPersonRepository,
+)
 
 
 # Simple in-memory UserRepository implementation for tests
@@ -33,6 +37,15 @@ class InMemoryUserRepository:
     async def get_by_id(self, user_id: UUID) -> Optional[User]:
         return self._users_by_id.get(str(user_id))
 
+    async def deactivate(self, user_id: UUID) -> Optional[User]:
+        user = self._users_by_id.get(str(user_id))
+        if not user:
+            return None
+        user = replace(user, is_active=False)
+        self._users_by_email[user.email] = user
+        self._users_by_id[str(user.id)] = user
+        return user
+
     async def add_revoked_token(self, jti: str, expires_at: datetime) -> None:
         self._revoked_tokens[jti] = expires_at
 
@@ -40,39 +53,32 @@ class InMemoryUserRepository:
         exp = self._revoked_tokens.get(jti)
         if not exp:
             return False
-        return datetime.utcnow() < exp  # token considered revoked if now < expires_at
-
-
-# Simple in-memory PersonRepository implementation for tests
-class InMemoryPersonRepository:
-    def __init__(self):
-        self._store: Dict[str, Person] = {}
-
-    async def add(self, person: Person) -> Person:
-        self._store[str(person.id)] = person
-        return person
-
-    async def get_by_id(self, person_id: UUID) -> Optional[Person]:
-        return self._store.get(str(person_id))
+        now = datetime.now(exp.tzinfo) if exp.tzinfo else datetime.utcnow()
+        return now < exp  # token considered revoked if now < expires_at
 
-    async def list(self):
-        return list(self._store.values())
+    async def list_revoked_tokens(self) -> List[Tuple[str, datetime]]:
+        return list(self._revoked_tokens.items())
 
-    async def update(self, person: Person) -> Person:
-        if str(person.id) not in self._store:
-            raise KeyError("Person not found")
-        self._store[str(person.id)] = person
-        return person
-
-    async def delete(self, person_id: UUID) -> None:
-        self._store.pop(str(person_id), None)
+    async def purge_expired_tokens(self, batch_size: int = 1000) -> int:
+        now = datetime.now(timezone.utc)
+        expired = [
+            jti
+            for jti, exp in self._revoked_tokens.items()
+            if (exp if exp.tzinfo else exp.replace(tzinfo=timezone.utc)) <= now
+        ][:batch_size]
+        for jti in expired:
+            del self._revoked_tokens[jti]
+        return len(expired)
 
 
 @pytest.fixture
-def app():
+def app(tmp_path, monkeypatch):
     """
     Create a FastAPI app and replace repositories by in-memory ones for tests.
+    Startup still checks the schema: point it at a throwaway database.
     """
+    db_url = f"sqlite+aiosqlite:///{tmp_path / 'app.db'}"
+    monkeypatch.setattr(main_module, "DATABASE_URL", db_url)
     app = create_app()
 
     # override repositories with in-memory versions
@@ -109,3 +115,59 @@ def test_user(app):
     # run the async create coroutine synchronously for the fixture
     asyncio.run(repo.create(user))
     return {"email": email, "password": raw_password, "user": user}
+
+
+@pytest.fixture
+def sql_client(tmp_path, monkeypatch):
+    """
+    A TestClient on a temporary SQLite database with the SQL repositories,
+    no caches in front of them and query tracking on.
+    """
+    db_url = f"sqlite+aiosqlite:///{tmp_path / 'test.db'}"
+    monkeypatch.setattr(main_module, "DATABASE_URL", db_url)
+    monkeypatch.setattr(main_module, "PERSON_CACHE_TTL_SECONDS", 0)
+    monkeypatch.setattr(main_module, "REVOCATION_CACHE_ENABLED", False)
+    monkeypatch.setattr(main_module, "USER_CACHE_TTL_SECONDS", 0)
+    monkeypatch.setattr(main_module, "QUERY_TRACKING", True)
+    with TestClient(create_app()) as c:
+        yield c
+
+
+QUERY_BUDGETS = Path(__file__).parent / "query_budgets.json"
+
+
+@pytest.fixture
+def statement_budget(sql_client):
+    """
+    Fail the request (and so the test) when an endpoint runs more SQL
+    statements than recorded in tests/query_budgets.json, or has no budget.
+    With UPDATE_QUERY_BUDGETS=1 the most each endpoint ran is recorded instead.
+    """
+    budgets = json.loads(QUERY_BUDGETS.read_text()) if QUERY_BUDGETS.exists() else {}
+    updating = os.getenv("UPDATE_QUERY_BUDGETS") == "1"
+    observed: Dict[str, int] = {}
+
+    def check(endpoint, queries):
+        observed[endpoint] = max(observed.get(endpoint, 0), queries.count)
+        if updating:
+            return
+        budget = budgets.get(endpoint)
+        if budget is None:
+            raise AssertionError(
+                f"{endpoint} has no statement budget; record it with "
+                "UPDATE_QUERY_BUDGETS=1"
+            )
+        if queries.count > budget:
+            statement, repeats = queries.most_repeated()
+            raise AssertionError(
+                f"{endpoint} ran {queries.count} SQL statements, budget is {budget}; "
+                f"most repeated ({repeats}x): {statement}"
+            )
+
+    tracker = sql_client.app.state.query_tracker
+    tracker.add_listener(check)
+    yield observed
+    tracker.remove_listener(check)
+    if updating:
+        budgets.update(observed)
+        QUERY_BUDGETS.write_text(json.dumps(budgets, indent=2, sort_keys=True) + "\n")
@@ -71,3 +71,53 @@ def test_logout_revokes_token_and_protected_endpoint(test_user, client):
         headers={"Authorization": f"Bearer {token}"},
     )
     assert create_resp2.status_code == 401
+
+
+def test_login_rejected_with_503_when_hash_pool_saturated(test_user, client):
+    from app.services.password_hasher import PasswordHasher
+
+    saturated = PasswordHasher(max_workers=1, max_pending=0)
+    client.app.state.password_hasher = saturated
+    try:
+        resp = client.post(
+            "/auth/login",
+            json={"email": test_user["email"], "password": test_user["password"]},
+        )
+    finally:
+        saturated.shutdown()
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+    assert saturated.rejected == 1
+
+
+def test_cancelled_caller_keeps_its_job_counted_until_it_ends():
+    import asyncio
+    import threading
+
+    from app.services.password_hasher import PasswordHasher, PasswordHasherBusy
+
+    release = threading.Event()
+
+    async def main():
+        hasher = PasswordHasher(max_workers=1, max_pending=1)
+        try:
+            caller = asyncio.create_task(hasher._submit(release.wait))
+            await asyncio.sleep(0.05)
+            caller.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await caller
+            # the job still occupies the worker
+            assert hasher.pending == 1
+            with pytest.raises(PasswordHasherBusy):
+                await hasher.hash("secret")
+            release.set()
+            for _ in range(100):
+                if not hasher.pending:
+                    break
+                await asyncio.sleep(0.01)
+            assert hasher.pending == 0
+        finally:
+            release.set()
+            hasher.shutdown()
+
+    asyncio.run(main())
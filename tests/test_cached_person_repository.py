@@ -0,0 +1,186 @@
+import asyncio
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.main as main_module
+from app.adapters.cache.ttl_cache import TTLCache
+from app.adapters.db.migrations import upgrade
+from app.adapters.db.unit_of_work import SqlAlchemyUnitOfWork
+from app.adapters.repositories.cached_person_repository import CachedPersonRepository
+from app.adapters.repositories.in_memory_person_repository import (
+    InMemoryPersonRepository,
+)
+from app.adapters.repositories.sqlalchemy_person_repository import (
+    SqlAlchemyPersonRepository,
+)
+from app.domain.person import Person
+
+
+class _CountingRepository(InMemoryPersonRepository):
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    async def get_by_id(self, person_id):
+        self.reads += 1
+        await asyncio.sleep(0.01)
+        return await super().get_by_id(person_id)
+
+    async def stats(self, bucket_width=10, top_domains=10):
+        self.reads += 1
+        await asyncio.sleep(0.01)
+        return await super().stats(bucket_width, top_domains)
+
+
+def test_hot_key_is_loaded_once_and_refreshed_on_write():
+    async def main():
+        inner = _CountingRepository()
+        person = Person(id=uuid4(), name="Hot", email="hot@example.com")
+        await inner.add(person)
+        repo = CachedPersonRepository(inner, TTLCache(maxsize=10, ttl=60))
+
+        results = await asyncio.gather(*(repo.get_by_id(person.id) for _ in range(50)))
+        assert all(r == person for r in results)
+        assert inner.reads == 1
+        assert repo.cache_stats()["coalesced"] == 49
+
+        updated = await repo.update_fields(person.id, {"name": "Hotter"})
+        assert (await repo.get_by_id(person.id)) == updated
+        assert inner.reads == 1
+
+        await repo.delete(person.id)
+        assert await repo.get_by_id(person.id) is None
+        assert inner.reads == 2
+
+    asyncio.run(main())
+
+
+def test_stats_are_shared_until_a_write():
+    async def main():
+        inner = _CountingRepository()
+        repo = CachedPersonRepository(
+            inner, TTLCache(maxsize=10, ttl=60), stats_cache=TTLCache(maxsize=4, ttl=60)
+        )
+        await repo.add(Person(id=uuid4(), name="A", email="a@example.com", age=31))
+
+        results = await asyncio.gather(*(repo.stats() for _ in range(20)))
+        assert {r.total for r in results} == {1}
+        assert inner.reads == 1
+
+        await repo.add_many([Person(id=uuid4(), name="B", email="b@example.org")])
+        stats = await repo.stats()
+        assert (stats.total, stats.null_age, inner.reads) == (2, 1, 2)
+
+    asyncio.run(main())
+
+
+def test_cache_follows_the_unit_of_work_commit(tmp_path):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+        await upgrade(engine)
+        sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        repo = CachedPersonRepository(
+            SqlAlchemyPersonRepository(sessionmaker), TTLCache(maxsize=10, ttl=60)
+        )
+        try:
+            person = await repo.add(Person(name="Gone", email="gone@example.com"))
+            kept = await repo.add(Person(name="Kept", email="kept@example.com"))
+
+            # started outside the unit of work: reads on its own connection
+            deleted, read = asyncio.Event(), asyncio.Event()
+
+            async def concurrent_read():
+                await deleted.wait()
+                assert await repo.get_by_id(person.id) == person  # not committed yet
+                read.set()
+
+            reader = asyncio.create_task(concurrent_read())
+            async with SqlAlchemyUnitOfWork(sessionmaker) as uow:
+                await repo.delete(person.id)
+                deleted.set()
+                await read.wait()
+                await uow.commit()
+            await reader
+            assert await repo.get_by_id(person.id) is None
+
+            # an uncommitted write never reaches the cache
+            async with SqlAlchemyUnitOfWork(sessionmaker):
+                await repo.update_fields(kept.id, {"name": "Renamed"})
+            assert (await repo.get_by_id(kept.id)).name == "Kept"
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
+
+
+def test_patches_on_a_worker_with_a_stale_cache(tmp_path, monkeypatch):
+    db_url = f"sqlite+aiosqlite:///{tmp_path / 'shared.db'}"
+    monkeypatch.setattr(main_module, "DATABASE_URL", db_url)
+    # two workers on one database, each with the default person cache
+    with TestClient(main_module.create_app()) as a, TestClient(
+        main_module.create_app()
+    ) as b:
+        credentials = {"email": "stale@example.com", "password": "secret123"}
+        a.post("/auth/register", json=credentials)
+        token = a.post("/auth/login", json=credentials).json()["access_token"]
+        auth = {"Authorization": f"Bearer {token}"}
+        body = {"name": "Stale", "email": "stale-person@example.com", "age": 30}
+        person_id = a.post("/persons", json=body, headers=auth).json()["id"]
+        cached = a.get(f"/persons/{person_id}")  # A now caches age=30
+        res = b.patch(f"/persons/{person_id}", json={"age": 40}, headers=auth)
+        assert res.json()["age"] == 40
+
+        # unconditional: applied to the current row, not A's cached copy
+        res = a.patch(f"/persons/{person_id}", json={"name": "Z"}, headers=auth)
+        assert res.status_code == 200
+        assert (res.json()["name"], res.json()["age"]) == ("Z", 40)
+        # not a no-op against the cached age=30: the row holds 40
+        res = a.patch(f"/persons/{person_id}", json={"age": 30}, headers=auth)
+        assert res.status_code == 200
+        # B finds 30 in the database: nothing to write, same version
+        again = b.patch(f"/persons/{person_id}", json={"age": 30}, headers=auth)
+        assert again.headers["etag"] == res.headers["etag"]
+
+        # a conflict drops the stale entry instead of failing every retry
+        res = b.patch(f"/persons/{person_id}", json={"age": 50}, headers=auth)
+        assert res.status_code == 200
+        res = a.patch(
+            f"/persons/{person_id}",
+            json={"age": 60},
+            headers={**auth, "If-Match": cached.headers["etag"]},
+        )
+        assert res.status_code == 412
+        assert a.get(f"/persons/{person_id}").json()["age"] == 50
+
+
+def test_misses_inside_a_unit_of_work_read_through_its_session(tmp_path):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+        await upgrade(engine)
+        sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        inner = SqlAlchemyPersonRepository(sessionmaker)
+        repo = CachedPersonRepository(inner, TTLCache(maxsize=10, ttl=60))
+        try:
+            person = await inner.add(Person(name="Miss", email="miss@example.com"))
+            other = await inner.add(Person(name="Other", email="other@example.com"))
+            checkouts = []
+            event.listen(engine.sync_engine, "checkout", lambda *a: checkouts.append(1))
+
+            async with SqlAlchemyUnitOfWork(sessionmaker):
+                await inner.list(limit=1)  # the request's connection, e.g. auth
+                assert await repo.get_by_id(person.id) == person
+                renamed = await repo.update_fields(other.id, {"name": "Renamed"})
+                # sees the unit of work's own write, which is not cached yet
+                assert await repo.get_by_id(other.id) == renamed
+            assert len(checkouts) == 1
+
+            assert await repo.get_by_id(person.id) == person  # cached by the read
+            assert (await repo.get_by_id(other.id)).name == "Other"  # rolled back
+            assert len(checkouts) == 2
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from app.adapters.cache.revoked_token_index import RevokedTokenIndex
+from app.adapters.cache.ttl_cache import TTLCache
+from app.adapters.repositories.cached_user_repository import CachedUserRepository
+from app.domain.user import User
+from tests.conftest import InMemoryUserRepository
+
+
+def test_revoked_token_index_evicts_at_expiry():
+    now = datetime.now(timezone.utc)
+    index = RevokedTokenIndex()
+    index.add("short", now + timedelta(seconds=10))
+    index.add("long", now + timedelta(hours=1))
+
+    assert index.contains("short", now)
+    assert not index.contains("unknown", now)
+    assert not index.contains("short", now + timedelta(seconds=11))
+    assert len(index) == 1
+    assert index.contains("long", now + timedelta(seconds=11))
+
+
+def test_revocation_checks_do_not_reach_inner_repository():
+    async def scenario():
+        inner = InMemoryUserRepository()
+        expires = datetime.now(timezone.utc) + timedelta(minutes=5)
+        await inner.add_revoked_token("revoked-before-start", expires)
+
+        repo = CachedUserRepository(inner, RevokedTokenIndex())
+        await repo.load()
+        await repo.add_revoked_token("revoked-after-start", expires)
+
+        async def fail(jti):
+            raise AssertionError("revocation check hit the inner repository")
+
+        inner.is_token_revoked = fail
+        assert await repo.is_token_revoked("revoked-before-start")
+        assert await repo.is_token_revoked("revoked-after-start")
+        assert not await repo.is_token_revoked("never-revoked")
+
+    asyncio.run(scenario())
+
+
+def test_user_cache_hits_and_invalidates_on_deactivate():
+    async def scenario():
+        inner = InMemoryUserRepository()
+        user = User(id=uuid4(), email="cached@example.com", hashed_password="x")
+        repo = CachedUserRepository(inner, users=TTLCache(maxsize=10, ttl=60))
+        await repo.create(user)
+
+        assert await repo.get_by_email(user.email) == user
+        calls = []
+        original = inner.get_by_email
+
+        async def counting(email):
+            calls.append(email)
+            return await original(email)
+
+        inner.get_by_email = counting
+        assert await repo.get_by_email(user.email) == user
+        assert await repo.get_by_id(user.id) == user
+        assert calls == []
+        assert repo.cache_stats()["hits"] == 2
+
+        await repo.deactivate(user.id)
+        refreshed = await repo.get_by_email(user.email)
+        assert calls == [user.email]
+        assert refreshed is not None and not refreshed.is_active
+
+    asyncio.run(scenario())
+
+
+def test_ttl_cache_expires_and_evicts_lru():
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    now[0] = 11
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
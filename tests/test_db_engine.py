@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from app.adapters.db.engine import build_engine, sqlite_pragmas
+
+
+def _pragma(engine, name):
+    async def read():
+        async with engine.connect() as conn:
+            return (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+
+    return read()
+
+
+def test_performance_profile_is_applied_on_connect(tmp_path):
+    async def main():
+        engine = build_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'test.db'}",
+            sqlite_profile="performance",
+            sqlite_overrides={"busy_timeout": 1234, "cache_size": None},
+        )
+        try:
+            assert await _pragma(engine, "journal_mode") == "wal"
+            assert await _pragma(engine, "synchronous") == 1  # NORMAL
+            assert await _pragma(engine, "busy_timeout") == 1234
+            assert await _pragma(engine, "cache_size") == -65536
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        sqlite_pragmas("turbo")
@@ -0,0 +1,80 @@
+import asyncio
+from typing import List
+
+import httpx
+
+from app.adapters.repositories.cached_git_repository import CachedGitRepository
+from app.adapters.repositories.github_repository import GitHubRepository
+from app.domain.git_repo import GitRepo
+from app.domain.repository.git_repository import GitRepository
+
+REPOS_URL = "https://api.github.test/users/someone/repos"
+
+
+def _github_mock(calls: List[httpx.Request], pages: int = 3) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        page = int(request.url.params.get("page", "1"))
+        etag = f'"page-{page}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        headers = {"ETag": etag}
+        if page == 1:
+            headers["Link"] = (
+                f'<{REPOS_URL}?per_page=2&page=2>; rel="next", '
+                f'<{REPOS_URL}?per_page=2&page={pages}>; rel="last"'
+            )
+        items = [
+            {"name": f"r{page}{i}", "full_name": f"someone/r{page}{i}"}
+            for i in range(2)
+        ]
+        return httpx.Response(200, json=items, headers=headers)
+
+    return httpx.MockTransport(handler)
+
+
+def test_follows_link_pagination_and_revalidates_with_etag():
+    async def main():
+        calls: List[httpx.Request] = []
+        async with httpx.AsyncClient(transport=_github_mock(calls)) as client:
+            repo = GitHubRepository(REPOS_URL, client=client, per_page=2)
+            first = await repo.list_repos()
+            assert [r.name for r in first] == ["r10", "r11", "r20", "r21", "r30", "r31"]
+            assert len(calls) == 3
+
+            second = await repo.list_repos()
+            assert second == first
+            assert len(calls) == 6
+            assert all(c.headers.get("If-None-Match") for c in calls[3:])
+
+    asyncio.run(main())
+
+
+class _SlowRepository(GitRepository):
+    def __init__(self):
+        self.calls = 0
+
+    async def list_repos(self) -> List[GitRepo]:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return [GitRepo(name=f"v{self.calls}", full_name=f"someone/v{self.calls}")]
+
+
+def test_cached_repository_coalesces_and_serves_stale_while_revalidating():
+    async def main():
+        now = [0.0]
+        inner = _SlowRepository()
+        repo = CachedGitRepository(inner, ttl=10, max_stale=100, clock=lambda: now[0])
+
+        results = await asyncio.gather(*(repo.list_repos() for _ in range(20)))
+        assert inner.calls == 1
+        assert all(r[0].name == "v1" for r in results)
+
+        now[0] = 50  # stale: served immediately, refreshed in the background
+        stale = await asyncio.gather(*(repo.list_repos() for _ in range(5)))
+        assert all(r[0].name == "v1" for r in stale)
+        await asyncio.sleep(0.05)
+        assert inner.calls == 2
+        assert (await repo.list_repos())[0].name == "v2"
+
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+import asyncio
+
+import httpx
+
+from app.adapters.http.pooled_client import PooledTransport
+
+
+def test_retries_idempotent_requests_on_retryable_status():
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        if len(attempts) < 3:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"ok": True})
+
+    async def main():
+        transport = PooledTransport(
+            httpx.MockTransport(handler), retries=2, backoff_base=0.001
+        )
+        async with httpx.AsyncClient(transport=transport) as client:
+            res = await client.get("https://upstream.test/x")
+            assert res.json() == {"ok": True}
+            assert transport.retries_total == 2
+
+            attempts.clear()
+            res = await client.post("https://upstream.test/x")
+            assert res.status_code == 503  # POST is never retried
+            assert len(attempts) == 1
+
+    asyncio.run(main())
+
+
+def test_per_host_limit_caps_concurrency():
+    active = []
+    peak = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        active.append(1)
+        peak.append(len(active))
+        await asyncio.sleep(0.01)
+        active.pop()
+        return httpx.Response(200)
+
+    async def main():
+        transport = PooledTransport(httpx.MockTransport(handler), per_host_limit=2)
+        async with httpx.AsyncClient(transport=transport) as client:
+            await asyncio.gather(*(client.get("https://upstream.test/") for _ in range(8)))
+        assert max(peak) == 2
+        assert transport.stats()["in_flight"] == 0
+        assert transport.stats()["requests_total"] == 8
+
+    asyncio.run(main())
+
+
+def test_pool_statistics_are_exported(client):
+    # reads the pool httpx keeps private: fails here if an upgrade moves it
+    assert "idle" in PooledTransport(httpx.AsyncHTTPTransport()).stats()
+
+    lines = client.get("/metrics").text.splitlines()
+    assert 'http_client_connections{state="in_use"} 0' in lines
+    assert 'http_client_connections{state="idle"} 0' in lines
+    assert "http_client_requests_in_flight 0" in lines
+    assert "http_client_host_slot_wait_seconds_total 0" in lines
@@ -0,0 +1,132 @@
+import asyncio
+import random
+from collections import Counter
+from dataclasses import replace
+from uuid import uuid4
+
+import app.adapters.repositories.in_memory_person_repository as in_memory
+from app.adapters.repositories.in_memory_person_repository import (
+    InMemoryPersonRepository,
+)
+from app.domain.person import Person
+from app.domain.person_query import PersonQuery
+
+
+def _persons(n):
+    return [
+        Person(id=uuid4(), name=f"P{i}", email=f"p{i:03d}@example.com", age=i % 50)
+        for i in range(n)
+    ]
+
+
+def test_streams_read_one_state_while_writers_publish_new_ones():
+    async def main():
+        repo = InMemoryPersonRepository()
+        persons = _persons(30)
+        await repo.add_many(persons)
+
+        seen = []
+        async for chunk in repo.stream(chunk_size=10):
+            seen += chunk
+            # neither visible to nor blocked by the running stream
+            await repo.delete(chunk[0].id)
+            await repo.add(Person(name="Late", email="late@example.com"))
+        assert sorted(p.id for p in seen) == sorted(p.id for p in persons)
+        assert (await repo.stats()).total == 30
+        assert len(await repo.list()) == 30
+
+    asyncio.run(main())
+
+
+def test_email_prefix_uses_the_email_index_for_any_sort_order():
+    async def main():
+        repo = InMemoryPersonRepository()
+        persons = _persons(120)
+        await repo.add_many(persons)
+        await repo.add_many(persons[:5])  # replacing persons keeps indexes sorted
+        query = PersonQuery(email_prefix="p01", sort="age", descending=True, limit=4)
+        page = await repo.find(query)
+        after = query.position(page[-1])
+        rest = await repo.find(replace(query, limit=None, after=after))
+        expected = sorted(
+            (p for p in persons if p.email.startswith("p01")),
+            key=lambda p: (p.age, p.id),
+            reverse=True,
+        )
+        assert page + rest == expected
+
+    asyncio.run(main())
+
+
+def test_snapshot_round_trip_keeps_persons_indexes_and_change_counter(tmp_path):
+    async def main():
+        path = str(tmp_path / "persons.snapshot")
+        repo = InMemoryPersonRepository()
+        assert not await repo.load_snapshot(path)
+        await repo.add_many(_persons(50))
+        person = (await repo.list(limit=1))[0]
+        await repo.update_fields(person.id, {"name": "Renamed", "age": None})
+        assert await repo.save_snapshot(path)
+        assert not await repo.save_snapshot(path)
+
+        reloaded = InMemoryPersonRepository()
+        assert await reloaded.load_snapshot(path)
+        assert await reloaded.get_by_id(person.id) == await repo.get_by_id(person.id)
+        assert await reloaded.change_counter() == await repo.change_counter()
+        assert await reloaded.stats() == await repo.stats()
+        by_age = PersonQuery(sort="age", limit=10)
+        assert await reloaded.find(by_age) == await repo.find(by_age)
+
+    asyncio.run(main())
+
+
+def test_small_writes_share_the_untouched_chunks(monkeypatch):
+    # tiny chunks and shards: every write splits, folds or shares some of them
+    monkeypatch.setattr(in_memory, "_CHUNK_SIZE", 4)
+    monkeypatch.setattr(in_memory, "_SHARDS", 8)
+
+    async def main():
+        rng = random.Random(7)
+        repo = InMemoryPersonRepository()
+        expected = {p.id: p for p in _persons(60)}
+        await repo.add_many(list(expected.values()))
+        before = await repo.find(PersonQuery(sort="name"))
+        first = repo._state
+
+        for _ in range(300):
+            op = rng.random()
+            if op < 0.4 or not expected:
+                person = Person(
+                    name=f"N{rng.randrange(99)}",
+                    email=f"e{rng.randrange(999)}@d{rng.randrange(5)}.com",
+                    age=rng.choice([None, rng.randrange(80)]),
+                )
+                expected[person.id] = await repo.add(person)
+            elif op < 0.7:
+                person_id = rng.choice(list(expected))
+                changes = {"age": rng.randrange(80), "name": f"U{rng.randrange(99)}"}
+                expected[person_id] = await repo.update_fields(person_id, changes)
+            else:
+                person_id = rng.choice(list(expected))
+                await repo.delete(person_id)
+                del expected[person_id]
+
+        for sort in ("id", "name", "email", "age"):
+            for descending in (False, True):
+                query = PersonQuery(sort=sort, descending=descending)
+                assert await repo.find(query) == sorted(
+                    expected.values(),
+                    key=lambda p: PersonQuery.order_key(getattr(p, sort), p.id),
+                    reverse=descending,
+                )
+        streamed = [p async for chunk in repo.stream(chunk_size=7) for p in chunk]
+        assert streamed == sorted(expected.values(), key=lambda p: p.id)
+        stats = await repo.stats(top_domains=10)
+        assert stats.total == len(expected)
+        domains = Counter(p.email.partition("@")[2] for p in expected.values())
+        assert dict(stats.top_email_domains) == dict(domains)
+        # the first published state was never modified
+        repo._state = first
+        assert await repo.find(PersonQuery(sort="name")) == before
+
+    asyncio.run(main())
@@ -0,0 +1,49 @@
+import io
+import json
+import logging
+import threading
+
+from app.services.log_pipeline import (
+    JsonFormatter,
+    install_logging,
+    request_id_var,
+    shutdown_logging,
+)
+
+
+def test_queued_json_records_keep_request_ids_and_sample_info(monkeypatch):
+    # pytest's capture handlers would make install_logging stand aside
+    monkeypatch.setattr(logging.getLogger(), "handlers", [])
+    written_by = set()
+
+    class Recording(logging.StreamHandler):
+        def emit(self, record):
+            written_by.add(threading.current_thread().name)
+            super().emit(record)
+
+    out = io.StringIO()
+    assert install_logging(
+        [Recording(out)], formatter=JsonFormatter(), sample_rate=0.5, use_queue=True
+    )
+    logger = logging.getLogger("test.log_pipeline")
+    token = request_id_var.set("req-1")
+    try:
+        for i in range(4):
+            logger.info("person %s", i)
+        logger.warning("slow")
+    finally:
+        request_id_var.reset(token)
+        shutdown_logging()  # drains the queue
+
+    entries = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [e["message"] for e in entries] == ["person 0", "person 2", "slow"]
+    assert {e["request_id"] for e in entries} == {"req-1"}
+    assert threading.current_thread().name not in written_by
+
+
+def test_request_id_is_echoed_or_generated(client):
+    res = client.get("/persons/not-a-uuid", headers={"X-Request-ID": "abc-123"})
+    assert res.headers["x-request-id"] == "abc-123"
+    # not reused: could forge log lines
+    res = client.get("/persons", headers={"X-Request-ID": "bad id\n"})
+    assert len(res.headers["x-request-id"]) == 32
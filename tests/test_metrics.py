@@ -0,0 +1,67 @@
+import asyncio
+from uuid import uuid4
+
+from sqlalchemy import event, text
+
+from app.adapters.db.engine import build_engine
+from app.adapters.db.instrumentation import instrument_engine
+from app.services.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("op_seconds", "Op time.", ("op",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.labels("read").observe(value)
+    registry.counter("ops_total", "Ops.").inc(2)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE op_seconds histogram" in lines
+    assert 'op_seconds_bucket{op="read",le="0.1"} 2' in lines
+    assert 'op_seconds_bucket{op="read",le="1"} 3' in lines
+    assert 'op_seconds_bucket{op="read",le="+Inf"} 4' in lines
+    assert 'op_seconds_sum{op="read"} 3.65' in lines
+    assert 'op_seconds_count{op="read"} 4' in lines
+    assert "ops_total 2" in lines
+
+
+def test_requests_are_labelled_by_route_template(client):
+    for _ in range(3):
+        assert client.get(f"/persons/{uuid4()}").status_code == 404
+    client.get(f"/no-such-route/{uuid4()}")
+
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = res.text.splitlines()
+    assert (
+        'http_requests_total{method="GET",route="/persons/{person_id}",status="404"} 3'
+        in lines
+    )
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in lines
+    unmatched_count = 'http_request_duration_seconds_count{method="GET",route="unmatched"}'
+    assert f"{unmatched_count} 1" in lines
+    # the scrape itself is in flight while it renders
+    assert "http_requests_in_flight 1" in lines
+    assert 'cache_hits_total{cache="person"}' not in res.text  # no cache in front
+
+
+def test_every_pool_checkout_wait_is_observed(tmp_path):
+    async def main():
+        engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+        registry = MetricsRegistry()
+        instrument_engine(engine, registry)
+        checkouts = []
+        event.listen(engine.sync_engine, "checkout", lambda *args: checkouts.append(1))
+        try:
+            for _ in range(3):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+        finally:
+            await engine.dispose()
+        return checkouts, registry.render().splitlines()
+
+    checkouts, lines = asyncio.run(main())
+    # fails if the engine stops checking out through the timed pool.connect()
+    assert len(checkouts) == 3
+    assert "db_pool_checkout_wait_seconds_count 3" in lines
@@ -0,0 +1,143 @@
+import asyncio
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.adapters.db.migrations import (
+    HEAD,
+    SchemaOutOfDate,
+    check_schema,
+    current_revision,
+    upgrade,
+)
+from app.adapters.db.models import Base
+from app.adapters.repositories.sqlalchemy_person_repository import (
+    SqlAlchemyPersonRepository,
+)
+from app.domain.person_query import PersonQuery
+
+# the persons/users tables as the first releases created them
+_LEGACY_DDL = [
+    "CREATE TABLE persons (id VARCHAR(36) NOT NULL PRIMARY KEY, name VARCHAR NOT NULL, "
+    "email VARCHAR NOT NULL, age INTEGER)",
+    "CREATE INDEX ix_persons_id ON persons (id)",
+    "CREATE INDEX ix_persons_email ON persons (email)",
+    "CREATE TABLE users (id VARCHAR(36) NOT NULL PRIMARY KEY, email VARCHAR NOT NULL, "
+    "hashed_password VARCHAR NOT NULL, is_active BOOLEAN)",
+    "CREATE INDEX ix_users_id ON users (id)",
+    "CREATE UNIQUE INDEX ix_users_email ON users (email)",
+]
+
+
+def test_legacy_text_keys_are_converted_to_binary_uuids(tmp_path):
+    ids = sorted(uuid4() for _ in range(3))
+
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}")
+        try:
+            async with engine.begin() as conn:
+                for ddl in _LEGACY_DDL:
+                    await conn.exec_driver_sql(ddl)
+                for i, person_id in enumerate(ids):
+                    await conn.exec_driver_sql(
+                        "INSERT INTO persons VALUES (?, ?, ?, ?)",
+                        (str(person_id), f"Legacy {i}", f"l{i}@example.com", 20 + i),
+                    )
+            assert len(await upgrade(engine)) == HEAD  # unversioned: from 0
+            assert await upgrade(engine) == []
+            async with engine.connect() as conn:
+                stored = (
+                    await conn.exec_driver_sql("SELECT typeof(id), length(id) FROM persons")
+                ).all()
+                indexes = {
+                    row[0]
+                    for row in await conn.exec_driver_sql(
+                        "SELECT name FROM sqlite_master WHERE type = 'index'"
+                    )
+                }
+            assert set(stored) == {("blob", 16)}
+            assert not indexes & {"ix_persons_id", "ix_persons_email", "ix_users_id"}
+            assert {"ix_users_email", "ix_persons_email_id"} <= indexes
+
+            repo = SqlAlchemyPersonRepository(async_sessionmaker(engine))
+            persons = await repo.list()
+            assert [p.id for p in persons] == ids
+            assert all(isinstance(p.id, UUID) and p.version == 1 for p in persons)
+            assert [p.id for p in await repo.list(after=ids[0])] == ids[1:]
+            found = await repo.find(PersonQuery(name_contains="gacy 2"))
+            assert [p.id for p in found] == [ids[2]]
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
+
+
+def _schema(conn):
+    inspector = inspect(conn)
+    return {
+        name: (
+            {c["name"] for c in inspector.get_columns(name)},
+            {i["name"] for i in inspector.get_indexes(name)},
+        )
+        for name in inspector.get_table_names()
+    }
+
+
+def test_fresh_database_upgrades_to_the_models(tmp_path):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'fresh.db'}")
+        try:
+            await upgrade(engine)
+            async with engine.connect() as conn:
+                assert await conn.run_sync(current_revision) == HEAD
+                schema = await conn.run_sync(_schema)
+        finally:
+            await engine.dispose()
+        for table in Base.metadata.sorted_tables:
+            columns, indexes = schema[table.name]
+            assert columns == {c.name for c in table.columns}
+            assert indexes == {i.name for i in table.indexes}
+
+    asyncio.run(main())
+
+
+def test_startup_check_reads_the_revision_only_when_current(tmp_path):
+    async def main():
+        url = f"sqlite+aiosqlite:///{tmp_path / 'check.db'}"
+        engine = create_async_engine(url)
+        try:
+            with pytest.raises(SchemaOutOfDate):
+                await check_schema(engine, auto_upgrade=False)
+            await check_schema(engine)
+
+            statements = []
+            event.listen(
+                engine.sync_engine,
+                "before_cursor_execute",
+                lambda conn, cursor, sql, *args: statements.append(sql),
+            )
+            await check_schema(engine, auto_upgrade=False)
+            assert len(statements) <= 2
+            assert all(s.lstrip().upper().startswith(("SELECT", "PRAGMA")) for s in statements)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
+
+
+def test_concurrent_upgrades_apply_each_revision_once(tmp_path):
+    async def main():
+        url = f"sqlite+aiosqlite:///{tmp_path / 'race.db'}"
+        engines = [create_async_engine(url) for _ in range(3)]
+        try:
+            results = await asyncio.gather(*(upgrade(e) for e in engines))
+            async with engines[0].connect() as conn:
+                assert await conn.run_sync(current_revision) == HEAD
+        finally:
+            for engine in engines:
+                await engine.dispose()
+        assert sorted(len(applied) for applied in results) == [0, 0, HEAD]
+
+    asyncio.run(main())
@@ -1,3 +1,4 @@
+import json
 from fastapi.testclient import TestClient
 from uuid import UUID
 
@@ -63,3 +64,209 @@ def test_list_and_delete_person(client):
     res2 = client.get("/persons/")
     assert res2.status_code == 200
     assert len(res2.json()) >= 1
+
+
+def test_list_persons_keyset_pagination_and_stream(client):
+    token = _register_and_login(client)
+    created = set()
+    for i in range(5):
+        r = client.post(
+            "/persons/",
+            json={"name": f"P{i}", "email": f"p{i}@example.com"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert r.status_code == 201
+        created.add(r.json()["id"])
+
+    seen = []
+    after = None
+    while True:
+        params = {"limit": 2}
+        if after:
+            params["after"] = after
+        res = client.get("/persons", params=params)
+        assert res.status_code == 200
+        seen.extend(p["id"] for p in res.json())
+        after = res.headers.get("X-Next-Cursor")
+        if not after:
+            break
+    assert seen == sorted(seen, key=UUID)
+    assert created <= set(seen)
+    assert len(seen) == len(set(seen))
+
+    streamed = client.get("/persons", params={"stream": "true"})
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in streamed.text.splitlines()]
+    assert [p["id"] for p in lines] == seen
+
+
+def test_bulk_create_reports_invalid_rows_without_aborting(client):
+    token = _register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    ndjson = "\n".join(
+        [
+            json.dumps({"name": "Bulk A", "email": "bulk-a@example.com", "age": 20}),
+            json.dumps({"name": "Bulk B", "email": "not-an-email"}),
+            "{broken json",
+            json.dumps({"name": "Bulk C", "email": "bulk-c@example.com"}),
+        ]
+    )
+    res = client.post(
+        "/persons/bulk",
+        content=ndjson,
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert res.status_code == 200, res.text
+    body = res.json()
+    assert body["created"] == 2
+    assert [e["index"] for e in body["errors"]] == [1, 2]
+
+    csv_body = "name,email,age\nBulk D,bulk-d@example.com,41\nBulk E,bulk-e@example.com,\n"
+    res = client.post(
+        "/persons/bulk", content=csv_body, headers={**headers, "Content-Type": "text/csv"}
+    )
+    assert res.json() == {"created": 2, "failed": 0, "errors": []}
+
+    emails = {p["email"] for p in client.get("/persons").json()}
+    assert {"bulk-a@example.com", "bulk-c@example.com", "bulk-d@example.com"} <= emails
+
+
+def test_patch_skips_noop_writes_and_honours_if_match(client):
+    token = _register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    created = client.post(
+        "/persons/",
+        json={"name": "Pat", "email": "pat@example.com", "age": 40},
+        headers=headers,
+    ).json()
+    url = f"/persons/{created['id']}"
+
+    noop = client.patch(url, json={"name": "Pat"}, headers=headers)
+    assert noop.status_code == 200
+    assert noop.headers["ETag"] == '"1"'
+
+    changed = client.patch(
+        url, json={"age": None}, headers={**headers, "If-Match": '"1"'}
+    )
+    assert changed.status_code == 200
+    assert changed.json()["age"] is None
+    assert changed.headers["ETag"] == '"2"'
+
+    stale = client.patch(
+        url, json={"name": "Lost"}, headers={**headers, "If-Match": '"1"'}
+    )
+    assert stale.status_code == 412
+    assert client.get(url).json()["name"] == "Pat"
+
+
+def test_reads_answer_304_while_unchanged(client):
+    token = _register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    created = client.post(
+        "/persons/", json={"name": "Eve", "email": "eve@example.com"}, headers=headers
+    ).json()
+    url = f"/persons/{created['id']}"
+
+    first = client.get(url)
+    assert first.headers["ETag"] == '"1"'
+    cached = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    listing = client.get("/persons")
+    etag = listing.headers["ETag"]
+    assert client.get("/persons", headers={"If-None-Match": etag}).status_code == 304
+
+    client.put(url, json={"age": 30})
+    assert client.get(url, headers={"If-None-Match": '"1"'}).status_code == 200
+    fresh = client.get("/persons", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+
+
+def test_fast_json_matches_the_validated_responses(app, client):
+    token = _register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    bodies = {}
+    for fast in (False, True):
+        app.state.fast_json = fast
+        created = client.post(
+            "/persons/",
+            json={"name": "Zoë", "email": f"z{int(fast)}@example.com", "age": 9},
+            headers=headers,
+        )
+        assert created.status_code == 201
+        url = f"/persons/{created.json()['id']}"
+        got = client.get(url)
+        assert got.headers["ETag"] == '"1"'
+        put = client.put(url, json={"age": 10})
+        assert put.headers["ETag"] == '"2"'
+        page = client.get("/persons", params={"limit": 1})
+        assert page.headers["content-type"] == "application/json"
+        assert "X-Next-Cursor" in page.headers and "ETag" in page.headers
+        bodies[fast] = (got.json(), put.json())
+    (got, put), (fast_got, fast_put) = bodies[False], bodies[True]
+    assert {**got, "id": None, "email": None} == {**fast_got, "id": None, "email": None}
+    assert put["age"] == fast_put["age"] == 10
+    pages = []
+    for fast in (False, True):
+        app.state.fast_json = fast
+        pages.append(client.get("/persons").json())
+    assert pages[0] == pages[1]
+
+
+def test_list_persons_filters_sorts_and_pages_with_opaque_cursor(client):
+    token = _register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    for i, (name, age) in enumerate(
+        [("Ana", 30), ("Mariana", 25), ("Bruno", 41), ("Juliana", None), ("Luana", 27)]
+    ):
+        r = client.post(
+            "/persons/",
+            json={"name": name, "email": f"f{i}@example.com", "age": age},
+            headers=headers,
+        )
+        assert r.status_code == 201
+
+    r = client.get(
+        "/persons", params={"name_contains": "ANA", "sort": "-age", "limit": 2}
+    )
+    assert [p["name"] for p in r.json()] == ["Ana", "Luana"]
+    cursor = r.headers["X-Next-Cursor"]
+    rest = client.get(
+        "/persons",
+        params={"name_contains": "ANA", "sort": "-age", "limit": 2, "after": cursor},
+    )
+    assert [p["name"] for p in rest.json()] == ["Mariana", "Juliana"]
+
+    aged = client.get("/persons", params={"min_age": 25, "max_age": 30, "sort": "name"})
+    assert [p["name"] for p in aged.json()] == ["Ana", "Luana", "Mariana"]
+    prefixed = client.get("/persons", params={"email_prefix": "f3"})
+    assert [p["name"] for p in prefixed.json()] == ["Juliana"]
+
+    assert client.get("/persons", params={"sort": "age", "after": "nope"}).status_code == 422
+    assert client.get("/persons", params={"sort": "height"}).status_code == 422
+    assert client.get("/persons", params={"stream": True, "min_age": 1}).status_code == 400
+
+
+def test_person_stats(client):
+    token = _register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    for i, age in enumerate([5, 9, 23, None]):
+        client.post(
+            "/persons/",
+            json={"name": "S", "email": f"s{i}@{'ab'[i % 2]}.com", "age": age},
+            headers=headers,
+        )
+    r = client.get("/persons/stats", params={"top_domains": 1})
+    assert r.status_code == 200
+    assert r.json() == {
+        "total": 4,
+        "null_age": 1,
+        "age_buckets": [
+            {"min_age": 0, "max_age": 9, "count": 2},
+            {"min_age": 20, "max_age": 29, "count": 1},
+        ],
+        "email_domains": [{"domain": "a.com", "count": 2}],
+    }
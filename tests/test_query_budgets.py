@@ -0,0 +1,58 @@
+import logging
+
+from sqlalchemy import create_engine, text
+
+from app.adapters.db.query_tracker import QueryTracker, parameter_shape
+
+
+def test_endpoints_stay_within_their_statement_budgets(sql_client, statement_budget):
+    client = sql_client
+    client.post("/auth/register", json={"email": "u@example.com", "password": "pw"})
+    token = client.post(
+        "/auth/login", json={"email": "u@example.com", "password": "pw"}
+    ).json()["access_token"]
+    auth = {"Authorization": f"Bearer {token}"}
+
+    created = client.post(
+        "/persons", json={"name": "Ana", "email": "ana@example.com"}, headers=auth
+    ).json()
+    rows = [{"name": f"P{i}", "email": f"p{i}@example.com"} for i in range(50)]
+    assert client.post("/persons/bulk", json=rows, headers=auth).status_code == 200
+    # listing 51 persons must not cost a statement per person
+    assert len(client.get("/persons", headers=auth).json()) == 51
+    client.get("/persons/stats", headers=auth)
+    client.get(f"/persons/{created['id']}", headers=auth)
+    client.put(
+        f"/persons/{created['id']}",
+        json={"name": "Ana", "email": "ana@example.com", "age": 30},
+        headers=auth,
+    )
+    client.patch(f"/persons/{created['id']}", json={"age": 31}, headers=auth)
+    client.delete(f"/persons/{created['id']}", headers=auth)
+    client.post("/auth/logout", headers=auth)
+
+    assert statement_budget["GET /persons"] > 0
+
+
+def test_tracker_logs_slow_queries_and_chatty_requests(caplog):
+    engine = create_engine("sqlite://")
+    tracker = QueryTracker(slow_query_seconds=0, max_statements=2)
+    tracker.instrument(engine)
+    with caplog.at_level(logging.WARNING, logger="app.adapters.db.query_tracker"):
+        with tracker.track() as queries, engine.connect() as conn:
+            for i in range(3):
+                conn.execute(text("SELECT :n, :email"), {"n": i, "email": "a@b.co"})
+        tracker.finish("GET /persons", queries)
+
+    assert queries.count == 3
+    messages = [r.getMessage() for r in caplog.records]
+    # parameter types and lengths only, never the values
+    assert "params=(int, str[6])" in messages[0]
+    assert "a@b.co" not in "".join(messages)
+    assert messages[-1].startswith("GET /persons ran 3 SQL statements (limit 2)")
+
+
+def test_parameter_shape_of_executemany():
+    rows = [("a", b"\x00" * 16, None)] * 3
+    assert parameter_shape(rows, executemany=True) == "3 x (str[1], bytes[16], None)"
+    assert parameter_shape({"id": 7}) == "{id: int}"
@@ -0,0 +1,74 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.adapters.db.migrations import upgrade
+from app.adapters.db.unit_of_work import SqlAlchemyUnitOfWork
+from app.adapters.repositories.in_memory_person_repository import (
+    InMemoryPersonRepository,
+)
+from app.adapters.repositories.replica_person_repository import (
+    ReplicaPersonRepository,
+)
+from app.adapters.repositories.sqlalchemy_person_repository import (
+    SqlAlchemyPersonRepository,
+)
+from app.domain.person import Person
+from app.usecases.patch_person import PatchPerson
+
+
+def test_replica_writes_reach_the_database_and_other_replicas(tmp_path):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+        await upgrade(engine)
+        sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        database = SqlAlchemyPersonRepository(sessionmaker)
+        # two workers, each with its own copy
+        first, second = (
+            ReplicaPersonRepository(database, InMemoryPersonRepository())
+            for _ in range(2)
+        )
+        try:
+            await first.sync()
+            await second.sync()
+            person = await first.add(Person(name="Ada", email="ada@example.com"))
+            assert await database.get_by_id(person.id) == person
+            assert await first.get_by_id(person.id) == person  # read your writes
+            assert await first.change_counter() is None  # copy not synced yet
+            assert await second.get_by_id(person.id) is None
+
+            # applied to the copy only once the unit of work commits
+            async with SqlAlchemyUnitOfWork(sessionmaker):
+                await first.update_fields(person.id, {"name": "Rolled back"})
+            async with SqlAlchemyUnitOfWork(sessionmaker) as uow:
+                renamed = await first.update_fields(person.id, {"name": "Ada L."})
+                assert (await first.get_by_id(person.id)).name == "Ada"
+                await uow.commit()
+            assert await first.get_by_id(person.id) == renamed
+
+            assert await second.sync()
+            assert await second.get_by_id(person.id) == renamed
+            assert await second.change_counter() == await database.change_counter()
+            assert not await second.sync()  # nothing changed since
+
+            await second.delete(person.id)
+            assert await database.get_by_id(person.id) is None
+            assert await first.sync()
+            assert await first.get_by_id(person.id) is None
+
+            person = await first.add(Person(name="Bo", email="bo@example.com", age=30))
+            assert await second.sync()
+            await second.update_fields(person.id, {"age": 40})
+            # the counter moved by second's own write only: no reload
+            assert not await second.sync()
+            assert await second.change_counter() == await database.change_counter()
+
+            # first's copy still says 30: the PATCH must diff against the row
+            assert (await first.get_by_id(person.id)).age == 30
+            patched = await PatchPerson(first).execute(person.id, {"age": 30})
+            assert (patched.age, patched.version) == (30, 3)
+            assert await database.get_by_id(person.id) == patched
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
@@ -0,0 +1,27 @@
+import asyncio
+
+from app.adapters.cache.single_flight import SingleFlight
+
+
+def test_cancelled_leader_does_not_fail_followers():
+    async def main():
+        flight = SingleFlight()
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "value"
+
+        leader = asyncio.create_task(flight.do("key", load))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("key", load))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        assert await follower == "value"
+        assert leader.cancelled()
+        assert len(calls) == 1
+        assert not flight.in_flight("key")
+
+    asyncio.run(main())
@@ -0,0 +1,309 @@
+import asyncio
+from dataclasses import replace
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.adapters.db.migrations import upgrade
+from app.adapters.db.unit_of_work import SqlAlchemyUnitOfWork
+from app.adapters.repositories.in_memory_person_repository import (
+    InMemoryPersonRepository,
+)
+from app.adapters.repositories.sqlalchemy_person_repository import (
+    SqlAlchemyPersonRepository,
+)
+from app.domain.person import Person
+from app.domain.person_query import PersonQuery
+from app.domain.exceptions import ConcurrencyConflict
+from app.usecases.bulk_create_persons import BulkCreatePersons
+from app.usecases.patch_person import PatchPerson
+from app.usecases.update_person import UpdatePerson
+
+
+def _run_with_repo(tmp_path, scenario):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+        await upgrade(engine)
+        try:
+            repo = SqlAlchemyPersonRepository(
+                async_sessionmaker(engine, expire_on_commit=False)
+            )
+            return await scenario(repo, engine)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def test_list_pages_and_stream_follow_id_order(tmp_path):
+    async def scenario(repo, engine):
+        persons = [
+            Person(id=uuid4(), name=f"P{i}", email=f"p{i}@example.com", age=i)
+            for i in range(7)
+        ]
+        for p in persons:
+            await repo.add(p)
+        expected = sorted(persons, key=lambda p: p.id)
+
+        first = await repo.list(limit=3)
+        second = await repo.list(limit=3, after=first[-1].id)
+        rest = await repo.list(after=second[-1].id)
+        assert first + second + rest == expected
+
+        chunks = [chunk async for chunk in repo.stream(chunk_size=3)]
+        assert [len(c) for c in chunks] == [3, 3, 1]
+        assert [p for c in chunks for p in c] == expected
+
+    _run_with_repo(tmp_path, scenario)
+
+
+def test_add_many_inserts_every_chunk_in_one_transaction(tmp_path):
+    async def scenario(repo, engine):
+        repo.insert_chunk_size = 2
+        persons = [
+            Person(id=uuid4(), name=f"B{i}", email=f"b{i}@example.com") for i in range(5)
+        ]
+        commits = []
+        event.listen(engine.sync_engine, "commit", lambda conn: commits.append(1))
+        assert await repo.add_many(persons) == 5
+        assert len(commits) == 1
+        assert sorted(await repo.list(), key=lambda p: p.id) == sorted(
+            persons, key=lambda p: p.id
+        )
+
+    _run_with_repo(tmp_path, scenario)
+
+
+def test_bulk_import_is_validated_first_and_committed_once(tmp_path):
+    async def scenario(repo, engine):
+        sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        commits = []
+        event.listen(engine.sync_engine, "commit", lambda conn: commits.append(1))
+
+        async def rows(fail_at=None):
+            for i in range(5):
+                if i == fail_at:
+                    raise ConnectionError("client went away")
+                # nothing is written while the body is still arriving
+                assert await repo.list() == []
+                yield {"name": f"B{i}", "email": f"b{i}@example.com"}
+
+        def validate(row):
+            return row
+
+        async with SqlAlchemyUnitOfWork(sessionmaker) as uow:
+            bulk = BulkCreatePersons(repo, batch_size=2, uow=uow)
+            try:
+                await bulk.execute(rows(fail_at=3), validate)
+            except ConnectionError:
+                pass
+        assert await repo.list() == [] and not commits
+
+        async with SqlAlchemyUnitOfWork(sessionmaker) as uow:
+            bulk = BulkCreatePersons(repo, batch_size=2, uow=uow)
+            assert (await bulk.execute(rows(), validate)).created == 5
+        assert len(commits) == 1
+        assert len(await repo.list()) == 5
+
+    _run_with_repo(tmp_path, scenario)
+
+
+def _record_statements(engine):
+    statements = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    return statements
+
+
+def test_writes_use_returning_and_a_single_statement(tmp_path):
+    async def scenario(repo, engine):
+        statements = _record_statements(engine)
+        person = Person(id=uuid4(), name="Ann", email="ann@example.com", age=30)
+        assert await repo.add(person) == person
+        assert len(statements) == 1
+
+        statements.clear()
+        updated = await UpdatePerson(repo).execute(person.id, name="Anna")
+        assert updated == Person(
+            id=person.id, name="Anna", email=person.email, age=30, version=2
+        )
+        assert len(statements) == 1
+        assert "RETURNING" in statements[0]
+
+        statements.clear()
+        assert await UpdatePerson(repo).execute(uuid4(), age=1) is None
+        assert len(statements) == 1
+
+    _run_with_repo(tmp_path, scenario)
+
+
+def test_patch_without_changes_only_reads_and_stale_version_conflicts(tmp_path):
+    async def scenario(repo, engine):
+        person = await repo.add(
+            Person(id=uuid4(), name="Pat", email="pat@example.com", age=40)
+        )
+        statements = _record_statements(engine)
+        same = await PatchPerson(repo).execute(person.id, {"name": "Pat", "age": 40})
+        assert same == person
+        assert len(statements) == 1 and statements[0].startswith("SELECT")
+
+        await PatchPerson(repo).execute(person.id, {"age": 41})
+        try:
+            await repo.update_fields(person.id, {"age": 42}, expected_version=1)
+        except ConcurrencyConflict:
+            pass
+        else:
+            raise AssertionError("stale version was accepted")
+        assert (await repo.get_by_id(person.id)).age == 41
+
+    _run_with_repo(tmp_path, scenario)
+
+
+def test_change_counter_moves_on_every_kind_of_write(tmp_path):
+    async def scenario(repo, engine):
+        seen = [await repo.change_counter()]
+        person = await repo.add(Person(id=uuid4(), name="C", email="c@example.com"))
+        seen.append(await repo.change_counter())
+        await repo.add_many(
+            [Person(id=uuid4(), name="D", email=f"d{i}@example.com") for i in range(3)]
+        )
+        seen.append(await repo.change_counter())
+        await repo.update_fields(person.id, {"age": 3})
+        seen.append(await repo.change_counter())
+        await repo.delete(person.id)
+        seen.append(await repo.change_counter())
+        await repo.list()
+        seen.append(await repo.change_counter())
+        assert seen[:-1] == sorted(set(seen[:-1]))
+        assert seen[-1] == seen[-2]
+
+    _run_with_repo(tmp_path, scenario)
+
+
+def _pages(repo, query):
+    async def collect():
+        found, after = [], None
+        while True:
+            page = await repo.find(replace(query, limit=7, after=after))
+            found += [p.id for p in page]
+            if len(page) < 7:
+                return found
+            after = query.position(page[-1])
+
+    return collect()
+
+
+def test_find_filters_sorts_and_pages_like_the_in_memory_repository(tmp_path):
+    names = ["Ana Souza", "ANAbel", "Bruno", "Bianca", "Caio", "Juliana", "Ana"]
+    persons = [
+        Person(
+            id=uuid4(),
+            name=names[i % len(names)],
+            email=f"{'ab'[i % 2]}{i:02d}@example.com",
+            age=None if i % 5 == 0 else 18 + i % 13,
+        )
+        for i in range(60)
+    ]
+    queries = [
+        PersonQuery(),
+        PersonQuery(sort="age"),
+        PersonQuery(sort="age", descending=True),
+        PersonQuery(sort="name", descending=True, min_age=20, max_age=25),
+        PersonQuery(sort="email", email_prefix="a1"),
+        PersonQuery(email_prefix="b", sort="age"),
+        PersonQuery(name_contains="ana", sort="name"),
+        PersonQuery(name_contains="An", descending=True),
+        PersonQuery(name_contains='"x', sort="email"),
+    ]
+
+    async def scenario(repo, engine):
+        memory = InMemoryPersonRepository()
+        await repo.add_many(persons)
+        await memory.add_many(persons)
+        for query in queries:
+            expected = await _pages(memory, query)
+            assert await _pages(repo, query) == expected, query
+            everything = await memory.find(PersonQuery(sort=query.sort))
+            assert len(expected) == sum(query.matches(p) for p in everything)
+
+    _run_with_repo(tmp_path, scenario)
+
+
+def test_name_search_index_follows_writes(tmp_path):
+    async def scenario(repo, engine):
+        person = await repo.add(Person(id=uuid4(), name="Mariana", email="m@example.com"))
+        query = PersonQuery(name_contains="RIAN")
+        assert [p.id for p in await repo.find(query)] == [person.id]
+        await repo.update_fields(person.id, {"name": "Marta"})
+        assert await repo.find(query) == []
+        assert len(await repo.find(PersonQuery(name_contains="mart"))) == 1
+        await repo.delete(person.id)
+        assert await repo.find(PersonQuery(name_contains="mart")) == []
+        async with engine.connect() as conn:
+            plan = await conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT id FROM persons "
+                "WHERE email >= 'a' AND email < 'b' ORDER BY email, id"
+            )
+            assert "ix_persons_email_id" in " ".join(str(r) for r in plan)
+
+    _run_with_repo(tmp_path, scenario)
+
+
+def test_name_search_survives_vacuum(tmp_path):
+    async def scenario(repo, engine):
+        persons = [
+            Person(id=uuid4(), name=f"Name{i:02d}", email=f"v{i}@example.com")
+            for i in range(20)
+        ]
+        await repo.add_many(persons)
+        # gaps that a VACUUM renumbering implicit rowids would close
+        for person in persons[:10:2]:
+            await repo.delete(person.id)
+        async with engine.connect() as conn:
+            # an INTEGER PRIMARY KEY is the one rowid VACUUM may not renumber
+            columns = await conn.exec_driver_sql("PRAGMA table_info(persons)")
+            assert [(c[1], c[2]) for c in columns if c[5]] == [("seq", "INTEGER")]
+            fts = await conn.exec_driver_sql(
+                "SELECT sql FROM sqlite_master WHERE name = 'persons_name_fts'"
+            )
+            assert "content_rowid='seq'" in fts.scalar()
+            await conn.exec_driver_sql("VACUUM")
+        for person in persons[1::2]:
+            found = await repo.find(PersonQuery(name_contains=person.name))
+            assert [p.id for p in found] == [person.id]
+
+    _run_with_repo(tmp_path, scenario)
+
+
+def test_stats_aggregate_in_sql_like_the_in_memory_counters(tmp_path):
+    persons = [
+        Person(
+            id=uuid4(),
+            name=f"S{i}",
+            email=f"s{i}@{['example.com', 'mail.org', 'x.io'][i % 3 if i < 20 else 0]}",
+            age=None if i % 7 == 0 else i * 3 - 10,
+        )
+        for i in range(40)
+    ]
+
+    async def scenario(repo, engine):
+        memory = InMemoryPersonRepository()
+        for target in (repo, memory):
+            await target.add_many(persons)
+            await target.update_fields(persons[1].id, {"age": None})
+            await target.update_fields(persons[2].id, {"email": "moved@x.io"})
+            await target.delete(persons[3].id)
+        statements = _record_statements(engine)
+        stats = await repo.stats(bucket_width=25, top_domains=2)
+        assert len(statements) == 3
+        assert stats == await memory.stats(bucket_width=25, top_domains=2)
+        assert stats.total == 39
+        assert stats.null_age == sum(p.age is None for p in persons) + 1
+        assert stats.age_buckets[-25] == 1
+        assert stats.top_email_domains[0] == ("example.com", 26)
+
+    _run_with_repo(tmp_path, scenario)
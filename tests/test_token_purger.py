@@ -0,0 +1,55 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.adapters.db.models import RevokedTokenModel
+from app.adapters.db.migrations import upgrade
+from app.adapters.repositories.sqlalchemy_user_repository import (
+    SqlAlchemyUserRepository,
+)
+from app.services.token_purger import RevokedTokenPurger
+
+
+def _sample(lines, name):
+    return float(next(line for line in lines if line.startswith(name + " ")).split()[1])
+
+
+def test_purger_deletes_only_expired_rows_in_batches(tmp_path):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+        await upgrade(engine)
+        sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        repo = SqlAlchemyUserRepository(sessionmaker)
+        now = datetime.utcnow()
+        for i in range(5):
+            await repo.add_revoked_token(f"expired-{i}", now - timedelta(minutes=1))
+        await repo.add_revoked_token("live", now + timedelta(hours=1))
+
+        purger = RevokedTokenPurger(repo, batch_size=2)
+        assert await purger.run() == 5
+        assert await purger.run() == 0
+
+        async with sessionmaker() as session:
+            left = (await session.execute(select(RevokedTokenModel.jti))).scalars()
+            assert list(left) == ["live"]
+        assert await repo.is_token_revoked("live")
+        await engine.dispose()
+
+    asyncio.run(main())
+
+
+def test_purge_volume_and_time_are_exported(client):
+    repo = client.app.state.user_repository
+    expired = datetime.utcnow() - timedelta(minutes=1)
+    for i in range(3):
+        client.portal.call(repo.add_revoked_token, f"expired-{i}", expired)
+
+    assert client.portal.call(client.app.state.token_purger.run) == 3
+
+    lines = client.get("/metrics").text.splitlines()
+    assert "# TYPE token_purge_rows_total counter" in lines
+    assert _sample(lines, "token_purge_runs_total") == 1
+    assert _sample(lines, "token_purge_rows_total") == 3
+    assert _sample(lines, "token_purge_seconds_total") > 0
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.main as main
+from app.adapters.db.migrations import upgrade
+from app.adapters.db.unit_of_work import SqlAlchemyUnitOfWork
+from app.adapters.repositories.sqlalchemy_person_repository import (
+    SqlAlchemyPersonRepository,
+)
+from app.domain.person import Person
+
+
+@pytest.mark.parametrize("caches", [False, True], ids=["uncached", "default"])
+def test_authenticated_write_checks_out_one_connection(tmp_path, monkeypatch, caches):
+    monkeypatch.setattr(main, "DATABASE_URL", f"sqlite+aiosqlite:///{tmp_path / 'uow.db'}")
+    if not caches:
+        # SQL repositories alone: every lookup hits the database
+        monkeypatch.setattr(main, "PERSON_CACHE_TTL_SECONDS", 0)
+        monkeypatch.setattr(main, "REVOCATION_CACHE_ENABLED", False)
+        monkeypatch.setattr(main, "USER_CACHE_TTL_SECONDS", 0)
+    app = main.create_app()
+    with TestClient(app) as client:
+        client.post("/auth/register", json={"email": "u@example.com", "password": "pw"})
+        token = client.post(
+            "/auth/login", json={"email": "u@example.com", "password": "pw"}
+        ).json()["access_token"]
+        auth = {"Authorization": f"Bearer {token}"}
+        created = client.post(
+            "/persons", json={"name": "Ana", "email": "ana@example.com"}, headers=auth
+        ).json()
+
+        checkouts, commits, statements = [], [], []
+        engine = app.state._db_engine.sync_engine
+        event.listen(engine, "checkout", lambda *args: checkouts.append(1))
+        event.listen(engine, "commit", lambda *args: commits.append(1))
+        event.listen(
+            engine, "before_cursor_execute", lambda *args: statements.append(args[2])
+        )
+        # revocation check, user lookup (unless cached), read and versioned update
+        r = client.patch(f"/persons/{created['id']}", json={"age": 31}, headers=auth)
+        assert r.status_code == 200 and r.json()["age"] == 31
+        assert len(statements) >= (2 if caches else 4)
+        assert len(checkouts) == 1
+        assert len(commits) == 1
+
+        # a failed write is rolled back with the request
+        checkouts.clear()
+        r = client.patch(
+            f"/persons/{created['id']}",
+            json={"age": 32},
+            headers={**auth, "If-Match": '"1"'},
+        )
+        assert r.status_code == 412
+        assert len(checkouts) == 1
+        assert client.get(f"/persons/{created['id']}").json()["age"] == 31
+
+
+def test_unit_of_work_commits_only_when_told(tmp_path):
+    async def main_():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+        await upgrade(engine)
+        sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        repo = SqlAlchemyPersonRepository(sessionmaker)
+        try:
+            async with SqlAlchemyUnitOfWork(sessionmaker):
+                dropped = await repo.add(Person(name="Dropped", email="d@example.com"))
+                assert await repo.get_by_id(dropped.id) == dropped  # own writes visible
+            async with SqlAlchemyUnitOfWork(sessionmaker) as uow:
+                # a nested unit of work joins the outer transaction
+                async with SqlAlchemyUnitOfWork(sessionmaker) as inner:
+                    kept = await repo.add(Person(name="Kept", email="k@example.com"))
+                    await inner.commit()
+                await uow.commit()
+            # outside a unit of work every call commits on its own
+            alone = await repo.add(Person(name="Alone", email="a@example.com"))
+            assert {p.id for p in await repo.list()} == {kept.id, alone.id}
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main_())